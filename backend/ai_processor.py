@@ -5,12 +5,7 @@ Matches the refined Next.js AI generation logic exactly
 
 import os
 import logging
-import tempfile
-import subprocess
-import re
-from typing import Optional, Dict, Any
-from pathlib import Path
-import google.generativeai as genai
+from typing import Optional, Dict, Any, Union
 try:
     from elevenlabs import ElevenLabs
     client = ElevenLabs()
@@ -19,32 +14,66 @@ except ImportError:
     from elevenlabs import generate, save
 import requests
 
+from analysis.gemini_client import get_gemini_client
+from analysis.summarizer import ChunkSummaryCache, TranscriptSummarizer
+from analysis.transcript_store import SOURCE_METADATA, fetch_caption_vtt
+from analysis.vtt_parser import VttTranscript, parse_vtt, parse_vtt_file
+
 logger = logging.getLogger(__name__)
 
+SUMMARY_MODEL_NAME = 'gemini-1.5-flash'  # Map step of long transcripts
+ANNOUNCER_MODEL_NAME = 'gemini-1.5-pro'
+
 class AIProcessor:
     """AI processing for video analysis and audio generation"""
     
     def __init__(self, 
                  google_api_key: Optional[str] = None,
-                 elevenlabs_api_key: Optional[str] = None):
+                 elevenlabs_api_key: Optional[str] = None,
+                 transcript_store=None):
         
-        # Configure Google Gemini
+        # Configure Google Gemini (shared, rate-limited and retrying client)
         if google_api_key:
-            genai.configure(api_key=google_api_key)
-            self.genai_model = genai.GenerativeModel('gemini-1.5-pro')
+            self.gemini = get_gemini_client(google_api_key)
         else:
-            self.genai_model = None
+            self.gemini = None
             logger.warning("Google API key not provided - AI analysis disabled")
         
         # Configure ElevenLabs
         self.elevenlabs_api_key = elevenlabs_api_key
         if not elevenlabs_api_key:
             logger.warning("ElevenLabs API key not provided - audio generation disabled")
+        
+        # Optional TranscriptStore; without it every call fetches again
+        self.transcript_store = transcript_store
+        
+        # Long transcripts are condensed chunk by chunk with the cheaper model;
+        # chunk notes are cached in the store's database when there is one
+        self.summarizer = None
+        if google_api_key:
+            self.summarizer = TranscriptSummarizer(
+                lambda prompt: self.gemini.generate_text(SUMMARY_MODEL_NAME, prompt),
+                SUMMARY_MODEL_NAME,
+                ChunkSummaryCache(transcript_store.SessionLocal if transcript_store else None),
+            )
     
     def download_transcript(self, video_id: str) -> Optional[str]:
+        """
+        Download video transcript text (see load_transcript)
+        """
+        transcript = self.load_transcript(video_id)
+        return transcript.text if isinstance(transcript, VttTranscript) else transcript
+    
+    def load_transcript(self, video_id: str) -> Union[str, VttTranscript, None]:
         """
         Download video transcript using YouTube Data API v3 (fallback to description)
+        Stored captions or metadata are used first when a transcript store is configured;
+        captions come back as a VttTranscript so they can be chunked on cue boundaries
         """
+        stored = self._stored_transcript(video_id)
+        if stored:
+            return stored
+        
         try:
             # Import here to avoid circular dependency
             from googleapiclient.discovery import build
@@ -73,7 +102,8 @@ class AIProcessor:
                 
                 if len(content.strip()) > 50:  # Only use if there's meaningful content
                     logger.info(f"Using video metadata for AI analysis: {len(content)} characters")
-                    return content[:3000]  # Limit to 3000 chars for AI processing
+                    self._store_transcript(video_id, content, SOURCE_METADATA)
+                    return content
                 else:
                     logger.info("Video description too short for meaningful analysis")
                     return None
@@ -85,82 +115,72 @@ class AIProcessor:
             # Try the old yt-dlp method as ultimate fallback
             return self._download_transcript_ytdlp_fallback(video_id)
     
-    def _download_transcript_ytdlp_fallback(self, video_id: str) -> Optional[str]:
+    def _download_transcript_ytdlp_fallback(self, video_id: str) -> Optional[VttTranscript]:
         """
         Ultimate fallback method using yt-dlp (may fail on cloud IPs)
         """
         try:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                cmd = [
-                    'yt-dlp',
-                    '--write-auto-sub',
-                    '--sub-lang', 'en',
-                    '--sub-format', 'vtt',
-                    '--skip-download',
-                    '--output', f'{temp_dir}/%(title)s.%(ext)s',
-                    f'https://www.youtube.com/watch?v={video_id}'
-                ]
-                
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-                
-                if result.returncode != 0:
-                    logger.error(f"yt-dlp fallback failed: {result.stderr}")
-                    return None
-                
-                vtt_files = list(Path(temp_dir).glob('*.vtt'))
-                if not vtt_files:
-                    return None
-                
-                with open(vtt_files[0], 'r', encoding='utf-8') as f:
-                    vtt_content = f.read()
-                
-                transcript = self._parse_vtt_content(vtt_content)
-                logger.info(f"Transcript downloaded via fallback: {len(transcript)} characters")
-                return transcript
+            # Through the store, captions are saved and videos without any are not re-fetched for a while
+            if self.transcript_store:
+                vtt_content = self.transcript_store.captions(video_id)
+            else:
+                vtt_content = fetch_caption_vtt(video_id)
+            if not vtt_content:
+                return None
+            
+            transcript = parse_vtt(vtt_content)
+            logger.info(f"Transcript downloaded via fallback: {len(transcript.text)} characters")
+            return transcript
                 
         except Exception as e:
             logger.error(f"yt-dlp fallback error: {e}")
             return None
     
-    def _parse_vtt_content(self, vtt_content: str) -> str:
-        """Parse VTT file content (matches Next.js parsing logic)"""
-        lines = vtt_content.split('\n')
-        transcript_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Skip timestamp lines and empty lines
-            if '-->' in line or not line or line.startswith('WEBVTT'):
-                continue
-            
-            # Skip lines that are just numbers (cue numbers)
-            if line.isdigit():
-                continue
-            
-            # Remove HTML tags and formatting
-            line = re.sub(r'<[^>]+>', '', line)
-            line = re.sub(r'&nbsp;', ' ', line)
-            line = re.sub(r'&[a-zA-Z]+;', '', line)
-            
-            if line:
-                transcript_lines.append(line)
+    def _stored_transcript(self, video_id: str) -> Union[str, VttTranscript, None]:
+        """Transcript from the store, or None on a miss or without a store"""
+        if not self.transcript_store:
+            return None
+        try:
+            stored = self.transcript_store.get(video_id)
+        except Exception as e:
+            logger.warning(f"Transcript store unavailable: {e}")
+            return None
+        if not stored:
+            return None
         
-        return ' '.join(transcript_lines)
+        logger.info(f"Using stored {stored.source} transcript for {video_id} (fetched {stored.fetched_at})")
+        return parse_vtt(stored.content) if stored.is_captions else stored.content
     
-    def generate_announcer_summary(self, transcript: str, video_title: str) -> Optional[str]:
+    def _store_transcript(self, video_id: str, content: str, source: str):
+        """Save a fetched transcript; a store failure never fails the fetch"""
+        if not self.transcript_store:
+            return
+        try:
+            self.transcript_store.put(video_id, content, source)
+        except Exception as e:
+            logger.warning(f"Could not store transcript for {video_id}: {e}")
+    
+    def _parse_vtt_content(self, vtt_content: str) -> str:
+        """Parse VTT file content, dropping the words rolling auto-captions repeat"""
+        return parse_vtt_file(vtt_content)
+    
+    def generate_announcer_summary(self, transcript: Union[str, VttTranscript], video_title: str) -> Optional[str]:
         """
         Generate golf announcer-style trailer summary (matches Next.js Gemini prompt exactly)
+        Transcripts over the prompt budget are reduced to time-stamped chunk notes first
         """
-        if not self.genai_model:
+        if not self.gemini:
             logger.error("Gemini API not configured")
             return None
         
         try:
+            # The whole round, condensed when long, instead of only its first minutes
+            transcript = self.summarizer.condense(transcript)
+            
             # Exact prompt from Next.js
             prompt = f"""You are channeling a legendary golf announcer. Create a compelling TRAILER-STYLE preview in a distinctive broadcasting style for this golf video: "{video_title}"
 
-Based on this transcript: {transcript[:4000]}
+Based on this transcript: {transcript}
 
 Guidelines:
 - Channel a warm, sophisticated, and reverent broadcasting tone
@@ -173,7 +193,7 @@ Guidelines:
 
 Create a preview that captures the excitement and draws viewers in, just like Jim would introduce a major golf moment on CBS."""
 
-            response = self.genai_model.generate_content(prompt)
+            response = self.gemini.generate(ANNOUNCER_MODEL_NAME, prompt)
             
             if response and response.text:
                 summary = response.text.strip()
@@ -274,7 +294,7 @@ Create a preview that captures the excitement and draws viewers in, just like Ji
         try:
             # Step 1: Download transcript
             logger.info(f"Downloading transcript for video: {video_title} ({video_id})")
-            transcript = self.download_transcript(video_id)
+            transcript = self.load_transcript(video_id)
             
             if not transcript:
                 result['error'] = "Could not download transcript"
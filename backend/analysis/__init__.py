@@ -0,0 +1,6 @@
+"""
+Transcript and Gemini code shared by the scheduler's AIProcessor and the
+archived video analyzer: caption parsing and storage, transcript
+summarization, result caching and the rate-limited Gemini client. Nothing here opens a database connection
+on import; callers pass in their own session factory.
+"""
@@ -0,0 +1,23 @@
+"""
+Connection helpers for callers that hand the shared analysis code a
+database of their own (the scheduler uses libpq-style URLs).
+"""
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+def sqlalchemy_url(database_url: str, driver: str = None) -> str:
+    """SQLAlchemy form of a Postgres URL, optionally with an explicit driver (e.g. 'asyncpg')."""
+    scheme, rest = database_url.split("://", 1)
+    # libpq accepts the short scheme, SQLAlchemy does not
+    scheme = "postgresql" if scheme in ("postgres", "postgresql") else scheme
+    if driver:
+        scheme = f"{scheme.split('+')[0]}+{driver}"
+    return f"{scheme}://{rest}"
+
+
+def session_factory(database_url: str, **engine_options) -> sessionmaker:
+    """Sessions on a new engine for `database_url`."""
+    engine = create_engine(sqlalchemy_url(database_url), pool_pre_ping=True, **engine_options)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
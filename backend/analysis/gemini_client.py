@@ -0,0 +1,274 @@
+"""
+Shared Gemini client for the analyzer worker and AIProcessor.
+One client per process configures the API once, caches model handles,
+bounds in-flight requests with a semaphore and a token bucket, retries
+transient errors with exponential backoff (honoring the server's retry
+hints), polls uploaded files with backoff, and keeps per-call metrics.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, Optional
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+from .rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '8'))
+# GEMINI_FRAME_RPM is the older name from when only frame calls were limited
+REQUESTS_PER_MINUTE = float(os.getenv('GEMINI_RPM') or os.getenv('GEMINI_FRAME_RPM', '60'))
+MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', '4'))
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 60.0
+
+FILE_POLL_INITIAL_SECONDS = 2.0
+FILE_POLL_MAX_SECONDS = 30.0
+FILE_POLL_TIMEOUT_SECONDS = 1800
+
+LATENCY_WINDOW = 512  # Recent latencies kept per model for percentiles
+
+RETRYABLE_ERRORS = (
+    google_exceptions.TooManyRequests,  # Includes ResourceExhausted (429)
+    google_exceptions.InternalServerError,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.GatewayTimeout,  # Includes DeadlineExceeded
+    ConnectionError,
+    TimeoutError,
+)
+
+# Timeouts of a long call are not retried by default: another attempt at
+# the same timeout would outrun the task's time limit
+TIMEOUT_ERRORS = (
+    google_exceptions.GatewayTimeout,
+    TimeoutError,
+)
+
+RETRY_HINT = re.compile(r'retry (?:in|after) ([\d.]+)\s*s', re.IGNORECASE)
+DURATION = re.compile(r'^([\d.]+)s$')
+
+
+def retry_hint_seconds(error: Exception) -> Optional[float]:
+    """
+    Server-suggested wait before retrying: a google.rpc.RetryInfo detail,
+    a Retry-After header, or a "retry in 12.5s" message, else None.
+    """
+    for detail in getattr(error, 'details', None) or []:
+        delay = getattr(detail, 'retry_delay', None)
+        if delay is not None:
+            return delay.seconds + delay.nanos / 1e9
+        if isinstance(detail, dict) and 'retryDelay' in detail:
+            match = DURATION.match(str(detail['retryDelay']))
+            if match:
+                return float(match.group(1))
+
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    retry_after = headers.get('Retry-After') if hasattr(headers, 'get') else None
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+
+    match = RETRY_HINT.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+def backoff_seconds(attempt: int, error: Optional[Exception] = None) -> float:
+    """Retry hint when the server sent one, else capped exponential backoff with jitter."""
+    hint = retry_hint_seconds(error) if error is not None else None
+    if hint is not None:
+        return min(hint, BACKOFF_MAX_SECONDS)
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** attempt, BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _file_poll_delays(timeout: float) -> Iterator[float]:
+    """Growing waits between file state checks, stopping once `timeout` is spent."""
+    delay, waited = FILE_POLL_INITIAL_SECONDS, 0.0
+    while waited < timeout:
+        yield delay
+        waited += delay
+        delay = min(delay * 1.5, FILE_POLL_MAX_SECONDS)
+
+
+@dataclass
+class CallStats:
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    total_latency: float = 0.0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    error_types: Dict[str, int] = field(default_factory=dict)
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        percentile = lambda q: round(ordered[min(int(q * len(ordered)), len(ordered) - 1)], 3) if ordered else None
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'retries': self.retries,
+            'prompt_tokens': self.prompt_tokens,
+            'output_tokens': self.output_tokens,
+            'mean_latency': round(self.total_latency / self.calls, 3) if self.calls else None,
+            'p50_latency': percentile(0.5),
+            'p95_latency': percentile(0.95),
+            'error_types': dict(self.error_types),
+        }
+
+
+class GeminiClient:
+    """
+    Process-wide front end for Gemini calls. `semaphore` caps concurrent
+    requests across threads; `rate_limiter` caps requests per minute.
+    Metrics are kept per model name.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, max_concurrency: int = MAX_CONCURRENCY,
+                 requests_per_minute: float = REQUESTS_PER_MINUTE, max_retries: int = MAX_RETRIES):
+        api_key = api_key or os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise ValueError("GOOGLE_API_KEY environment variable not set.")
+        genai.configure(api_key=api_key)
+
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.rate_limiter = TokenBucket.per_minute(requests_per_minute)
+        self.max_retries = max_retries
+        self._models: Dict[str, genai.GenerativeModel] = {}
+        self._stats: Dict[str, CallStats] = {}
+        self._lock = threading.Lock()
+
+    def model(self, name: str) -> genai.GenerativeModel:
+        """Cached model handle for `name`."""
+        with self._lock:
+            if name not in self._models:
+                self._models[name] = genai.GenerativeModel(name)
+            return self._models[name]
+
+    def _record(self, model_name: str, latency: Optional[float] = None, response=None,
+                error: Optional[Exception] = None, retried: bool = False):
+        with self._lock:
+            stats = self._stats.setdefault(model_name, CallStats())
+            stats.calls += 1
+            if latency is not None:
+                stats.total_latency += latency
+                stats.latencies.append(latency)
+            usage = getattr(response, 'usage_metadata', None)
+            if usage is not None:
+                stats.prompt_tokens += getattr(usage, 'prompt_token_count', 0) or 0
+                stats.output_tokens += getattr(usage, 'candidates_token_count', 0) or 0
+            if error is not None:
+                stats.errors += 1
+                name = type(error).__name__
+                stats.error_types[name] = stats.error_types.get(name, 0) + 1
+            if retried:
+                stats.retries += 1
+
+    def generate(self, model_name: str, contents, max_retries: Optional[int] = None,
+                 retry_timeouts: bool = True, **kwargs):
+        """
+        generate_content on the cached model, within the concurrency and
+        rate limits, retrying transient errors. Other errors, and the last
+        transient one, are raised. `max_retries` overrides the client's
+        setting for this call; with `retry_timeouts` False a timeout is
+        raised at once, for long calls whose retries would not fit the
+        caller's time budget.
+        """
+        model = self.model(model_name)
+        max_retries = self.max_retries if max_retries is None else max_retries
+        for attempt in range(max_retries + 1):
+            with self.semaphore:
+                self.rate_limiter.acquire()
+                started = time.monotonic()
+                try:
+                    response = model.generate_content(contents, **kwargs)
+                except RETRYABLE_ERRORS as e:
+                    error = e
+                except Exception as e:
+                    self._record(model_name, time.monotonic() - started, error=e)
+                    raise
+                else:
+                    self._record(model_name, time.monotonic() - started, response)
+                    return response
+
+            # Back off outside the semaphore so other calls can proceed
+            retrying = attempt < max_retries and (retry_timeouts or not isinstance(error, TIMEOUT_ERRORS))
+            self._record(model_name, time.monotonic() - started, error=error, retried=retrying)
+            if not retrying:
+                raise error
+            delay = backoff_seconds(attempt, error)
+            logger.warning(f"Gemini {model_name} {type(error).__name__}, retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+    def generate_text(self, model_name: str, contents, **kwargs) -> str:
+        return self.generate(model_name, contents, **kwargs).text
+
+    def upload_file(self, path: str, timeout: float = FILE_POLL_TIMEOUT_SECONDS):
+        """Upload a file and wait, with backoff, until Gemini has processed it."""
+        uploaded = genai.upload_file(path=path)
+        for delay in _file_poll_delays(timeout):
+            if uploaded.state.name != "PROCESSING":
+                break
+            time.sleep(delay)
+            uploaded = genai.get_file(name=uploaded.name)
+        return self._check_file(uploaded)
+
+    async def upload_file_async(self, path: str, timeout: float = FILE_POLL_TIMEOUT_SECONDS):
+        """upload_file for event loops: blocking SDK calls run in threads, waits use asyncio.sleep."""
+        uploaded = await asyncio.to_thread(genai.upload_file, path=path)
+        for delay in _file_poll_delays(timeout):
+            if uploaded.state.name != "PROCESSING":
+                break
+            await asyncio.sleep(delay)
+            uploaded = await asyncio.to_thread(genai.get_file, name=uploaded.name)
+        return self._check_file(uploaded)
+
+    def _check_file(self, uploaded):
+        state = uploaded.state.name
+        if state == "PROCESSING":
+            self.delete_file(uploaded.name)
+            raise TimeoutError(f"Gemini file {uploaded.name} still processing after the poll timeout")
+        if state == "FAILED":
+            self.delete_file(uploaded.name)
+            raise ValueError(f"Gemini file processing failed: {uploaded.name}")
+        return uploaded
+
+    def delete_file(self, name: str):
+        """Best-effort removal of an uploaded file."""
+        try:
+            genai.delete_file(name=name)
+        except Exception as e:
+            logger.warning(f"Could not delete Gemini file {name}: {e}")
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-model call, error, retry, token and latency figures for this process."""
+        with self._lock:
+            return {name: stats.snapshot() for name, stats in self._stats.items()}
+
+    def log_metrics(self):
+        for name, snapshot in self.metrics().items():
+            logger.info(f"Gemini {name}: {snapshot}")
+
+
+_client: Optional[GeminiClient] = None
+_client_lock = threading.Lock()
+
+
+def get_gemini_client(api_key: Optional[str] = None) -> GeminiClient:
+    """The process-wide GeminiClient, created on first use (API key from GOOGLE_API_KEY by default)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GeminiClient(api_key)
+        return _client
@@ -0,0 +1,38 @@
+"""
+Tables owned by the shared analysis code. They have their own metadata:
+create them with `Base.metadata.create_all(engine)` on the caller's engine.
+"""
+
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, Text
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.sql import func
+
+Base = declarative_base()
+
+
+class ChunkSummary(Base):
+    __tablename__ = 'transcript_chunk_summaries'
+    
+    key = Column(String(64), primary_key=True)  # sha256 of model name and the filled map prompt
+    summary = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class Transcript(Base):
+    __tablename__ = 'transcripts'
+    
+    video_id = Column(String, primary_key=True)  # YouTube video ID
+    lang = Column(String, primary_key=True)  # Requested language; regional variants are stored under it
+    source = Column(String, nullable=False)  # 'captions' (WebVTT) or 'metadata' (title + description)
+    content = Column(LargeBinary, nullable=False)  # zlib-compressed UTF-8 text
+    content_hash = Column(String(64), nullable=False)  # sha256 of the uncompressed text
+    char_count = Column(Integer)
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class CaptionMiss(Base):
+    __tablename__ = 'caption_misses'
+    
+    video_id = Column(String, primary_key=True)
+    lang = Column(String, primary_key=True)
+    checked_at = Column(DateTime(timezone=True), server_default=func.now())  # Last fetch that found no captions
@@ -0,0 +1,91 @@
+"""
+Cache of model results by key, shared by the chunk summary and frame
+result caches: rows in a Postgres table when a session factory is given,
+otherwise a bounded per-process LRU.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Sequence
+
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+logger = logging.getLogger(__name__)
+
+LOCAL_CACHE_SIZE = 4096
+
+
+class ResultCache:
+    """
+    Results of `model` keyed by its `key_columns`, stored in `value_column`.
+    A key is the column value for a single key column, else a tuple of
+    them in order. Lookups and writes that fail are logged and treated as
+    misses, so callers never depend on the cache.
+    """
+
+    def __init__(self, model, key_columns: Sequence[str], value_column: str,
+                 session_factory=None, max_local: int = LOCAL_CACHE_SIZE):
+        self.model = model
+        self.key_columns = list(key_columns)
+        self.value_column = value_column
+        self.SessionLocal = session_factory
+        self.max_local = max_local
+        self._local: 'OrderedDict[Hashable, str]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key_expression(self):
+        columns = [getattr(self.model, name) for name in self.key_columns]
+        return columns[0] if len(columns) == 1 else tuple_(*columns)
+
+    def _row(self, key, value: str) -> Dict:
+        values = [key] if len(self.key_columns) == 1 else list(key)
+        return {**dict(zip(self.key_columns, values)), self.value_column: value}
+
+    def get_many(self, keys: List[Hashable]) -> Dict[Hashable, str]:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        if self.SessionLocal is None:
+            with self._lock:
+                found = {key: self._local[key] for key in keys if key in self._local}
+                for key in found:
+                    self._local.move_to_end(key)
+            return found
+        single = len(self.key_columns) == 1
+        try:
+            with self.SessionLocal() as session:
+                rows = session.query(
+                    *[getattr(self.model, name) for name in self.key_columns],
+                    getattr(self.model, self.value_column),
+                ).filter(self._key_expression().in_(keys))
+                return {(row[0] if single else tuple(row[:-1])): row[-1] for row in rows}
+        except Exception as e:
+            logger.warning(f"{self.model.__tablename__} cache unavailable: {e}")
+            return {}
+
+    def get(self, key: Hashable):
+        return self.get_many([key]).get(key)
+
+    def put_many(self, results: Dict[Hashable, str]):
+        if not results:
+            return
+        if self.SessionLocal is None:
+            with self._lock:
+                for key, value in results.items():
+                    self._local[key] = value
+                    self._local.move_to_end(key)
+                while len(self._local) > self.max_local:
+                    self._local.popitem(last=False)
+            return
+        rows = [self._row(key, value) for key, value in results.items()]
+        try:
+            with self.SessionLocal() as session:
+                session.execute(pg_insert(self.model).values(rows).on_conflict_do_nothing())
+                session.commit()
+        except Exception as e:
+            logger.warning(f"Could not cache {self.model.__tablename__} results: {e}")
+
+    def put(self, key: Hashable, value: str):
+        self.put_many({key: value})
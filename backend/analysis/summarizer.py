@@ -0,0 +1,208 @@
+"""
+Token-budgeted transcript summarization.
+Transcripts that fit the prompt budget are passed through whole. Longer
+ones are split into token-sized chunks on cue boundaries, the chunks are
+summarized concurrently (map) and the final prompt is built on the joined
+chunk notes (reduce). Chunk notes are cached by hash, so a new final
+prompt re-uses the map step.
+"""
+
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+from .models import ChunkSummary
+from .result_cache import ResultCache
+from .vtt_parser import VttTranscript
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4  # Rough average for English text; avoids a count_tokens round trip
+CHUNK_TOKENS = int(os.getenv('SUMMARY_CHUNK_TOKENS', '4000'))
+SINGLE_PASS_TOKENS = int(os.getenv('SUMMARY_SINGLE_PASS_TOKENS', '8000'))
+MAP_WORKERS = int(os.getenv('SUMMARY_MAP_WORKERS', '4'))
+LOCAL_CACHE_SIZE = 2048
+
+MAP_PROMPT = """
+You are condensing one part ({span}) of the commentary from a golf video.
+Write compact notes that keep, in order:
+- every scoring event (birdie, eagle, par, bogey, hole-in-one) with the hole and the player or team
+- running totals, match status and any money or charity amounts
+- player and team names, and who is playing whom
+- memorable quotes (verbatim) and standout moments
+Leave out filler and do not add anything that is not in the commentary.
+
+--- COMMENTARY ---
+{text}
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _clock(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+@dataclass
+class TranscriptChunk:
+    text: str
+    start: Optional[float] = None
+    end: Optional[float] = None
+
+    @property
+    def span(self) -> str:
+        if self.start is None:
+            return 'an excerpt'
+        return f"{_clock(self.start)}-{_clock(self.end)}"
+
+
+Transcript = Union[str, VttTranscript, Sequence[TranscriptChunk]]
+
+
+def chunk_transcript(transcript: Union[str, VttTranscript], max_tokens: int = CHUNK_TOKENS) -> List[TranscriptChunk]:
+    """
+    Split a transcript into chunks of at most `max_tokens` (estimated).
+    Caption transcripts split on cue boundaries and keep their time span;
+    plain text splits on word boundaries. A cue longer than the budget
+    becomes a chunk of its own.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks: List[TranscriptChunk] = []
+
+    if isinstance(transcript, VttTranscript):
+        parts: List[str] = []
+        size = 0
+        start = end = None
+        for cue_start, cue_end, text in transcript.cues():
+            if parts and size + len(text) + 1 > max_chars:
+                chunks.append(TranscriptChunk(' '.join(parts), start, end))
+                parts, size = [], 0
+            if not parts:
+                start = cue_start
+            parts.append(text)
+            size += len(text) + 1
+            end = cue_end
+        if parts:
+            chunks.append(TranscriptChunk(' '.join(parts), start, end))
+        return chunks
+
+    words = transcript.split()
+    parts, size = [], 0
+    for word in words:
+        if parts and size + len(word) + 1 > max_chars:
+            chunks.append(TranscriptChunk(' '.join(parts)))
+            parts, size = [], 0
+        parts.append(word)
+        size += len(word) + 1
+    if parts:
+        chunks.append(TranscriptChunk(' '.join(parts)))
+    return chunks
+
+
+def regroup_chunks(chunks: Sequence[TranscriptChunk], max_tokens: int = CHUNK_TOKENS) -> List[TranscriptChunk]:
+    """
+    Join consecutive chunks into chunks of at most `max_tokens` (estimated),
+    each spanning from its first chunk's start to its last chunk's end.
+    A chunk over the budget stays on its own.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    grouped: List[TranscriptChunk] = []
+    for chunk in chunks:
+        last = grouped[-1] if grouped else None
+        if last is not None and len(last.text) + len(chunk.text) + 2 <= max_chars:
+            grouped[-1] = TranscriptChunk(f"{last.text}\n\n{chunk.text}", last.start, chunk.end)
+        else:
+            grouped.append(TranscriptChunk(chunk.text, chunk.start, chunk.end))
+    return grouped
+
+
+class ChunkSummaryCache(ResultCache):
+    """Chunk notes by key (see TranscriptSummarizer._key)."""
+
+    def __init__(self, session_factory=None, max_local: int = LOCAL_CACHE_SIZE):
+        super().__init__(ChunkSummary, ['key'], 'summary', session_factory, max_local)
+
+
+class TranscriptSummarizer:
+    """
+    Map step of transcript summarization. `generate` sends one prompt to
+    the model named `model_name` and returns its text; the name is part of
+    every cache key.
+    """
+
+    def __init__(self, generate: Callable[[str], str], model_name: str,
+                 cache: Optional[ChunkSummaryCache] = None,
+                 chunk_tokens: int = CHUNK_TOKENS, single_pass_tokens: int = SINGLE_PASS_TOKENS,
+                 max_workers: int = MAP_WORKERS):
+        self.generate = generate
+        self.model_name = model_name
+        self.cache = cache or ChunkSummaryCache()
+        self.chunk_tokens = chunk_tokens
+        self.single_pass_tokens = single_pass_tokens
+        self.max_workers = max_workers
+
+    def _prompt(self, chunk: TranscriptChunk) -> str:
+        return MAP_PROMPT.format(span=chunk.span, text=chunk.text)
+
+    def _key(self, prompt: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{prompt}".encode('utf-8')).hexdigest()
+
+    def _summarize_chunk(self, prompt: str, chunk: TranscriptChunk) -> str:
+        try:
+            return self.generate(prompt).strip()
+        except Exception as e:
+            logger.warning(f"Chunk summary failed for {chunk.span}, keeping its text: {e}")
+            return ''
+
+    def map_chunks(self, chunks: Sequence[TranscriptChunk]) -> List[str]:
+        """Notes for every chunk: cached ones are reused, the rest are generated concurrently."""
+        prompts = [self._prompt(chunk) for chunk in chunks]
+        keys = [self._key(prompt) for prompt in prompts]
+        cached = self.cache.get_many(keys)
+
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as pool:
+                generated = list(pool.map(lambda i: self._summarize_chunk(prompts[i], chunks[i]), missing))
+            fresh = {keys[i]: summary for i, summary in zip(missing, generated) if summary}
+            cached.update(fresh)
+            self.cache.put_many(fresh)
+
+        logger.info(f"Transcript map step: {len(chunks)} chunks, {len(chunks) - len(missing)} from cache")
+        # A failed chunk falls back to its own text so nothing is silently dropped
+        return [cached.get(key) or chunk.text for key, chunk in zip(keys, chunks)]
+
+    def condense(self, transcript: Transcript) -> str:
+        """
+        Text to put in a final prompt: the transcript itself when it fits
+        SINGLE_PASS_TOKENS, otherwise time-labelled chunk notes, condensed
+        again if the notes are still over budget.
+        """
+        if isinstance(transcript, (str, VttTranscript)):
+            text = transcript if isinstance(transcript, str) else transcript.text
+            if estimate_tokens(text) <= self.single_pass_tokens:
+                return text
+            chunks = chunk_transcript(transcript, self.chunk_tokens)
+        else:
+            chunks = list(transcript)
+            text = ' '.join(chunk.text for chunk in chunks)
+            if estimate_tokens(text) <= self.single_pass_tokens:
+                return text
+
+        notes = [
+            TranscriptChunk(f"[{chunk.span}]\n{summary}", chunk.start, chunk.end)
+            for chunk, summary in zip(chunks, self.map_chunks(chunks))
+        ]
+        joined = '\n\n'.join(note.text for note in notes)
+        # Condense the notes again while that still shrinks them. Neighbouring
+        # notes are grouped as chunks, so every pass keeps its time spans.
+        if len(chunks) > 1 and len(joined) < len(text) and estimate_tokens(joined) > self.single_pass_tokens:
+            return self.condense(regroup_chunks(notes, self.chunk_tokens))
+        return joined
@@ -0,0 +1,208 @@
+"""
+Persistent transcript store.
+Captions and metadata transcripts are fetched once per (video ID, language)
+and kept zlib-compressed in Postgres with their source, fetch time and a
+content hash, so processing a video again does not re-run yt-dlp or the
+Data API. Videos found without captions are remembered for a while too,
+so they are not fetched again on every prefetch.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+
+import yt_dlp
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from .database import session_factory
+from .models import CaptionMiss, Transcript
+
+logger = logging.getLogger(__name__)
+
+SOURCE_CAPTIONS = 'captions'  # Raw WebVTT, parsed by consumers
+SOURCE_METADATA = 'metadata'  # Title and description text
+DEFAULT_LANG = 'en'
+CAPTION_VARIANTS = {'en': ['en', 'en-US', 'en-GB']}  # Requested language -> yt-dlp subtitle languages
+CAPTION_FETCH_TIMEOUT = int(os.getenv('CAPTION_FETCH_TIMEOUT', '60'))
+MIN_CAPTION_BYTES = 100  # Smaller files are empty WEBVTT headers
+# Automatic captions can appear hours after upload, so a miss is only trusted this long
+CAPTION_MISS_TTL = timedelta(hours=float(os.getenv('CAPTION_MISS_TTL_HOURS', '24')))
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class StoredTranscript:
+    video_id: str
+    lang: str
+    source: str
+    content: str
+    content_hash: str
+    fetched_at: Optional[datetime] = None
+
+    @property
+    def is_captions(self) -> bool:
+        return self.source == SOURCE_CAPTIONS
+
+
+def fetch_caption_vtt(video_id: str, lang: str = DEFAULT_LANG) -> Optional[str]:
+    """Download a video's captions (manual or automatic) with yt-dlp; returns the WebVTT text."""
+    languages = CAPTION_VARIANTS.get(lang, [lang])
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ydl_opts = {
+            'skip_download': True,
+            'writeautomaticsub': True,
+            'writesubtitles': True,
+            'subtitleslangs': languages,
+            'subtitlesformat': 'vtt',
+            'outtmpl': os.path.join(temp_dir, video_id),
+            'socket_timeout': CAPTION_FETCH_TIMEOUT,
+            'quiet': True,
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=True)
+
+        for variant in languages:
+            path = os.path.join(temp_dir, f"{video_id}.{variant}.vtt")
+            if os.path.exists(path) and os.path.getsize(path) > MIN_CAPTION_BYTES:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return f.read()
+    return None
+
+
+class TranscriptStore:
+    """
+    Transcripts keyed by (video_id, lang). One row per key: fetched captions
+    replace a metadata transcript, but a metadata transcript never replaces
+    captions. Caption fetches that found nothing are recorded in
+    caption_misses and not repeated within `miss_ttl`.
+    """
+
+    def __init__(self, session_factory, miss_ttl: timedelta = CAPTION_MISS_TTL):
+        self.SessionLocal = session_factory
+        self.miss_ttl = miss_ttl
+
+    @classmethod
+    def from_url(cls, database_url: str) -> 'TranscriptStore':
+        """Store on its own engine for `database_url`."""
+        return cls(session_factory(database_url))
+
+    def get(self, video_id: str, lang: str = DEFAULT_LANG) -> Optional[StoredTranscript]:
+        with self.SessionLocal() as session:
+            row = session.get(Transcript, (video_id, lang))
+            if row is None:
+                return None
+            return StoredTranscript(
+                video_id=row.video_id,
+                lang=row.lang,
+                source=row.source,
+                content=zlib.decompress(row.content).decode('utf-8'),
+                content_hash=row.content_hash,
+                fetched_at=row.fetched_at,
+            )
+
+    def put(self, video_id: str, content: str, source: str, lang: str = DEFAULT_LANG) -> StoredTranscript:
+        """Insert or refresh a transcript and its hash, compressed."""
+        digest = content_hash(content)
+        values = {
+            'source': source,
+            'content': zlib.compress(content.encode('utf-8')),
+            'content_hash': digest,
+            'char_count': len(content),
+            'fetched_at': func.now(),
+        }
+        statement = pg_insert(Transcript).values(video_id=video_id, lang=lang, **values)
+        statement = statement.on_conflict_do_update(
+            index_elements=['video_id', 'lang'],
+            set_=values,
+            # Captions always win; a metadata transcript only refreshes another one
+            where=None if source == SOURCE_CAPTIONS else Transcript.source != SOURCE_CAPTIONS,
+        )
+        with self.SessionLocal() as session:
+            session.execute(statement)
+            if source == SOURCE_CAPTIONS:
+                session.query(CaptionMiss).filter(
+                    CaptionMiss.video_id == video_id, CaptionMiss.lang == lang
+                ).delete(synchronize_session=False)
+            session.commit()
+        return StoredTranscript(video_id, lang, source, content, digest)
+
+    def record_miss(self, video_id: str, lang: str = DEFAULT_LANG):
+        """Remember that a caption fetch found nothing, restarting the miss TTL."""
+        with self.SessionLocal() as session:
+            session.execute(pg_insert(CaptionMiss).values(
+                video_id=video_id, lang=lang, checked_at=func.now()
+            ).on_conflict_do_update(
+                index_elements=['video_id', 'lang'], set_={'checked_at': func.now()}
+            ))
+            session.commit()
+
+    def recent_misses(self, video_ids: Iterable[str], lang: str = DEFAULT_LANG) -> List[str]:
+        """The videos among `video_ids` whose captions were missing within the miss TTL."""
+        video_ids = list(dict.fromkeys(video_ids))
+        if not video_ids:
+            return []
+        cutoff = datetime.now(timezone.utc) - self.miss_ttl
+        with self.SessionLocal() as session:
+            return [video_id for (video_id,) in session.query(CaptionMiss.video_id).filter(
+                CaptionMiss.video_id.in_(video_ids),
+                CaptionMiss.lang == lang,
+                CaptionMiss.checked_at >= cutoff,
+            )]
+
+    def captions(self, video_id: str, lang: str = DEFAULT_LANG, fetch: bool = True) -> Optional[str]:
+        """
+        Stored WebVTT captions, fetched with yt-dlp and stored on a miss when
+        `fetch` is set. A video that had no captions within the miss TTL is
+        not fetched again.
+        """
+        stored = self.get(video_id, lang)
+        if stored and stored.is_captions:
+            return stored.content
+        if not fetch or self.recent_misses([video_id], lang):
+            return None
+
+        vtt = fetch_caption_vtt(video_id, lang)
+        if vtt:
+            self.put(video_id, vtt, SOURCE_CAPTIONS, lang)
+        else:
+            self.record_miss(video_id, lang)
+        return vtt
+
+    def missing_captions(self, video_ids: Iterable[str], lang: str = DEFAULT_LANG) -> List[str]:
+        """The videos among `video_ids` with no stored captions and no recent miss."""
+        video_ids = list(dict.fromkeys(video_ids))
+        if not video_ids:
+            return []
+        with self.SessionLocal() as session:
+            stored = {video_id for (video_id,) in session.query(Transcript.video_id).filter(
+                Transcript.video_id.in_(video_ids),
+                Transcript.lang == lang,
+                Transcript.source == SOURCE_CAPTIONS,
+            )}
+        missed = set(self.recent_misses([video_id for video_id in video_ids if video_id not in stored], lang))
+        return [video_id for video_id in video_ids if video_id not in stored and video_id not in missed]
+
+    def prefetch(self, video_ids: Iterable[str], lang: str = DEFAULT_LANG) -> int:
+        """
+        Fetch and store captions for the videos that have none yet and were
+        not found without captions recently. Returns how many were stored.
+        """
+        stored = 0
+        for video_id in self.missing_captions(video_ids, lang):
+            try:
+                if self.captions(video_id, lang):
+                    stored += 1
+                else:
+                    logger.info(f"No {lang} captions available for {video_id}")
+            except Exception as e:
+                logger.warning(f"Caption prefetch failed for {video_id}: {e}")
+        return stored
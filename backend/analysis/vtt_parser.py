@@ -0,0 +1,169 @@
+"""
+Streaming WebVTT parser for YouTube caption files.
+Cues are read line by line, so a multi-hour caption file never has to be
+held in memory. YouTube auto-captions roll: every cue repeats the tail of
+the previous one before adding new words, so only the new words of each
+cue are kept. Cue timings are stored in compact parallel arrays for
+time-aligned lookups.
+"""
+
+import bisect
+import html
+import re
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+_TIMESTAMP = r'(?:(\d+):)?(\d{2}):(\d{2})[.,](\d{3})'
+CUE_TIMING = re.compile(rf'^\s*{_TIMESTAMP}\s+-->\s+{_TIMESTAMP}')
+CUE_TAG = re.compile(r'<[^>]*>')  # <c>, <i>, <00:00:01.240> word timings, ...
+
+# Longest repeated run looked for at the start of a cue; rolling captions
+# repeat one caption line, well under this
+MAX_OVERLAP_WORDS = 32
+
+
+def _seconds(hours: Optional[str], minutes: str, seconds: str, millis: str) -> float:
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds) + int(millis) / 1000
+
+
+def clean_cue_line(line: str) -> str:
+    """Strip markup tags and entities from one cue payload line."""
+    if '<' in line:
+        line = CUE_TAG.sub('', line)
+    if '&' in line:
+        line = html.unescape(line)
+    return line.strip()
+
+
+def _iter_cue_blocks(lines: Iterable[str]) -> Iterator[Tuple[re.Match, str]]:
+    """Yield (timing match, cleaned text) per cue; timings are converted lazily."""
+    timing = None
+    payload: List[str] = []
+
+    for line in lines:
+        if not line.rstrip('\r\n'):
+            # An empty line ends the block; whitespace-only lines are cue text
+            if timing is not None and payload:
+                yield timing, ' '.join(payload)
+            timing = None
+            payload = []
+            continue
+
+        if timing is None:
+            if '-->' in line:
+                timing = CUE_TIMING.match(line)
+            continue
+
+        text = clean_cue_line(line)
+        if text:
+            payload.append(text)
+
+    if timing is not None and payload:
+        yield timing, ' '.join(payload)
+
+
+def _cue_times(timing: re.Match) -> Tuple[float, float]:
+    parts = timing.groups()
+    return _seconds(*parts[:4]), _seconds(*parts[4:])
+
+
+def iter_cues(lines: Iterable[str]) -> Iterator[Tuple[float, float, str]]:
+    """
+    Yield (start, end, text) for every cue, as written in the file.
+
+    Blocks without a timing line (the WEBVTT header, NOTE, STYLE, REGION)
+    are skipped, as are cue identifiers before the timing line.
+    """
+    for timing, text in _iter_cue_blocks(lines):
+        yield (*_cue_times(timing), text)
+
+
+def _overlap(tail: List[str], words: List[str]) -> int:
+    """Length of the longest run that ends `tail` and starts `words`."""
+    first = words[0]
+    size = len(tail)
+    for length in range(min(size, len(words)), 0, -1):
+        if tail[size - length] == first and tail[size - length:] == words[:length]:
+            return length
+    return 0
+
+
+@dataclass
+class VttTranscript:
+    """
+    De-duplicated caption text with per-cue timings.
+
+    Cue i covers starts[i]..ends[i] seconds and contributed
+    text[offsets[i]:offsets[i + 1]]. Cues that only repeated earlier words
+    are dropped, so every stored cue has text.
+    """
+    text: str = ''
+    starts: array = field(default_factory=lambda: array('d'))
+    ends: array = field(default_factory=lambda: array('d'))
+    offsets: array = field(default_factory=lambda: array('q'))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def cue_text(self, index: int) -> str:
+        end = self.offsets[index + 1] if index + 1 < len(self.offsets) else len(self.text)
+        return self.text[self.offsets[index]:end].strip()
+
+    def cues(self) -> Iterator[Tuple[float, float, str]]:
+        for index in range(len(self)):
+            yield self.starts[index], self.ends[index], self.cue_text(index)
+
+    def cue_at(self, seconds: float) -> int:
+        """Index of the last cue starting at or before `seconds`, or -1."""
+        return bisect.bisect_right(self.starts, seconds) - 1
+
+    def text_between(self, start: float, end: float) -> str:
+        """Text of the cues that start within [start, end)."""
+        first = bisect.bisect_left(self.starts, start)
+        last = bisect.bisect_left(self.starts, end)
+        if first >= last:
+            return ''
+        stop = self.offsets[last] if last < len(self.offsets) else len(self.text)
+        return self.text[self.offsets[first]:stop].strip()
+
+
+def parse_vtt(source: Union[str, Iterable[str]]) -> VttTranscript:
+    """
+    Parse WebVTT content (a string, or any iterable of lines such as an open
+    file) into a VttTranscript, dropping words repeated by rolling captions.
+    """
+    lines = source.splitlines() if isinstance(source, str) else source
+    transcript = VttTranscript()
+    words: List[str] = []
+    length = 0  # Characters in ' '.join(words)
+
+    for timing, text in _iter_cue_blocks(lines):
+        cue_words = text.split()
+        if not cue_words:
+            continue
+        new_words = cue_words[_overlap(words[-MAX_OVERLAP_WORDS:], cue_words):]
+        if not new_words:
+            continue
+
+        # Only cues that add words get their timings parsed
+        start, end = _cue_times(timing)
+        transcript.starts.append(start)
+        transcript.ends.append(end)
+        transcript.offsets.append(length)
+        length += len(' '.join(new_words)) + (1 if words else 0)
+        words.extend(new_words)
+
+    transcript.text = ' '.join(words)
+    return transcript
+
+
+def load_vtt(path: str) -> VttTranscript:
+    """Stream a caption file from disk into a VttTranscript."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_vtt(f)
+
+
+def parse_vtt_file(vtt_content: str) -> str:
+    """Clean, de-duplicated transcript text of WebVTT content."""
+    return parse_vtt(vtt_content).text
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark the routed analyzer queues against the old single `celery` queue.
+Runs in-process workers on Celery's in-memory broker (a stand-in for
+Redis, so no server is needed) with sleep-based stand-ins
+for the real tasks, and reports throughput and queue wait per queue.
+
+The workload is a burst of long downloads submitted ahead of many short
+frame batches and a few synthesis callbacks, as when several videos are
+queued at once.
+
+Usage:
+    python benchmark_celery_queues.py [downloads] [frame_batches]
+"""
+
+import statistics
+import sys
+import threading
+import time
+
+from celery import Celery
+from celery.contrib.testing.worker import start_worker
+from kombu.transport import memory
+
+from youtube_analyzer.app.celery_queues import (
+    QUEUE_DOWNLOAD, QUEUE_FRAMES, QUEUE_PROFILES, QUEUE_SYNTHESIS, celery_settings,
+)
+
+DEFAULT_DOWNLOADS = 12
+DEFAULT_FRAME_BATCHES = 200
+SYNTHESES = 6
+
+# Seconds per task; scaled down from minutes (download) and seconds (frames)
+TASK_SECONDS = {QUEUE_DOWNLOAD: 1.0, QUEUE_FRAMES: 0.02, QUEUE_SYNTHESIS: 0.1}
+TASK_NAMES = {queue: profile.tasks[0] for queue, profile in QUEUE_PROFILES.items()}
+
+DRAIN_TIMEOUT = 0.02
+
+# (queue, wait, finished) per completed task, shared by every worker thread
+completed = []
+completed_changed = threading.Condition()
+
+
+class StandInTransport(memory.Transport):
+    """
+    In-memory transport whose drain returns quickly. Celery's blocking
+    worker loop drains with a 2s timeout and only frees its prefetch window
+    between drains; Redis wakes the worker as soon as a slot frees, the
+    polling memory transport would sit out the full 2s.
+    """
+
+    def drain_events(self, connection, timeout=None):
+        return super().drain_events(connection, timeout=min(timeout or DRAIN_TIMEOUT, DRAIN_TIMEOUT))
+
+
+def make_app(routed: bool) -> Celery:
+    """
+    One app per worker: a worker's queue selection is app-wide. The
+    in-memory broker is shared by every connection in the process.
+    """
+    app = Celery('benchmark', broker='memory://', broker_transport=StandInTransport)
+    if routed:
+        app.conf.update(celery_settings())
+    else:
+        app.conf.update(task_default_queue='celery')
+    app.conf.task_ignore_result = True
+    # Redis pushes messages; the in-memory transport polls, once a second by default
+    app.conf.broker_transport_options = {**app.conf.broker_transport_options, 'polling_interval': 0.005}
+
+    for queue, name in TASK_NAMES.items():
+        def stand_in(submitted: float, queue: str = queue):
+            started = time.time()
+            time.sleep(TASK_SECONDS[queue])
+            with completed_changed:
+                completed.append((queue, started - submitted, time.time()))
+                completed_changed.notify()
+        app.task(name=name)(stand_in)
+    return app
+
+
+def start_workers(routed: bool):
+    """Per-queue workers with their profiles, or one worker with the same total threads."""
+    # The in-memory broker only works within one process, so every pool runs threads
+    if routed:
+        return [
+            start_worker(make_app(True), pool='threads', concurrency=profile.concurrency, queues=[queue],
+                         prefetch_multiplier=profile.prefetch_multiplier, perform_ping_check=False)
+            for queue, profile in QUEUE_PROFILES.items()
+        ]
+    total = sum(profile.concurrency for profile in QUEUE_PROFILES.values())
+    return [start_worker(make_app(False), pool='threads', concurrency=total, queues=['celery'],
+                         prefetch_multiplier=4, perform_ping_check=False)]
+
+
+def run(routed: bool, downloads: int, frame_batches: int):
+    client = make_app(routed)
+    counts = {QUEUE_DOWNLOAD: downloads, QUEUE_FRAMES: frame_batches, QUEUE_SYNTHESIS: SYNTHESES}
+    total = sum(counts.values())
+    completed.clear()
+
+    contexts = start_workers(routed)
+    for context in contexts:
+        context.__enter__()
+    try:
+        started = time.time()
+        for queue, count in counts.items():
+            task = client.tasks[TASK_NAMES[queue]]
+            for _ in range(count):
+                task.delay(time.time())
+        with completed_changed:
+            completed_changed.wait_for(lambda: len(completed) >= total, timeout=600)
+    finally:
+        for context in reversed(contexts):
+            context.__exit__(None, None, None)
+
+    print(f"\n{'routed queues' if routed else 'single celery queue'}:")
+    for queue in [q for q in counts if counts[q]]:
+        waits = sorted(wait for name, wait, _ in completed if name == queue)
+        elapsed = max(finished for name, _, finished in completed if name == queue) - started
+        print(f"  {queue:15s} {len(waits):4d} tasks in {elapsed:6.2f}s ({len(waits) / elapsed:7.1f}/s)  "
+              f"wait median {statistics.median(waits):5.2f}s  max {waits[-1]:5.2f}s")
+
+
+def main():
+    downloads = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DOWNLOADS
+    frame_batches = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_FRAME_BATCHES
+    run(False, downloads, frame_batches)
+    run(True, downloads, frame_batches)
+
+
+if __name__ == '__main__':
+    main()
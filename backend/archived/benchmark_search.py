@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark GolfDirectory.search_videos against the old LIKE-based search.
+Builds a synthetic 200k-video catalog in a scratch PostgreSQL database.
+
+Usage:
+    BENCHMARK_DATABASE_URL=postgresql://postgres:pw@localhost/golf_bench python benchmark_search.py
+"""
+
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import create_engine, desc, insert
+from sqlalchemy.orm import sessionmaker
+from youtube_analyzer.app.database import Base
+from youtube_analyzer.app.models import YouTubeVideo, YouTubeChannel
+from youtube_analyzer.app.golf_directory import GolfDirectory
+
+CATALOG_SIZE = 200_000
+BATCH_SIZE = 5_000
+QUERIES = ["driver review", "putting tips", "hole in one", "masters highlights", "course vlog"]
+CATEGORIES = ['instruction', 'equipment', 'tour', 'highlights', 'vlog', 'news', 'general']
+
+WORDS = (
+    "golf swing driver iron wedge putter putting chipping tips lesson review masters "
+    "open championship tour highlights eagle birdie bogey hole in one vlog course "
+    "challenge match scramble range practice beginner pro amateur distance speed"
+).split()
+
+
+def build_catalog(engine):
+    """Populate the scratch database with synthetic channels and videos."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    channels = [{'id': f"UC{i:06d}", 'title': f"Golf Channel {i}"} for i in range(2_000)]
+
+    with engine.begin() as conn:
+        conn.execute(insert(YouTubeChannel), channels)
+        for start in range(0, CATALOG_SIZE, BATCH_SIZE):
+            rows = []
+            for i in range(start, min(start + BATCH_SIZE, CATALOG_SIZE)):
+                rows.append({
+                    'id': f"v{i:09d}",
+                    'title': " ".join(rng.choices(WORDS, k=8)).title(),
+                    'description': " ".join(rng.choices(WORDS, k=80)),
+                    'channel_id': rng.choice(channels)['id'],
+                    'published_at': now - timedelta(days=rng.randint(0, 2000)),
+                    'view_count': rng.randint(0, 5_000_000),
+                    'category': rng.choice(CATEGORIES),
+                })
+            conn.execute(insert(YouTubeVideo), rows)
+    print(f"Built synthetic catalog of {CATALOG_SIZE:,} videos")
+
+
+def legacy_search(SessionLocal, query, category=None):
+    """The previous LIKE '%q%' implementation, kept here for comparison."""
+    with SessionLocal() as session:
+        search = session.query(YouTubeVideo).filter(
+            (YouTubeVideo.title.contains(query)) |
+            (YouTubeVideo.description.contains(query))
+        )
+        if category:
+            search = search.filter(YouTubeVideo.category == category)
+        return search.order_by(desc(YouTubeVideo.view_count)).limit(50).all()
+
+
+def time_calls(fn, runs=5):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run_benchmark():
+    url = os.getenv('BENCHMARK_DATABASE_URL')
+    if not url:
+        print("Set BENCHMARK_DATABASE_URL to a scratch PostgreSQL database")
+        return
+
+    engine = create_engine(url)
+    SessionLocal = sessionmaker(bind=engine)
+    build_catalog(engine)
+
+    directory = GolfDirectory.__new__(GolfDirectory)
+    directory.SessionLocal = SessionLocal
+
+    print(f"\n{'query':<22}{'category':<14}{'LIKE ms':>10}{'FTS ms':>10}")
+    for query in QUERIES:
+        for category in (None, 'instruction'):
+            like_ms = time_calls(lambda: legacy_search(SessionLocal, query, category))
+            fts_ms = time_calls(lambda: directory.search_videos(query, category))
+            print(f"{query:<22}{category or '-':<14}{like_ms:>10.1f}{fts_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Measure the graphic pre-filter against a labeled local frame set.
+
+The frame set is a directory with two subdirectories of JPEGs:
+    <frames>/graphic/     frames that show a scoreboard or other overlay
+    <frames>/no_graphic/  frames that don't
+
+Prints precision, recall and the share of model calls saved for a sweep of
+thresholds, and records the results (plus the highest threshold that keeps
+recall at or above --min-recall) to <frames>/graphic_filter_eval.json.
+
+Usage:
+    python evaluate_graphic_filter.py path/to/labeled_frames [--min-recall 0.95]
+"""
+
+import argparse
+import json
+import os
+import time
+from youtube_analyzer.app.graphic_filter import graphic_score, GRAPHIC_THRESHOLD
+
+THRESHOLDS = [round(0.05 * i, 2) for i in range(1, 17)]
+
+
+def load_scores(frames_dir):
+    """Score every labeled frame once; returns [(score, is_graphic)]."""
+    scored = []
+    for label, is_graphic in (('graphic', True), ('no_graphic', False)):
+        label_dir = os.path.join(frames_dir, label)
+        for name in sorted(os.listdir(label_dir)):
+            if name.lower().endswith(('.jpg', '.jpeg', '.png')):
+                scored.append((graphic_score(os.path.join(label_dir, name)), is_graphic))
+    return scored
+
+
+def evaluate(scored, threshold):
+    tp = sum(1 for score, graphic in scored if score >= threshold and graphic)
+    fp = sum(1 for score, graphic in scored if score >= threshold and not graphic)
+    fn = sum(1 for score, graphic in scored if score < threshold and graphic)
+    sent = tp + fp
+    return {
+        'threshold': threshold,
+        'precision': tp / sent if sent else 1.0,
+        'recall': tp / (tp + fn) if tp + fn else 1.0,
+        'calls_sent': sent,
+        'calls_saved': 1 - sent / len(scored) if scored else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('frames_dir')
+    parser.add_argument('--min-recall', type=float, default=0.95)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    scored = load_scores(args.frames_dir)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    positives = sum(1 for _, graphic in scored if graphic)
+    print(f"Scored {len(scored)} frames ({positives} with graphics) "
+          f"in {elapsed_ms:.0f} ms ({elapsed_ms / max(len(scored), 1):.2f} ms/frame)\n")
+
+    results = [evaluate(scored, threshold) for threshold in THRESHOLDS]
+    print(f"{'threshold':>10}{'precision':>11}{'recall':>9}{'sent':>7}{'saved':>8}")
+    for r in results:
+        marker = '  <- current' if abs(r['threshold'] - GRAPHIC_THRESHOLD) < 1e-9 else ''
+        print(f"{r['threshold']:>10.2f}{r['precision']:>11.3f}{r['recall']:>9.3f}"
+              f"{r['calls_sent']:>7}{r['calls_saved']:>8.1%}{marker}")
+
+    eligible = [r for r in results if r['recall'] >= args.min_recall]
+    recommended = max(eligible, key=lambda r: r['threshold']) if eligible else None
+    if recommended:
+        print(f"\nRecommended GRAPHIC_THRESHOLD={recommended['threshold']} "
+              f"(recall {recommended['recall']:.3f}, {recommended['calls_saved']:.1%} calls saved)")
+
+    output_path = os.path.join(args.frames_dir, 'graphic_filter_eval.json')
+    with open(output_path, 'w') as f:
+        json.dump({
+            'frames': len(scored),
+            'positives': positives,
+            'current_threshold': GRAPHIC_THRESHOLD,
+            'min_recall': args.min_recall,
+            'recommended': recommended,
+            'results': results,
+        }, f, indent=2)
+    print(f"Results written to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Load test for the analyzer API's submission endpoint.
+Sends concurrent POST /analyze-video/ requests and reports p50/p99
+latency, separately for new submissions (insert and dispatch) and
+duplicates (one statement, no dispatch).
+
+Every new URL queues a real analysis task, so point this at a test
+deployment. By default a small set of URLs is submitted repeatedly: the
+first request for each is new, the rest are duplicates.
+
+Usage:
+    python loadtest_analyzer_api.py [--url http://localhost:8000] [--requests 2000]
+        [--concurrency 50] [--videos 20] [--unique]
+"""
+
+import argparse
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def percentile(ordered, q: float) -> float:
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def submit(session: requests.Session, api_url: str, video_url: str):
+    started = time.perf_counter()
+    response = session.post(f"{api_url}/analyze-video/", json={"youtube_url": video_url}, timeout=30)
+    elapsed = time.perf_counter() - started
+    status = response.json().get("status", "") if response.ok else f"HTTP {response.status_code}"
+    return elapsed, status
+
+
+def report(label: str, latencies):
+    if not latencies:
+        return
+    ordered = sorted(latencies)
+    print(f"  {label:10s} {len(ordered):6d} requests  p50 {percentile(ordered, 0.5) * 1000:7.1f} ms  "
+          f"p99 {percentile(ordered, 0.99) * 1000:7.1f} ms  max {ordered[-1] * 1000:7.1f} ms  "
+          f"mean {statistics.mean(ordered) * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--videos", type=int, default=20, help="distinct URLs cycled through")
+    parser.add_argument("--unique", action="store_true", help="make every request a new submission")
+    args = parser.parse_args()
+
+    # Submissions must be valid 11-character video IDs; the run prefix keeps runs apart
+    run_id = uuid.uuid4().hex[:4]
+    distinct = args.requests if args.unique else args.videos
+    video_urls = [f"https://www.youtube.com/watch?v={run_id}{i % distinct:07d}" for i in range(args.requests)]
+
+    # One keep-alive session per worker thread, as real clients would hold
+    local = threading.local()
+    def run(video_url):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return submit(local.session, args.url, video_url)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(run, video_urls))
+    elapsed = time.perf_counter() - started
+
+    new = [latency for latency, status in results if status == "QUEUED"]
+    duplicate = [latency for latency, status in results if status.startswith("DUPLICATE")]
+    failed = [status for _, status in results if status != "QUEUED" and not status.startswith("DUPLICATE")]
+
+    print(f"{len(results)} submissions in {elapsed:.1f}s ({len(results) / elapsed:.0f}/s) "
+          f"at concurrency {args.concurrency}")
+    report("all", [latency for latency, _ in results])
+    report("new", new)
+    report("duplicate", duplicate)
+    if failed:
+        print(f"  {len(failed)} failed, first: {failed[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""
+Archived YouTube golf video analyzer. Transcript, summarization and Gemini
+code it shares with the live backend lives in backend/analysis; the backend
+directory is made importable here so the app, its worker and its scripts
+run from backend/archived as before.
+"""
+
+import os
+import sys
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _BACKEND_DIR not in sys.path:
+    sys.path.append(_BACKEND_DIR)
@@ -1,14 +1,18 @@
 import os
-import time
+import io
+import json
+import base64
+from typing import Union
 import google.generativeai as genai
 from PIL import Image
+from analysis.gemini_client import get_gemini_client
+from analysis.summarizer import ChunkSummaryCache, TranscriptSummarizer
+from .database import SessionLocal
+from .frame_cache import FrameResultCache, frame_key, sha256_hex
 
-def configure_genai():
-    """Configures the Gemini API key."""
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise ValueError("GOOGLE_API_KEY environment variable not set.")
-    genai.configure(api_key=api_key)
+ANALYSIS_MODEL_NAME = 'gemini-1.5-pro-latest'  # Long-context synthesis and direct video analysis
+DIRECT_ANALYSIS_TIMEOUT_SECONDS = 1800
+TRANSCRIBE_MODEL_NAME = 'gemini-1.5-flash-latest'
 
 def transcribe_audio(audio_path: str) -> str:
     """
@@ -20,29 +24,96 @@ def transcribe_audio(audio_path: str) -> str:
     Returns:
         The transcribed text.
     """
-    configure_genai()
+    client = get_gemini_client()
     
     print(f"Uploading audio file: {audio_path}")
-    audio_file = genai.upload_file(path=audio_path)
+    # Waits, with backoff, until Gemini has processed the file
+    audio_file = client.upload_file(audio_path)
 
-    # The Gemini file processing can take a moment, so we wait until it's ready.
-    while audio_file.state.name == "PROCESSING":
-        print("Waiting for audio processing...")
-        time.sleep(10)
-        audio_file = genai.get_file(name=audio_file.name)
-
-    if audio_file.state.name == "FAILED":
-        raise ValueError("Audio processing failed.")
-
-    model = genai.GenerativeModel('gemini-1.5-flash-latest')
     try:
-        response = model.generate_content(["Transcribe this audio.", audio_file])
-        # It's good practice to free up the file on the server once we're done.
-        genai.delete_file(name=audio_file.name)
-        return response.text
+        return client.generate_text(TRANSCRIBE_MODEL_NAME, ["Transcribe this audio.", audio_file])
     except Exception as e:
         print(f"Error transcribing audio: {e}")
         return f"Error transcribing audio: {e}"
+    finally:
+        # It's good practice to free up the file on the server once we're done.
+        client.delete_file(audio_file.name)
+
+FRAME_MODEL_NAME = 'gemini-1.5-flash-latest'
+BATCH_FRAME_SIZE = (960, 540)  # Still legible for scoreboard OCR, a quarter of the image tokens of 1080p
+
+FRAME_BATCH_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "index": {"type": "integer"},
+            "has_graphic": {"type": "boolean"},
+            "extracted_text": {"type": "string"},
+        },
+        "required": ["index", "has_graphic"],
+    },
+}
+
+# Frame results by (frame bytes, prompt, model); re-analysis only pays for changed frames
+frame_cache = FrameResultCache(SessionLocal)
+
+SUMMARY_MODEL_NAME = 'gemini-1.5-flash-latest'  # Map step of transcript summarization
+_transcript_summarizer = None
+
+def get_transcript_summarizer() -> TranscriptSummarizer:
+    """Returns the module-level transcript summarizer; chunk notes are cached in Postgres."""
+    global _transcript_summarizer
+    if _transcript_summarizer is None:
+        client = get_gemini_client()
+        _transcript_summarizer = TranscriptSummarizer(
+            lambda prompt: client.generate_text(SUMMARY_MODEL_NAME, prompt),
+            SUMMARY_MODEL_NAME, ChunkSummaryCache(SessionLocal)
+        )
+    return _transcript_summarizer
+
+def encode_frame_bytes(img: Image.Image, max_size: tuple = BATCH_FRAME_SIZE, quality: int = 85) -> bytes:
+    """
+    JPEG bytes of an in-memory frame as sent to the model. Persisted frames
+    are these same bytes, so re-analysis hits the frame cache.
+    """
+    img = img.copy()
+    img.thumbnail(max_size)
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+def frame_data_uri(data: bytes) -> str:
+    """Wraps encoded JPEG bytes as a data: URI that can be carried as a string."""
+    return "data:image/jpeg;base64," + base64.b64encode(data).decode("ascii")
+
+def read_frame(image_path: str) -> bytes:
+    """Encoded bytes of a frame file or of a data: URI produced by frame_data_uri."""
+    if image_path.startswith("data:"):
+        return base64.b64decode(image_path.split(",", 1)[1])
+    if not os.path.exists(image_path):
+        raise FileNotFoundError(f"Image file not found: {image_path}")
+    with open(image_path, "rb") as f:
+        return f.read()
+
+def frame_label(image_path: str) -> str:
+    """Short name of a frame for logs: its path, or a hash prefix of a data: URI."""
+    if image_path.startswith("data:"):
+        return f"inline frame {sha256_hex(image_path.encode('ascii'))[:12]}"
+    return image_path
+
+def load_frame(image: Union[str, bytes], max_size: tuple = None) -> Image.Image:
+    """
+    Decodes an image once (raising on corrupt files), optionally downscaled.
+    Accepts a file path, a data: URI produced by frame_data_uri, or bytes from read_frame.
+    """
+    img = Image.open(io.BytesIO(image if isinstance(image, bytes) else read_frame(image)))
+    if max_size:
+        img.draft("RGB", max_size)  # Let the JPEG decoder downscale first
+    img.load()
+    if max_size:
+        img.thumbnail(max_size)
+    return img
 
 def analyze_frame(image_path: str, prompt: str) -> str:
     """
@@ -53,41 +124,79 @@ def analyze_frame(image_path: str, prompt: str) -> str:
         prompt: The text prompt to guide the analysis.
 
     Returns:
-        The text response from the model.
+        The text response from the model, from the frame cache when this
+        frame was already analyzed with the same prompt and model.
+    """
+    try:
+        data = read_frame(image_path)
+        key = frame_key(data, prompt, FRAME_MODEL_NAME)
+        cached = frame_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        # Transient API errors are retried with backoff by the client
+        text = get_gemini_client().generate_text(FRAME_MODEL_NAME, [prompt, load_frame(data)])
+        if text:
+            frame_cache.put(key, text)
+            return text
+        print(f"Empty response from AI for {frame_label(image_path)}")
+        return "Error: Empty response from AI"
+    except Exception as e:
+        print(f"Error analyzing {frame_label(image_path)}: {e}")
+        return f"Error analyzing frame: {e}"
+
+def analyze_frames_batch(image_paths: list[str], prompt: str) -> list[dict]:
+    """
+    Analyzes several frames in one Gemini request.
+
+    Each image is decoded once, downscaled to BATCH_FRAME_SIZE and labeled
+    "Frame <index>:" in the request. The model answers with a JSON array
+    following FRAME_BATCH_SCHEMA. Frames already analyzed with the same
+    prompt and model come from the frame cache and are not sent.
+
+    Args:
+        image_paths: Paths of the frames to send together.
+        prompt: Instructions describing what to extract for each frame.
+
+    Returns:
+        The parsed list of {"index", "has_graphic", "extracted_text"} objects.
     """
-    configure_genai()
-    model = genai.GenerativeModel('gemini-1.5-flash-latest')
+    frames = [read_frame(image_path) for image_path in image_paths]
+    # The downscale size changes what the model sees, so it is part of the key
+    cache_prompt = f"{prompt}\0{BATCH_FRAME_SIZE}"
+    keys = [frame_key(data, cache_prompt, FRAME_MODEL_NAME) for data in frames]
+    cached = frame_cache.get_many(keys)
+    
+    entries = [{**json.loads(cached[key]), "index": index} for index, key in enumerate(keys) if key in cached]
+    missing = [index for index, key in enumerate(keys) if key not in cached]
+    if not missing:
+        return entries
+    
+    # Uncached frames are labeled by their position in this request
+    contents = [prompt]
+    for position, index in enumerate(missing):
+        contents.append(f"Frame {position}:")
+        contents.append(load_frame(frames[index], BATCH_FRAME_SIZE))
+    
+    generation_config = genai.GenerationConfig(
+        response_mime_type="application/json",
+        response_schema=FRAME_BATCH_SCHEMA,
+    )
     
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            # Verify image exists and is valid
-            if not os.path.exists(image_path):
-                raise FileNotFoundError(f"Image file not found: {image_path}")
-            
-            img = Image.open(image_path)
-            # Verify image can be loaded
-            img.verify()
-            # Reopen image for processing since verify() invalidates it
-            img = Image.open(image_path)
-            
-            response = model.generate_content([prompt, img])
-            
-            if response.text:
-                return response.text
-            else:
-                print(f"Empty response from AI for frame {image_path}, attempt {attempt + 1}")
-                if attempt == max_retries - 1:
-                    return "Error: Empty response from AI"
-                time.sleep(2)  # Wait before retry
-                
-        except Exception as e:
-            print(f"Error analyzing frame {image_path} (attempt {attempt + 1}/{max_retries}): {e}")
-            if attempt == max_retries - 1:
-                return f"Error analyzing frame after {max_retries} attempts: {e}"
-            time.sleep(2)  # Wait before retry
+    # Transient API errors are retried with backoff by the client; anything else raises
+    response = get_gemini_client().generate(FRAME_MODEL_NAME, contents, generation_config=generation_config)
+    parsed = json.loads(response.text)
     
-    return "Error: Maximum retries exceeded"
+    fresh = {}
+    for entry in parsed if isinstance(parsed, list) else []:
+        position = entry.get("index") if isinstance(entry, dict) else None
+        if isinstance(position, int) and 0 <= position < len(missing):
+            index = missing[position]
+            result = {"has_graphic": bool(entry.get("has_graphic")), "extracted_text": entry.get("extracted_text")}
+            fresh[keys[index]] = json.dumps(result)
+            entries.append({**result, "index": index})
+    frame_cache.put_many(fresh)
+    return entries
 
 def analyze_golf_video_direct(video_file_path: str) -> str:
     """
@@ -100,21 +209,13 @@ def analyze_golf_video_direct(video_file_path: str) -> str:
     Returns:
         A JSON string with the final golf analysis
     """
-    configure_genai()
+    client = get_gemini_client()
     
     print(f"Uploading video file: {video_file_path}...")
-    video_file = genai.upload_file(path=video_file_path)
+    # Waits, with backoff, until Gemini has processed the file
+    video_file = client.upload_file(video_file_path)
     print("Upload complete.")
 
-    # Wait for processing
-    while video_file.state.name == "PROCESSING":
-        print("Waiting for video processing...")
-        time.sleep(10)
-        video_file = genai.get_file(name=video_file.name)
-
-    if video_file.state.name == "FAILED":
-        raise ValueError("Video processing failed.")
-
     prompt = """
 Analyze this golf video to extract final scores and key tournament information.
 
@@ -142,39 +243,33 @@ Focus on accuracy. If you're unsure about a score, indicate lower confidence.
 """
     
     print("Sending multimodal request to Gemini...")
-    model = genai.GenerativeModel('gemini-1.5-pro-latest')
-    
     try:
-        response = model.generate_content([prompt, video_file], 
-                                          request_options={'timeout': 1800})
-        
-        # Clean up the uploaded file
-        genai.delete_file(video_file.name)
-        print(f"Deleted file: {video_file.name}")
-        
-        return response.text
+        # A timed-out 30-minute call is not retried: a second attempt would
+        # run past the download queue's hard time limit
+        return client.generate_text(ANALYSIS_MODEL_NAME, [prompt, video_file], retry_timeouts=False,
+                                    request_options={'timeout': DIRECT_ANALYSIS_TIMEOUT_SECONDS})
     except Exception as e:
-        # Clean up on error
-        try:
-            genai.delete_file(video_file.name)
-        except:
-            pass
         print(f"Error analyzing video: {e}")
         return f"Error analyzing video: {e}"
+    finally:
+        # Clean up the uploaded file
+        client.delete_file(video_file.name)
+        print(f"Deleted file: {video_file.name}")
 
-def synthesize_results(transcript: str, ocr_texts: list[str]) -> str:
+def synthesize_results(transcript, ocr_texts: list[str]) -> str:
     """
     Legacy method - Synthesizes the transcript and OCR text into a structured JSON object.
     NOTE: This method is deprecated in favor of analyze_golf_video_direct()
 
     Args:
-        transcript: The full audio transcript.
+        transcript: The full audio transcript, a VttTranscript, or TranscriptChunks.
+            Transcripts over the single-prompt budget are reduced to chunk notes first.
         ocr_texts: A list of text extracted from on-screen graphics.
 
     Returns:
         A JSON string with the final, structured analysis.
     """
-    configure_genai()
+    transcript = get_transcript_summarizer().condense(transcript)
     
     # We can join the OCR texts, removing duplicates, to create a concise context
     unique_ocr_texts = "\n".join(sorted(list(set(ocr_texts))))
@@ -276,26 +371,26 @@ IMPORTANT:
 """
 
     # Use Pro model for better analysis of long transcripts
-    model = genai.GenerativeModel('gemini-1.5-pro-latest')
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        return get_gemini_client().generate_text(ANALYSIS_MODEL_NAME, prompt)
     except Exception as e:
         print(f"Error synthesizing results: {e}")
         return f"Error synthesizing results: {e}"
 
-def extract_character_traits(transcript: str, ocr_texts: list[str]) -> str:
+def extract_character_traits(transcript, ocr_texts: list[str]) -> str:
     """
     Analyzes the transcript and visual content to extract detailed character personality traits.
     
     Args:
-        transcript: The full video transcript/captions.
+        transcript: The full video transcript/captions, a VttTranscript, or TranscriptChunks.
+            Transcripts over the single-prompt budget are reduced to chunk notes first
+            (shared with synthesize_results through the chunk summary cache).
         ocr_texts: OCR text from video frames (may contain player names, graphics).
     
     Returns:
         A JSON string with detailed character analysis for parody creation.
     """
-    configure_genai()
+    transcript = get_transcript_summarizer().condense(transcript)
     
     unique_ocr_texts = "\n".join(sorted(list(set(ocr_texts))))
     
@@ -415,10 +510,8 @@ IMPORTANT:
 """
 
     # Use Pro model for detailed character analysis
-    model = genai.GenerativeModel('gemini-1.5-pro-latest')
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        return get_gemini_client().generate_text(ANALYSIS_MODEL_NAME, prompt)
     except Exception as e:
         print(f"Error extracting character traits: {e}")
         return f"Error extracting character traits: {e}" 
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""
+Keyword Categorizer for Golf Videos
+Scores every category in a single pass over the text with one compiled pattern
+"""
+
+import re
+import logging
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Category -> {keyword: weight}. Specific phrases carry more weight than generic
+# words; dict order breaks ties, matching the old first-match priority.
+CATEGORY_KEYWORDS = {
+    'instruction': {'lesson': 2.0, 'tip': 1.5, 'how to': 2.0, 'tutorial': 2.0, 'teach': 1.5,
+                    'swing': 1.0, 'putting': 1.0, 'chipping': 1.0},
+    'equipment': {'review': 2.0, 'club': 1.0, 'ball': 1.0, 'gear': 1.5, 'equipment': 2.0,
+                  'shaft': 1.5, 'driver': 1.0, 'iron': 1.0},
+    'tour': {'pga': 2.0, 'tour': 1.0, 'tournament': 2.0, 'round': 0.5, 'leaderboard': 2.0,
+             'championship': 2.0},
+    'highlights': {'highlight': 2.0, 'best': 0.5, 'shot': 0.5, 'hole in one': 2.5, 'ace': 1.0,
+                   'eagle': 1.0},
+    'vlog': {'vlog': 2.5, 'course': 0.5, 'round': 0.5, 'playing': 0.5, 'golf with': 1.5},
+    'news': {'news': 2.0, 'update': 1.0, 'announcement': 2.0, 'breaking': 1.5},
+}
+
+DEFAULT_CATEGORY = 'general'
+
+
+class VideoCategorizer:
+    """
+    Compiles all keywords into one alternation anchored at word starts,
+    so "tips" and "clubs" still match but "face" no longer counts as "ace".
+    """
+
+    def __init__(self, category_keywords: Optional[Dict[str, Dict[str, float]]] = None):
+        self.category_keywords = category_keywords or CATEGORY_KEYWORDS
+        self._priority = {category: i for i, category in enumerate(self.category_keywords)}
+
+        # keyword -> [(category, weight)]; a keyword may feed several categories
+        self._keyword_targets: Dict[str, List] = {}
+        for category, keywords in self.category_keywords.items():
+            for keyword, weight in keywords.items():
+                self._keyword_targets.setdefault(keyword, []).append((category, weight))
+
+        # Longest alternatives first so phrases win over their prefixes
+        alternatives = sorted(self._keyword_targets, key=len, reverse=True)
+        self._pattern = re.compile(r"\b(?:" + "|".join(re.escape(k) for k in alternatives) + ")")
+
+    def score(self, text: str) -> Dict[str, float]:
+        """Return the weighted keyword score per category for one text."""
+        scores: Dict[str, float] = {}
+        for match in self._pattern.finditer(text.lower()):
+            for category, weight in self._keyword_targets[match.group()]:
+                scores[category] = scores.get(category, 0.0) + weight
+        return scores
+
+    def categorize_text(self, text: str) -> str:
+        scores = self.score(text)
+        if not scores:
+            return DEFAULT_CATEGORY
+        return max(scores, key=lambda category: (scores[category], -self._priority[category]))
+
+    def categorize(self, title: str, description: Optional[str]) -> str:
+        return self.categorize_text(f"{title} {description or ''}")
+
+    def categorize_many(self, texts: Iterable[str]) -> List[str]:
+        """Categorize a batch of texts (title and description joined) in order."""
+        categorize_text = self.categorize_text
+        return [categorize_text(text) for text in texts]
+
+
+categorizer = VideoCategorizer()
+
+
+def recategorize_catalog(batch_size: int = 5000) -> int:
+    """
+    One-off job that re-runs categorization over every stored video,
+    writing back only rows whose category changed. Returns the number updated.
+    """
+    from sqlalchemy import bindparam, update
+    from youtube_analyzer.app.database import SessionLocal
+    from youtube_analyzer.app.models import YouTubeVideo
+
+    videos = YouTubeVideo.__table__
+    # Keep updated_at as-is: the collectors use it to decide which stats are stale
+    update_stmt = update(videos).where(
+        videos.c.id == bindparam('video_id')
+    ).values(category=bindparam('new_category'), updated_at=videos.c.updated_at)
+
+    changed_total = 0
+    with SessionLocal() as read_session, SessionLocal() as write_session:
+        rows = read_session.query(
+            YouTubeVideo.id, YouTubeVideo.title, YouTubeVideo.description, YouTubeVideo.category
+        ).execution_options(stream_results=True).yield_per(batch_size)
+
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                changed_total += _write_categories(write_session, update_stmt, batch)
+                batch = []
+        if batch:
+            changed_total += _write_categories(write_session, update_stmt, batch)
+
+    logger.info(f"Recategorization complete: {changed_total} videos changed category")
+    return changed_total
+
+
+def _write_categories(session, update_stmt, rows) -> int:
+    categories = categorizer.categorize_many(f"{row.title} {row.description or ''}" for row in rows)
+    changes = [
+        {'video_id': row.id, 'new_category': category}
+        for row, category in zip(rows, categories)
+        if category != row.category
+    ]
+    if changes:
+        session.execute(update_stmt, changes)
+        session.commit()
+    return len(changes)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    updated = recategorize_catalog()
+    print(f"Updated category for {updated} videos")
@@ -0,0 +1,135 @@
+"""
+Celery queue layout and worker tuning for the analyzer.
+Tasks are routed to three queues so a 30-minute video download or
+direct analysis never sits in front of hundreds of short frame requests:
+
+    download        process_video, process_video_direct
+    frame-analysis  analyze_frame_batch_task, analyze_frame_task, analyze_appearance_task
+    synthesis       synthesize_and_save_task (the chord callback)
+
+Each queue has its own worker profile (pool, concurrency, prefetch) and
+time limits. Start one worker per queue:
+
+    python -m youtube_analyzer.app.celery_queues download
+    python -m youtube_analyzer.app.celery_queues frame-analysis
+    python -m youtube_analyzer.app.celery_queues synthesis
+"""
+
+import os
+import sys
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, List
+
+from kombu import Queue
+
+QUEUE_DOWNLOAD = 'download'
+QUEUE_FRAMES = 'frame-analysis'
+QUEUE_SYNTHESIS = 'synthesis'
+
+# Finished results only need to outlive the chord that collects them
+RESULT_EXPIRES = timedelta(hours=float(os.getenv('CELERY_RESULT_EXPIRES_HOURS', '6')))
+
+
+@dataclass
+class QueueProfile:
+    """Worker settings for one queue; time limits are in seconds."""
+    queue: str
+    tasks: List[str]
+    pool: str
+    concurrency: int
+    prefetch_multiplier: int
+    soft_time_limit: int
+    time_limit: int
+
+    def worker_argv(self) -> List[str]:
+        """Arguments for `celery worker` serving only this queue."""
+        return [
+            'worker',
+            f'--queues={self.queue}',
+            f'--pool={self.pool}',
+            f'--concurrency={self.concurrency}',
+            f'--prefetch-multiplier={self.prefetch_multiplier}',
+            f'--hostname={self.queue}@%h',
+            '--loglevel=INFO',
+        ]
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+QUEUE_PROFILES: Dict[str, QueueProfile] = {
+    QUEUE_DOWNLOAD: QueueProfile(
+        queue=QUEUE_DOWNLOAD,
+        tasks=['app.worker.process_video', 'app.worker.process_video_direct'],
+        pool='prefork',  # Frame decoding is CPU-bound
+        concurrency=_env_int('CELERY_DOWNLOAD_CONCURRENCY', 2),
+        # One task at a time per process: a prefetched download would wait behind a 30-minute one
+        prefetch_multiplier=1,
+        # Covers the download plus the 1800s Gemini request of direct analysis
+        soft_time_limit=_env_int('CELERY_DOWNLOAD_SOFT_TIME_LIMIT', 2700),
+        time_limit=_env_int('CELERY_DOWNLOAD_TIME_LIMIT', 3000),
+    ),
+    QUEUE_FRAMES: QueueProfile(
+        queue=QUEUE_FRAMES,
+        tasks=['app.worker.analyze_frame_batch_task', 'app.worker.analyze_frame_task',
+               'app.worker.analyze_appearance_task'],
+        # Tasks wait on Gemini; threads share one process-wide client, so its
+        # concurrency and rate limits apply to the whole worker. The threads
+        # pool does not enforce time limits; they apply if run with prefork
+        pool=os.getenv('CELERY_FRAME_POOL', 'threads'),
+        concurrency=_env_int('CELERY_FRAME_CONCURRENCY', 8),
+        prefetch_multiplier=_env_int('CELERY_FRAME_PREFETCH', 4),
+        soft_time_limit=_env_int('CELERY_FRAME_SOFT_TIME_LIMIT', 300),
+        time_limit=_env_int('CELERY_FRAME_TIME_LIMIT', 360),
+    ),
+    QUEUE_SYNTHESIS: QueueProfile(
+        queue=QUEUE_SYNTHESIS,
+        tasks=['app.worker.synthesize_and_save_task'],
+        pool='prefork',
+        concurrency=_env_int('CELERY_SYNTHESIS_CONCURRENCY', 2),
+        prefetch_multiplier=1,
+        # Transcript map step plus two long-context model calls
+        soft_time_limit=_env_int('CELERY_SYNTHESIS_SOFT_TIME_LIMIT', 900),
+        time_limit=_env_int('CELERY_SYNTHESIS_TIME_LIMIT', 960),
+    ),
+}
+
+
+def celery_settings() -> dict:
+    """Settings for `celery_app.conf.update`: queues, routes, acks and limits."""
+    longest = max(profile.time_limit for profile in QUEUE_PROFILES.values())
+    return {
+        'task_queues': [Queue(queue) for queue in QUEUE_PROFILES],
+        # Unrouted tasks (Celery's own chord bookkeeping included) are short
+        'task_default_queue': QUEUE_SYNTHESIS,
+        'task_routes': {
+            task: {'queue': profile.queue}
+            for profile in QUEUE_PROFILES.values() for task in profile.tasks
+        },
+        'task_annotations': {
+            task: {'soft_time_limit': profile.soft_time_limit, 'time_limit': profile.time_limit}
+            for profile in QUEUE_PROFILES.values() for task in profile.tasks
+        },
+        # Acknowledge after the task finishes, so a worker that dies mid-task
+        # hands the message back instead of losing it
+        'task_acks_late': True,
+        'task_reject_on_worker_lost': True,
+        # Redis redelivers unacknowledged messages after the visibility
+        # timeout; it must outlast the longest task or that task runs twice
+        'broker_transport_options': {'visibility_timeout': longest + 600},
+        'worker_prefetch_multiplier': 1,
+        'result_expires': RESULT_EXPIRES,
+    }
+
+
+def main(argv: List[str]):
+    if len(argv) != 1 or argv[0] not in QUEUE_PROFILES:
+        sys.exit(f"Usage: python -m youtube_analyzer.app.celery_queues {{{','.join(QUEUE_PROFILES)}}}")
+    from .worker import celery_app
+    celery_app.worker_main(QUEUE_PROFILES[argv[0]].worker_argv())
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
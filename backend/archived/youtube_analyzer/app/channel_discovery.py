@@ -4,12 +4,17 @@ Find lesser-known golf channels with high potential
 """
 
 import logging
+import os
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Set
 from youtube_analyzer.app.golf_directory import GolfDirectory
+from youtube_analyzer.app.search_planner import SEARCH_QUOTA_COST
+from youtube_analyzer.app.collab_graph import CollaborationGraph
+from youtube_analyzer.app.expanded_collector import TRACKED_CHANNELS
 from youtube_analyzer.app.database import SessionLocal
-from youtube_analyzer.app.models import YouTubeVideo, YouTubeChannel
-from sqlalchemy import func, and_, or_
+from youtube_analyzer.app.models import YouTubeVideo, YouTubeChannel, SearchQuery, ChannelMentionLookup
+from sqlalchemy import func, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import re
 from dotenv import load_dotenv
 
@@ -18,58 +23,135 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MENTION_SEARCH_CATEGORY = 'channel_mention'
+# Resolved mentions are reused for this long before a name is searched again
+MENTION_LOOKUP_TTL = timedelta(days=int(os.getenv('MENTION_LOOKUP_TTL_DAYS', '90')))
+
+# Channel mention forms, each scanned on its own so mentions inside another
+# match still count (the "with Y" in "ft. X with Y"):
+# @username, ft./feat. mentions, "with ChannelName" and vs battles
+MENTION_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'@([A-Za-z0-9_\-]+)',
+    r'ft\.\s*([A-Za-z0-9_\-\s]+)',
+    r'feat\.\s*([A-Za-z0-9_\-\s]+)',
+    r'with\s+([A-Z][A-Za-z0-9_\-\s]+)',
+    r'vs\.?\s*([A-Z][A-Za-z0-9_\-\s]+)',
+)]
+
+
+def extract_mentions(text: str) -> Dict[str, str]:
+    """Return {lowercased name: name as written} for every channel mention in `text`."""
+    mentions = {}
+    for pattern in MENTION_PATTERNS:
+        for match in pattern.finditer(text):
+            name = match.group(1).strip()
+            if len(name) > 3:
+                mentions.setdefault(name.lower(), name)
+    return mentions
+
 
 class ChannelDiscovery:
     def __init__(self):
         self.directory = GolfDirectory()
         self.discovered_channels = set()
+        self.collab_graph = CollaborationGraph.open(
+            os.getenv('GOLF_COLLAB_GRAPH', 'collaboration_graph.bin')
+        )
     
-    def find_mentioned_channels(self):
-        """Find channels mentioned in video titles and descriptions."""
+    def find_mentioned_channels(self, quota_budget: int = 2000, min_mentions: int = 1):
+        """
+        Find channels mentioned in video titles and descriptions.
+        
+        Videos are streamed from a server-side cursor as (id, title, description)
+        and scanned into a table of names ranked by how many videos mention them.
+        Names resolved within MENTION_LOOKUP_TTL are answered from
+        channel_mention_lookups; the most-mentioned of the rest are searched,
+        within `quota_budget` API units (100 per search), and cached there.
+        """
         logger.info("Searching for mentioned channels in existing content...")
         
         with SessionLocal() as session:
-            videos = session.query(YouTubeVideo).all()
+            candidates = self._count_mentions(session)
             
-            # Patterns to find channel mentions
-            patterns = [
-                r'@([A-Za-z0-9_\-]+)',  # @username mentions
-                r'ft\.\s*([A-Za-z0-9_\-\s]+)',  # ft. mentions
-                r'feat\.\s*([A-Za-z0-9_\-\s]+)',  # feat. mentions
-                r'with\s+([A-Z][A-Za-z0-9_\-\s]+)',  # "with ChannelName"
-                r'vs\.?\s*([A-Z][A-Za-z0-9_\-\s]+)',  # vs battles
-            ]
+            # Filter out our existing channels; earlier lookups are reused instead of repeated
+            existing_names = {title.lower() for (title,) in session.query(YouTubeChannel.title)}
+            cutoff = datetime.now(timezone.utc) - MENTION_LOOKUP_TTL
+            resolved = dict(session.query(
+                ChannelMentionLookup.name_key, ChannelMentionLookup.found_channels
+            ).filter(ChannelMentionLookup.fetched_at >= cutoff))
             
-            mentioned_names = set()
-            for video in videos:
-                text = f"{video.title} {video.description or ''}"
-                for pattern in patterns:
-                    matches = re.findall(pattern, text, re.IGNORECASE)
-                    mentioned_names.update(m.strip() for m in matches if len(m.strip()) > 3)
+            max_lookups = quota_budget // SEARCH_QUOTA_COST
+            ranked, lookups = [], []
+            for key, (count, name) in sorted(candidates.items(), key=lambda item: -item[1][0]):
+                if count < min_mentions:
+                    break
+                if key in existing_names:
+                    continue
+                if key in resolved:
+                    ranked.append((name, count, resolved[key]))
+                elif len(lookups) < max_lookups:
+                    ranked.append((name, count, None))
+                    lookups.append(key)
             
-            # Filter out common words and our existing channels
-            existing_names = {ch.title.lower() for ch in session.query(YouTubeChannel).all()}
+            logger.info(
+                f"{len(candidates)} mentioned names found, {len(ranked) - len(lookups)} already resolved, "
+                f"looking up {len(lookups)} ({len(lookups) * SEARCH_QUOTA_COST} quota units)"
+            )
             
             potential_channels = []
-            for name in mentioned_names:
-                if name.lower() not in existing_names and len(name) > 3:
-                    # Search for this potential channel
+            for name, count, found_channels in ranked:
+                if found_channels is None:
+                    query = f"{name} golf channel"
                     try:
                         search_results = self.directory.youtube_client.search_golf_videos(
-                            query=f"{name} golf channel",
+                            query=query,
                             max_results=3
                         )
-                        if search_results:
-                            potential_channels.append({
-                                'mentioned_name': name,
-                                'found_channels': [(v['channel_title'], v['channel_id']) 
-                                                 for v in search_results]
-                            })
                     except Exception as e:
                         logger.error(f"Error searching for {name}: {e}")
+                        continue
+                    
+                    found_channels = [[v['channel_title'], v['channel_id']] for v in search_results]
+                    session.add(SearchQuery(
+                        query=query,
+                        category=MENTION_SEARCH_CATEGORY,
+                        result_count=len(search_results),
+                        quota_cost=SEARCH_QUOTA_COST
+                    ))
+                    session.execute(pg_insert(ChannelMentionLookup).values(
+                        name_key=name.lower(), query=query, found_channels=found_channels, fetched_at=func.now()
+                    ).on_conflict_do_update(
+                        index_elements=['name_key'],
+                        set_={'query': query, 'found_channels': found_channels, 'fetched_at': func.now()}
+                    ))
+                
+                if found_channels:
+                    potential_channels.append({
+                        'mentioned_name': name,
+                        'mention_count': count,
+                        'found_channels': [tuple(channel) for channel in found_channels]
+                    })
             
+            session.commit()
             return potential_channels
     
+    def _count_mentions(self, session, chunk_size: int = 1000) -> Dict[str, list]:
+        """Return {lowercased name: [videos mentioning it, display name]} across all videos."""
+        candidates: Dict[str, list] = {}
+        rows = session.query(
+            YouTubeVideo.id, YouTubeVideo.title, YouTubeVideo.description
+        ).execution_options(stream_results=True).yield_per(chunk_size)
+        
+        for _, title, description in rows:
+            for key, name in extract_mentions(f"{title} {description or ''}").items():
+                entry = candidates.get(key)
+                if entry is None:
+                    candidates[key] = [1, name]
+                else:
+                    entry[0] += 1
+        
+        return candidates
+    
     def find_rising_channels(self):
         """Find channels with high engagement but low subscriber count."""
         logger.info("Finding rising golf channels...")
@@ -86,14 +168,12 @@ class ChannelDiscovery:
         ]
         
         discovered = []
-        for query in rising_queries:
+        # Discovery looks at every result, including videos already in the catalog
+        for query, videos in self.directory.search_planner.run(
+            rising_queries, max_results=10, order="relevance",
+            category='rising_channels', new_only=False
+        ):
             try:
-                videos = self.directory.youtube_client.search_golf_videos(
-                    query=query,
-                    max_results=10,
-                    order="relevance"
-                )
-                
                 # Group by channel
                 channels_found = {}
                 for video in videos:
@@ -149,68 +229,99 @@ class ChannelDiscovery:
             'trick_shots': ['golf trick shots channel', 'golf skills challenge', 'mini golf tricks']
         }
         
-        niche_channels = {}
+        niche_channels = {niche: [] for niche in niche_searches}
+        query_niches = {query: niche for niche, queries in niche_searches.items() for query in queries}
         
-        for niche, queries in niche_searches.items():
-            niche_channels[niche] = []
-            
-            for query in queries:
-                try:
-                    videos = self.directory.youtube_client.search_golf_videos(
-                        query=query,
-                        max_results=5,
-                        order="relevance"
-                    )
-                    
-                    # Track unique channels
-                    seen_channels = set()
-                    for video in videos:
-                        if video['channel_id'] not in seen_channels:
-                            seen_channels.add(video['channel_id'])
-                            niche_channels[niche].append({
-                                'channel_id': video['channel_id'],
-                                'channel_title': video['channel_title'],
-                                'sample_video': video['title'],
-                                'views': video['view_count']
-                            })
-                    
-                except Exception as e:
-                    logger.error(f"Error searching niche {niche}: {e}")
+        for query, videos in self.directory.search_planner.run(
+            list(query_niches), max_results=5, order="relevance",
+            categories=query_niches, new_only=False
+        ):
+            niche = query_niches[query]
+            # Track unique channels
+            seen_channels = set()
+            for video in videos:
+                if video['channel_id'] not in seen_channels:
+                    seen_channels.add(video['channel_id'])
+                    niche_channels[niche].append({
+                        'channel_id': video['channel_id'],
+                        'channel_title': video['channel_title'],
+                        'sample_video': video['title'],
+                        'views': video['view_count']
+                    })
         
         return niche_channels
     
+    def update_collaboration_graph(self, batch_size: int = 2000) -> int:
+        """
+        Feed videos discovered since the graph's watermark (less its overlap
+        window, see collab_graph) into the collaboration graph and save it.
+        Returns the number of videos added.
+        """
+        with SessionLocal() as session:
+            self.collab_graph.set_known_channels(dict(
+                session.query(YouTubeChannel.id, YouTubeChannel.title).all()
+            ))
+
+            query = session.query(
+                YouTubeVideo.id, YouTubeVideo.channel_id, YouTubeVideo.title,
+                YouTubeVideo.description, YouTubeVideo.discovered_at
+            )
+            since = self.collab_graph.since()
+            if since is not None:
+                query = query.filter(YouTubeVideo.discovered_at >= since)
+            rows = query.order_by(YouTubeVideo.discovered_at).execution_options(
+                stream_results=True
+            ).yield_per(batch_size)
+
+            added = 0
+            batch = []
+            for row in rows:
+                batch.append(tuple(row))
+                if len(batch) >= batch_size:
+                    added += self.collab_graph.add_videos(batch)
+                    batch = []
+            if batch:
+                added += self.collab_graph.add_videos(batch)
+
+        if added:
+            self.collab_graph.save()
+        logger.info(f"Collaboration graph updated with {added} new videos")
+        return added
+
     def analyze_channel_networks(self):
         """Find channels that frequently collaborate."""
         logger.info("Analyzing collaboration networks...")
-        
-        with SessionLocal() as session:
-            # Find videos with multiple channel mentions
-            collaboration_videos = session.query(YouTubeVideo).filter(
-                or_(
-                    YouTubeVideo.title.contains(' vs '),
-                    YouTubeVideo.title.contains(' with '),
-                    YouTubeVideo.title.contains(' ft. '),
-                    YouTubeVideo.title.contains(' feat. '),
-                    YouTubeVideo.title.contains(' & ')
-                )
-            ).all()
-            
-            # Build collaboration graph
-            collaborations = {}
-            for video in collaboration_videos:
-                # Extract potential collaborators
-                title_lower = video.title.lower()
-                if any(word in title_lower for word in ['vs', 'with', 'ft.', 'feat.', '&']):
-                    if video.channel_id not in collaborations:
-                        collaborations[video.channel_id] = {
-                            'channel': video.channel.title,
-                            'collaborators': set(),
-                            'collab_count': 0
-                        }
-                    collaborations[video.channel_id]['collab_count'] += 1
-            
-            return collaborations
-    
+        self.update_collaboration_graph()
+
+        collaborations = {}
+        for channel_id in self.collab_graph.keys:
+            if channel_id.startswith('mention:'):
+                continue
+            neighbors = self.collab_graph.neighbors(channel_id)
+            if not neighbors:
+                continue
+            collaborations[channel_id] = {
+                'channel': self.collab_graph.name(channel_id),
+                'collaborators': {name for _, name, _ in neighbors},
+                'collab_count': int(sum(weight for _, _, weight in neighbors))
+            }
+
+        return collaborations
+
+    def get_network_suggestions(self, whitelist=None, limit: int = 20) -> List[Dict]:
+        """Channels two hops from the tracked channels that we don't follow yet."""
+        return self.collab_graph.two_hop_suggestions(whitelist or TRACKED_CHANNELS, limit)
+
+    def get_central_channels(self, limit: int = 20) -> List[Dict]:
+        """Channels ranked by PageRank centrality in the collaboration graph."""
+        ranks = self.collab_graph.pagerank()
+        top = sorted(ranks, key=lambda key: -ranks[key])[:limit]
+        return [{
+            'key': key,
+            'name': self.collab_graph.name(key),
+            'centrality': ranks[key]
+        } for key in top]
+
     def get_discovery_report(self):
         """Generate a comprehensive discovery report."""
         report = {
@@ -218,7 +329,9 @@ class ChannelDiscovery:
             'mentioned_channels': self.find_mentioned_channels(),
             'rising_channels': self.find_rising_channels(),
             'niche_content': self.find_niche_content(),
-            'collaboration_networks': self.analyze_channel_networks()
+            'collaboration_networks': self.analyze_channel_networks(),
+            'central_channels': self.get_central_channels(),
+            'network_suggestions': self.get_network_suggestions()
         }
         
         return report
@@ -251,12 +364,12 @@ class ChannelDiscovery:
                     videos = self.directory.youtube_client.get_video_details(video_ids)
                     
                     with SessionLocal() as session:
-                        for video_data in videos:
-                            try:
-                                self.directory._upsert_video(session, video_data)
-                                session.commit()
-                            except Exception as e:
-                                session.rollback()
+                        try:
+                            self.directory.ingest_videos(session, videos)
+                            session.commit()
+                        except Exception as e:
+                            session.rollback()
+                            logger.error(f"Error saving video batch: {e}")
                     
                     collected_count += 1
                     
@@ -278,7 +391,7 @@ def discover_new_channels():
     if report['mentioned_channels']:
         print("📢 CHANNELS MENTIONED IN VIDEOS:")
         for mention in report['mentioned_channels'][:10]:
-            print(f"\nMentioned: '{mention['mentioned_name']}'")
+            print(f"\nMentioned: '{mention['mentioned_name']}' ({mention['mention_count']} times)")
             for channel_name, channel_id in mention['found_channels'][:2]:
                 print(f"  → Found: {channel_name}")
     
@@ -301,6 +414,12 @@ def discover_new_channels():
                 for ch in channels[:3]:
                     print(f"  • {ch['channel_title']} ({ch['views']:,} views)")
     
+    # Show collaboration network suggestions
+    if report['network_suggestions']:
+        print("\n\n🤝 SUGGESTED FROM COLLABORATION NETWORK:")
+        for suggestion in report['network_suggestions'][:10]:
+            print(f"  • {suggestion['name']} (via {suggestion['via']}, score {suggestion['score']:.0f})")
+    
     return report
 
 
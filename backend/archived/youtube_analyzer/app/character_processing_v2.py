@@ -1,12 +1,33 @@
 import json
 import logging
-from typing import Dict, List, Optional
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
-from .models import Character, CharacterAppearance, VideoAnalysis
+from .models import Character, CharacterAppearance, CharacterProfile, VideoAnalysis
 from .database import SessionLocal
 
 logger = logging.getLogger(__name__)
 
+NUMERIC_TRAITS = [
+    'confidence_level', 'humor_level', 'competitiveness',
+    'trash_talk_frequency', 'profanity_usage'
+]
+
+# Appearance column holding a JSON array -> CharacterProfile column collecting it
+ACCUMULATED_FIELDS = {
+    'notable_quotes': 'quotes',
+    'catchphrases': 'catchphrases',
+    'signature_moments': 'signature_moments',
+}
+
+def normalize_name(name: str) -> str:
+    """Lookup key for a character name: case-folded, without punctuation, single-spaced."""
+    name = unicodedata.normalize('NFKC', name).casefold()
+    name = re.sub(r"[^\w\s]", "", name)
+    return " ".join(name.split())
+
 def process_character_analysis(analysis_id: int, character_traits_json: str) -> None:
     """
     Process character trait analysis and create character appearance records.
@@ -22,7 +43,6 @@ def process_character_analysis(analysis_id: int, character_traits_json: str) ->
             character_data = character_traits_json.strip()
             if character_data.startswith("```json"):
                 # Clean up markdown formatting
-                import re
                 match = re.search(r'```json\s*(.*?)\s*```', character_data, re.DOTALL)
                 if match:
                     character_data = match.group(1)
@@ -35,6 +55,10 @@ def process_character_analysis(analysis_id: int, character_traits_json: str) ->
         characters = character_data.get('characters', [])
         logger.info(f"Processing {len(characters)} characters from analysis {analysis_id}")
         
+        # Rows are locked as characters are processed; taking them in one global
+        # order keeps concurrent analyses of the same cast from deadlocking
+        characters.sort(key=lambda char_data: normalize_name(char_data.get('name') or ''))
+        
         for char_data in characters:
             process_single_character(db, analysis_id, char_data)
         
@@ -65,35 +89,44 @@ def process_single_character(db: Session, analysis_id: int, char_data: Dict) ->
     character = find_or_create_character(db, name, char_data.get('channel_or_brand'))
     
     # Create character appearance record with ALL the analysis data
-    create_character_appearance(db, character.id, analysis_id, char_data)
+    appearance = create_character_appearance(db, character.id, analysis_id, char_data)
+    
+    # Fold it into the character's running profile
+    update_character_profile(db, character.id, appearance)
     
     logger.info(f"Processed character appearance: {name} in analysis {analysis_id}")
 
 def find_or_create_character(db: Session, name: str, channel: Optional[str] = None) -> Character:
     """
-    Find existing character by name or create new one.
+    Find existing character by normalized name or create new one.
     Character table only stores identity info, not traits.
+    The insert skips on a normalized name conflict, so concurrent tasks that
+    meet the same new character end up with one row.
     """
-    # Try to find existing character by name (could add fuzzy matching later)
-    existing_character = db.query(Character).filter(Character.name.ilike(f"%{name}%")).first()
+    # Exact match on the unique normalized name (could add fuzzy matching later)
+    normalized = normalize_name(name)
+    existing_character = db.query(Character).filter(Character.normalized_name == normalized).one_or_none()
     
-    if existing_character:
-        logger.info(f"Found existing character: {existing_character.name}")
-        # Update channel if we have new info
-        if channel and not existing_character.channel_name:
-            existing_character.channel_name = channel
-        return existing_character
-    else:
-        logger.info(f"Creating new character: {name}")
-        character = Character(
-            name=name,
-            channel_name=channel
-        )
-        db.add(character)
-        db.flush()  # Get the ID
-        return character
+    if existing_character is None:
+        inserted = db.execute(
+            pg_insert(Character)
+            .values(name=name, normalized_name=normalized, channel_name=channel)
+            .on_conflict_do_nothing(index_elements=['normalized_name'])
+            .returning(Character.id)
+        ).scalar()
+        if inserted is not None:
+            logger.info(f"Created new character: {name}")
+            return db.get(Character, inserted)
+        # Another task created it first; its row is committed by now
+        existing_character = db.query(Character).filter(Character.normalized_name == normalized).one()
+    
+    logger.info(f"Found existing character: {existing_character.name}")
+    # Update channel if we have new info
+    if channel and not existing_character.channel_name:
+        existing_character.channel_name = channel
+    return existing_character
 
-def create_character_appearance(db: Session, character_id: int, analysis_id: int, char_data: Dict) -> None:
+def create_character_appearance(db: Session, character_id: int, analysis_id: int, char_data: Dict) -> CharacterAppearance:
     """
     Create a character appearance record with ALL trait data from this video analysis.
     """
@@ -142,57 +175,111 @@ def create_character_appearance(db: Session, character_id: int, analysis_id: int
     )
     
     db.add(appearance)
+    db.flush()  # Get the ID for the profile
+    return appearance
+
+def _merge_unique(existing: List, additions: Iterable) -> List:
+    """existing plus the additions it does not already hold, in order."""
+    seen = set(existing)
+    merged = list(existing)
+    for item in additions:
+        if isinstance(item, str) and item not in seen:
+            seen.add(item)
+            merged.append(item)
+    return merged
+
+def _fold_appearance(profile: CharacterProfile, appearance: CharacterAppearance) -> None:
+    """Add one appearance to a profile's sums, counts and sets (new objects, so the JSON columns are flagged dirty)."""
+    sums = dict(profile.trait_sums or {})
+    counts = dict(profile.trait_counts or {})
+    for trait in NUMERIC_TRAITS:
+        value = getattr(appearance, trait)
+        if value is not None:
+            sums[trait] = sums.get(trait, 0) + value
+            counts[trait] = counts.get(trait, 0) + 1
+    profile.trait_sums = sums
+    profile.trait_counts = counts
+    
+    for source, target in ACCUMULATED_FIELDS.items():
+        raw = getattr(appearance, source)
+        try:
+            items = json.loads(raw) if raw else []
+        except json.JSONDecodeError:
+            items = []
+        setattr(profile, target, _merge_unique(getattr(profile, target) or [], items if isinstance(items, list) else []))
+    
+    profile.appearance_count = (profile.appearance_count or 0) + 1
+    profile.latest_appearance_id = appearance.id
+
+def update_character_profile(db: Session, character_id: int, appearance: CharacterAppearance) -> None:
+    """
+    Fold a new appearance into the character's profile. The profile row is
+    created if missing and locked, so concurrent synthesis tasks that
+    mention the same character add up instead of overwriting each other.
+    """
+    db.execute(
+        pg_insert(CharacterProfile)
+        .values(character_id=character_id, appearance_count=0, trait_sums={}, trait_counts={},
+                quotes=[], catchphrases=[], signature_moments=[])
+        .on_conflict_do_nothing(index_elements=['character_id'])
+    )
+    profile = db.query(CharacterProfile).filter(
+        CharacterProfile.character_id == character_id
+    ).with_for_update().populate_existing().one()
+    _fold_appearance(profile, appearance)
+
+def rebuild_character_profiles(db: Session, character_ids: Optional[List[int]] = None) -> int:
+    """
+    Recompute profiles from all appearances, for the given characters or
+    for every character without a profile. Returns how many were built.
+    """
+    if character_ids is None:
+        character_ids = [character_id for (character_id,) in db.query(Character.id).outerjoin(
+            CharacterProfile, CharacterProfile.character_id == Character.id
+        ).filter(CharacterProfile.character_id.is_(None))]
+    
+    for character_id in character_ids:
+        profile = db.get(CharacterProfile, character_id) or CharacterProfile(character_id=character_id)
+        profile.appearance_count = 0
+        profile.trait_sums, profile.trait_counts = {}, {}
+        profile.quotes, profile.catchphrases, profile.signature_moments = [], [], []
+        profile.latest_appearance_id = None
+        appearances = db.query(CharacterAppearance).filter(
+            CharacterAppearance.character_id == character_id
+        ).order_by(CharacterAppearance.created_at, CharacterAppearance.id)
+        for appearance in appearances:
+            _fold_appearance(profile, appearance)
+        db.add(profile)
+    return len(character_ids)
 
 def get_character_summary(character_id: int) -> Dict:
     """
     Get a comprehensive summary of a character across all appearances with calculated averages.
+    Reads the character's profile and latest appearance in one query.
     """
     db = SessionLocal()
     try:
-        character = db.query(Character).filter(Character.id == character_id).first()
-        if not character:
+        row = db.query(Character, CharacterProfile, CharacterAppearance).outerjoin(
+            CharacterProfile, CharacterProfile.character_id == Character.id
+        ).outerjoin(
+            CharacterAppearance, CharacterAppearance.id == CharacterProfile.latest_appearance_id
+        ).filter(Character.id == character_id).first()
+        if not row:
             return {}
         
-        appearances = db.query(CharacterAppearance).filter(
-            CharacterAppearance.character_id == character_id
-        ).all()
-        
-        if not appearances:
+        character, profile, latest_appearance = row
+        if not profile or not profile.appearance_count:
             return {'character': {'name': character.name, 'appearances': 0}}
         
-        # Calculate average personality traits
-        trait_averages = calculate_trait_averages(appearances)
-        
-        # Compile all quotes and moments
-        all_quotes = []
-        all_catchphrases = []
-        all_moments = []
-        
-        for appearance in appearances:
-            if appearance.notable_quotes:
-                quotes = json.loads(appearance.notable_quotes)
-                all_quotes.extend(quotes)
-            
-            if appearance.catchphrases:
-                phrases = json.loads(appearance.catchphrases)
-                all_catchphrases.extend(phrases)
-                
-            if appearance.signature_moments:
-                moments = json.loads(appearance.signature_moments)
-                all_moments.extend(moments)
-        
-        # Get most recent appearance data for non-numeric traits
-        latest_appearance = max(appearances, key=lambda x: x.created_at)
-        
         return {
             'character': {
                 'id': character.id,
                 'name': character.name,
                 'channel_name': character.channel_name,
-                'appearance_count': len(appearances),
+                'appearance_count': profile.appearance_count,
                 
                 # Averaged personality traits
-                'personality_averages': trait_averages,
+                'personality_averages': calculate_trait_averages(profile),
                 
                 # Most recent categorical traits
                 'latest_traits': {
@@ -204,9 +291,9 @@ def get_character_summary(character_id: int) -> Dict:
                 
                 # Accumulated data across all videos
                 'accumulated_data': {
-                    'all_quotes': list(set(all_quotes)),
-                    'all_catchphrases': list(set(all_catchphrases)),
-                    'all_signature_moments': list(set(all_moments)),
+                    'all_quotes': profile.quotes,
+                    'all_catchphrases': profile.catchphrases,
+                    'all_signature_moments': profile.signature_moments,
                 },
                 
                 # Latest visual description
@@ -223,22 +310,16 @@ def get_character_summary(character_id: int) -> Dict:
     finally:
         db.close()
 
-def calculate_trait_averages(appearances: List[CharacterAppearance]) -> Dict:
-    """Calculate average numerical traits across all appearances."""
-    numeric_traits = [
-        'confidence_level', 'humor_level', 'competitiveness', 
-        'trash_talk_frequency', 'profanity_usage'
-    ]
+def calculate_trait_averages(profile: CharacterProfile) -> Dict:
+    """Average numerical traits from a profile's running sums and counts."""
+    sums = profile.trait_sums or {}
+    counts = profile.trait_counts or {}
     
     averages = {}
-    for trait in numeric_traits:
-        values = [getattr(app, trait) for app in appearances if getattr(app, trait) is not None]
-        if values:
-            averages[trait] = round(sum(values) / len(values), 1)
-            averages[f'{trait}_count'] = len(values)  # How many videos contributed to this average
-        else:
-            averages[trait] = None
-            averages[f'{trait}_count'] = 0
+    for trait in NUMERIC_TRAITS:
+        count = counts.get(trait, 0)
+        averages[trait] = round(sums[trait] / count, 1) if count else None
+        averages[f'{trait}_count'] = count  # How many videos contributed to this average
     
     return averages
 
@@ -246,24 +327,34 @@ def get_character_evolution(character_id: int) -> Dict:
     """Get character trait evolution over time (chronological)."""
     db = SessionLocal()
     try:
-        appearances = db.query(CharacterAppearance).filter(
+        rows = db.query(
+            CharacterAppearance.video_analysis_id,
+            VideoAnalysis.youtube_url,
+            CharacterAppearance.created_at,
+            CharacterAppearance.confidence_level,
+            CharacterAppearance.humor_level,
+            CharacterAppearance.competitiveness,
+            CharacterAppearance.notable_quotes,
+            CharacterAppearance.performance_notes,
+        ).outerjoin(
+            VideoAnalysis, VideoAnalysis.id == CharacterAppearance.video_analysis_id
+        ).filter(
             CharacterAppearance.character_id == character_id
         ).order_by(CharacterAppearance.created_at).all()
         
         evolution = []
-        for app in appearances:
-            video = db.query(VideoAnalysis).filter(VideoAnalysis.id == app.video_analysis_id).first()
+        for row in rows:
             evolution.append({
-                'video_analysis_id': app.video_analysis_id,
-                'video_url': video.youtube_url if video else None,
-                'date': app.created_at.isoformat(),
-                'confidence_level': app.confidence_level,
-                'humor_level': app.humor_level,
-                'competitiveness': app.competitiveness,
-                'quotes': json.loads(app.notable_quotes) if app.notable_quotes else [],
-                'performance_notes': app.performance_notes
+                'video_analysis_id': row.video_analysis_id,
+                'video_url': row.youtube_url,
+                'date': row.created_at.isoformat(),
+                'confidence_level': row.confidence_level,
+                'humor_level': row.humor_level,
+                'competitiveness': row.competitiveness,
+                'quotes': json.loads(row.notable_quotes) if row.notable_quotes else [],
+                'performance_notes': row.performance_notes
             })
         
         return {'evolution': evolution}
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
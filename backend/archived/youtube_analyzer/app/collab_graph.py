@@ -0,0 +1,302 @@
+"""
+Channel Collaboration Graph
+Links channels whose videos mention each other, persisted to disk and
+updated incrementally as new videos are ingested
+"""
+
+import json
+import logging
+import os
+import re
+import struct
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HANDLE_PATTERN = re.compile(r'@([A-Za-z0-9_\-\.]{3,})')
+
+# Videos are re-read from this far before the watermark: discovered_at is
+# stamped when a transaction starts, so a slow one commits rows older than
+# videos already ingested. Re-read videos are skipped by ID.
+WATERMARK_OVERLAP = timedelta(minutes=int(os.getenv('COLLAB_GRAPH_OVERLAP_MINUTES', '60')))
+
+# Channel titles matched by name in video text must be this long and not
+# made only of generic golf words, or they would link half the catalog
+MIN_NAME_LENGTH = 5
+GENERIC_NAME_WORDS = {
+    'golf', 'golfer', 'golfers', 'golfing', 'the', 'channel', 'tv', 'official', 'videos', 'video',
+    'tips', 'lessons', 'academy', 'club', 'course', 'pro', 'shop', 'tour', 'life', 'daily', 'show',
+}
+
+MAGIC = b"GOLFCOL1"
+HEADER = struct.Struct("<8sQQQ")  # magic, meta length, node count, edge count
+
+
+def _normalize(name: str) -> str:
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+
+def is_distinctive_name(title: Optional[str]) -> bool:
+    """Whether a channel title is specific enough to count as a mention when it appears in text."""
+    if not title or len(title.strip()) < MIN_NAME_LENGTH:
+        return False
+    words = re.findall(r'\w+', title.lower())
+    return any(word not in GENERIC_NAME_WORDS for word in words)
+
+
+class CollaborationGraph:
+    """
+    Undirected weighted graph over channels. Nodes are integer indexes;
+    unknown @handles become `mention:<handle>` nodes so they can surface
+    as discovery suggestions. Updates go into adjacency dicts and queries
+    run on compressed sparse row (CSR) arrays rebuilt when the graph changes.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.watermark: Optional[str] = None  # Latest discovered_at ingested
+        self.recent_videos: Dict[str, str] = {}  # video id -> discovered_at, within WATERMARK_OVERLAP
+        self.keys: List[str] = []  # node index -> channel id or mention key
+        self.names: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._adjacency: List[Dict[int, float]] = []
+        self._csr: Optional[Tuple[array, array, array]] = None
+        self._name_pattern = None
+        self._name_targets: Dict[str, str] = {}
+        self._handle_targets: Dict[str, str] = {}
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _node(self, key: str, name: str) -> int:
+        node = self._index.get(key)
+        if node is None:
+            node = len(self.keys)
+            self._index[key] = node
+            self.keys.append(key)
+            self.names.append(name)
+            self._adjacency.append({})
+        return node
+
+    def set_known_channels(self, channels: Dict[str, str]):
+        """Register {channel_id: title} and compile the name matcher used by add_video."""
+        self._name_targets = {}
+        self._handle_targets = {}
+        for channel_id, title in channels.items():
+            self.names[self._node(channel_id, title)] = title
+            if is_distinctive_name(title):
+                self._name_targets[title.lower()] = channel_id
+                self._handle_targets[_normalize(title)] = channel_id
+
+        # Lookarounds instead of \b, so titles that start or end in punctuation still match
+        alternatives = sorted(self._name_targets, key=len, reverse=True)
+        self._name_pattern = re.compile(
+            r"(?<!\w)(?:" + "|".join(re.escape(name) for name in alternatives) + r")(?!\w)"
+        ) if alternatives else None
+
+    def add_video(self, channel_id: str, title: str, description: Optional[str]) -> int:
+        """Add edges from a video's channel to every channel it mentions. Returns edges added."""
+        text = f"{title} {description or ''}"
+        mentioned = set()
+
+        if self._name_pattern is not None:
+            for match in self._name_pattern.finditer(text.lower()):
+                mentioned.add(self._name_targets[match.group()])
+
+        for handle in HANDLE_PATTERN.findall(text):
+            target = self._handle_targets.get(_normalize(handle))
+            if target is None:
+                target = f"mention:{handle.lower()}"
+                self._node(target, f"@{handle}")
+            mentioned.add(target)
+
+        mentioned.discard(channel_id)
+        if not mentioned:
+            return 0
+
+        source = self._node(channel_id, channel_id)
+        for key in mentioned:
+            target = self._index[key]
+            self._adjacency[source][target] = self._adjacency[source].get(target, 0.0) + 1.0
+            self._adjacency[target][source] = self._adjacency[target].get(source, 0.0) + 1.0
+        self._csr = None
+        return len(mentioned)
+
+    def since(self) -> Optional[datetime]:
+        """discovered_at to read new videos from: the watermark less WATERMARK_OVERLAP, or None for all."""
+        if self.watermark is None:
+            return None
+        return datetime.fromisoformat(self.watermark) - WATERMARK_OVERLAP
+
+    def add_videos(self, videos: Iterable[Tuple[str, str, str, Optional[str], Optional[datetime]]]) -> int:
+        """
+        Add a batch of (video_id, channel_id, title, description, discovered_at)
+        rows. Videos already ingested within the overlap window are skipped.
+        Returns the number of videos added.
+        """
+        added = 0
+        for video_id, channel_id, title, description, discovered_at in videos:
+            if video_id in self.recent_videos:
+                continue
+            self.add_video(channel_id, title, description)
+            added += 1
+            if discovered_at is not None:
+                stamp = discovered_at.isoformat()
+                self.recent_videos[video_id] = stamp
+                if self.watermark is None or stamp > self.watermark:
+                    self.watermark = stamp
+
+        # Videos older than the next read's start are never seen again
+        since = self.since()
+        if since is not None:
+            cutoff = since.isoformat()
+            self.recent_videos = {video: stamp for video, stamp in self.recent_videos.items() if stamp >= cutoff}
+        return added
+
+    def _compile(self) -> Tuple[array, array, array]:
+        if self._csr is None:
+            indptr, indices, weights = array('I', [0]), array('I'), array('f')
+            for neighbors in self._adjacency:
+                for target in sorted(neighbors):
+                    indices.append(target)
+                    weights.append(neighbors[target])
+                indptr.append(len(indices))
+            self._csr = (indptr, indices, weights)
+        return self._csr
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def name(self, key: str) -> Optional[str]:
+        node = self._index.get(key)
+        return None if node is None else self.names[node]
+
+    def neighbors(self, key: str) -> List[Tuple[str, str, float]]:
+        """Return (key, name, weight) for every channel linked to `key`, strongest first."""
+        node = self._index.get(key)
+        if node is None:
+            return []
+        indptr, indices, weights = self._compile()
+        start, end = indptr[node], indptr[node + 1]
+        result = [(self.keys[indices[k]], self.names[indices[k]], weights[k]) for k in range(start, end)]
+        result.sort(key=lambda item: -item[2])
+        return result
+
+    def pagerank(self, damping: float = 0.85, iterations: int = 30) -> Dict[str, float]:
+        """Weighted PageRank centrality for every node."""
+        indptr, indices, weights = self._compile()
+        n = len(self.keys)
+        if n == 0:
+            return {}
+
+        out_weight = [sum(weights[indptr[u]:indptr[u + 1]]) for u in range(n)]
+        rank = [1.0 / n] * n
+        for _ in range(iterations):
+            dangling = sum(rank[u] for u in range(n) if not out_weight[u])
+            base = (1.0 - damping) / n + damping * dangling / n
+            new_rank = [base] * n
+            for u in range(n):
+                if out_weight[u]:
+                    share = damping * rank[u] / out_weight[u]
+                    for k in range(indptr[u], indptr[u + 1]):
+                        new_rank[indices[k]] += share * weights[k]
+            rank = new_rank
+
+        return {self.keys[u]: rank[u] for u in range(n)}
+
+    def two_hop_suggestions(self, whitelist: Iterable[str], limit: int = 20) -> List[Dict]:
+        """
+        Channels exactly two hops from the whitelist, scored by the summed
+        weight of the paths that reach them.
+        """
+        indptr, indices, weights = self._compile()
+        seeds = {self._index[key] for key in whitelist if key in self._index}
+
+        first_hop: Dict[int, float] = {}
+        for seed in seeds:
+            for k in range(indptr[seed], indptr[seed + 1]):
+                node = indices[k]
+                if node not in seeds:
+                    first_hop[node] = first_hop.get(node, 0.0) + weights[k]
+
+        scores: Dict[int, float] = {}
+        via: Dict[int, Tuple[float, int]] = {}  # strongest single path per node
+        for middle, middle_weight in first_hop.items():
+            for k in range(indptr[middle], indptr[middle + 1]):
+                node = indices[k]
+                if node in seeds or node in first_hop:
+                    continue
+                score = min(middle_weight, weights[k])
+                scores[node] = scores.get(node, 0.0) + score
+                if node not in via or score > via[node][0]:
+                    via[node] = (score, middle)
+
+        ranked = sorted(scores, key=lambda node: -scores[node])[:limit]
+        return [{
+            'key': self.keys[node],
+            'name': self.names[node],
+            'score': scores[node],
+            'via': self.names[via[node][1]]
+        } for node in ranked]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        if not path:
+            raise ValueError("No path given for saving the collaboration graph")
+
+        indptr, indices, weights = self._compile()
+        meta = json.dumps({
+            'keys': self.keys,
+            'names': self.names,
+            'watermark': self.watermark,
+            'recent_videos': self.recent_videos
+        }, separators=(',', ':')).encode('utf-8')
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(meta), len(self.keys), len(indices)))
+            f.write(meta)
+            indptr.tofile(f)
+            indices.tofile(f)
+            weights.tofile(f)
+        os.replace(tmp_path, path)
+        logger.info(f"Saved collaboration graph ({len(self.keys)} channels, {len(indices) // 2} links) to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> 'CollaborationGraph':
+        graph = cls(path)
+        with open(path, 'rb') as f:
+            magic, meta_len, node_count, edge_count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a collaboration graph file")
+            meta = json.loads(f.read(meta_len))
+            indptr, indices, weights = array('I'), array('I'), array('f')
+            indptr.fromfile(f, node_count + 1)
+            indices.fromfile(f, edge_count)
+            weights.fromfile(f, edge_count)
+
+        graph.keys = meta['keys']
+        graph.names = meta['names']
+        graph.watermark = meta['watermark']
+        graph.recent_videos = meta.get('recent_videos', {})
+        graph._index = {key: node for node, key in enumerate(graph.keys)}
+        graph._adjacency = [
+            {indices[k]: weights[k] for k in range(indptr[node], indptr[node + 1])}
+            for node in range(node_count)
+        ]
+        graph._csr = (indptr, indices, weights)
+        return graph
+
+    @classmethod
+    def open(cls, path: str) -> 'CollaborationGraph':
+        if os.path.exists(path):
+            return cls.load(path)
+        return cls(path)
@@ -67,8 +67,7 @@ class GolfDataCollector:
                 
                 # Save to database
                 with self.directory.SessionLocal() as session:
-                    for video_data in videos:
-                        self.directory._upsert_video(session, video_data)
+                    self.directory.ingest_videos(session, videos)
                     session.commit()
                     
             except Exception as e:
@@ -119,8 +118,7 @@ class GolfDataCollector:
                     
                     # Save to database
                     with self.directory.SessionLocal() as session:
-                        for video_data in videos:
-                            self.directory._upsert_video(session, video_data)
+                        self.directory.ingest_videos(session, videos)
                         session.commit()
                     
                     logger.info(f"Collected {len(videos)} videos from channel {channel_id}")
@@ -154,29 +152,31 @@ class GolfDataCollector:
             ]
         }
         
-        for category, queries in category_queries.items():
-            for query in queries:
-                if self.api_quota_used >= self.daily_quota_limit - 100:
-                    logger.warning("Approaching daily API quota limit, stopping collection")
-                    return
-                    
-                try:
-                    videos = self.directory.youtube_client.search_golf_videos(
-                        query=query,
-                        max_results=25
-                    )
-                    self.api_quota_used += 100
-                    
-                    # Save with category
+        query_categories = {
+            query: category
+            for category, queries in category_queries.items()
+            for query in queries
+        }
+        
+        # The planner drops the lowest-yield queries when the remaining quota can't cover them all
+        planner = self.directory.search_planner
+        budget = self.daily_quota_limit - self.api_quota_used
+        spent_before = planner.quota_spent
+        for query, videos in planner.run(list(query_categories), budget, max_results=25,
+                                        categories=query_categories):
+            category = query_categories[query]
+            try:
+                if videos:
                     with self.directory.SessionLocal() as session:
-                        for video_data in videos:
-                            self.directory._upsert_video(session, video_data)
+                        self.directory.ingest_videos(session, videos)
                         session.commit()
-                    
-                    logger.info(f"Collected {len(videos)} videos for {category}: {query}")
-                    
-                except Exception as e:
-                    logger.error(f"Error collecting {category} videos: {str(e)}")
+                
+                logger.info(f"Collected {len(videos)} new videos for {category}: {query}")
+                
+            except Exception as e:
+                logger.error(f"Error collecting {category} videos: {str(e)}")
+        
+        self.api_quota_used += planner.quota_spent - spent_before
     
     def update_existing_videos(self):
         """Update statistics for existing videos in database."""
@@ -200,8 +200,7 @@ class GolfDataCollector:
                         videos = self.directory.youtube_client.get_video_details(batch)
                         self.api_quota_used += len(batch)
                         
-                        for video_data in videos:
-                            self.directory._upsert_video(session, video_data)
+                        self.directory.ingest_videos(session, videos)
                         
                         session.commit()
                         logger.info(f"Updated {len(videos)} existing videos")
@@ -225,6 +224,7 @@ class GolfDataCollector:
         
         # 4. Update existing videos
         self.update_existing_videos()
+        self.directory.save_search_index()
         
         # 5. Update rankings
         logger.info("Updating rankings...")
@@ -2,12 +2,14 @@
 FastAPI endpoints for the Golf YouTube Directory
 """
 
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
+import os
+from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 from youtube_analyzer.app.golf_directory import GolfDirectory
+from youtube_analyzer.app.ranking_cache import RankingCache, CHANNELS_KEY
 
 app = FastAPI(title="Golf YouTube Directory API", version="2.0")
 
@@ -20,7 +22,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-directory = GolfDirectory()
+directory = GolfDirectory(offline=os.getenv('GOLF_DIRECTORY_OFFLINE') == '1')
+# Rankings are computed in the database; offline instances serve search only
+ranking_cache = None if directory.offline else RankingCache(
+    directory, ttl_seconds=int(os.getenv('RANKING_CACHE_TTL', '300'))
+)
 
 
 class VideoRanking(BaseModel):
@@ -52,6 +58,33 @@ class SearchResult(BaseModel):
     url: str
 
 
+@app.on_event("startup")
+def start_ranking_cache():
+    if ranking_cache is not None:
+        ranking_cache.start()
+
+
+@app.on_event("shutdown")
+def stop_ranking_cache():
+    if ranking_cache is not None:
+        ranking_cache.stop()
+
+
+def _require_database():
+    if directory.offline:
+        raise HTTPException(status_code=503, detail="Not available in offline mode (GOLF_DIRECTORY_OFFLINE=1).")
+
+
+def _cached_response(request: Request, key: str, limit: int) -> Response:
+    """Serve a cached ranking payload, answering 304 when the client's ETag matches."""
+    _require_database()
+    body, etag = ranking_cache.get(key, limit)
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=60"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @app.get("/")
 def read_root():
     return {
@@ -62,6 +95,7 @@ def read_root():
             "/rankings/{ranking_type}": "Get video rankings",
             "/channels/top": "Get top golf channels",
             "/search": "Search golf videos",
+            "/search/suggest": "Autocomplete search terms",
             "/update": "Update video catalog (requires API key)"
         }
     }
@@ -69,6 +103,7 @@ def read_root():
 
 @app.get("/rankings/{ranking_type}", response_model=List[VideoRanking])
 def get_rankings(
+    request: Request,
     ranking_type: str = "daily_trending",
     limit: int = Query(20, ge=1, le=100)
 ):
@@ -85,21 +120,23 @@ def get_rankings(
     if ranking_type not in valid_types:
         raise HTTPException(status_code=400, detail=f"Invalid ranking type. Choose from: {valid_types}")
     
-    return directory.get_rankings(ranking_type, limit)
+    return _cached_response(request, ranking_type, limit)
 
 
 @app.get("/channels/top", response_model=List[ChannelStats])
-def get_top_channels(limit: int = Query(20, ge=1, le=100)):
+def get_top_channels(request: Request, limit: int = Query(20, ge=1, le=100)):
     """
     Get top golf channels by total video views.
     """
-    return directory.get_top_channels(limit)
+    return _cached_response(request, CHANNELS_KEY, limit)
 
 
 @app.get("/search", response_model=List[SearchResult])
 def search_videos(
     q: str = Query(..., description="Search query"),
-    category: Optional[str] = Query(None, description="Filter by category")
+    category: Optional[str] = Query(None, description="Filter by category"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=100)
 ):
     """
     Search for golf videos.
@@ -109,19 +146,34 @@ def search_videos(
     if len(q) < 2:
         raise HTTPException(status_code=400, detail="Query must be at least 2 characters")
     
-    results = directory.search_videos(q, category)
+    results = directory.search_videos(q, category, page=page, page_size=page_size)
     if not results:
         raise HTTPException(status_code=404, detail="No videos found")
     
     return results
 
 
+@app.get("/search/suggest", response_model=List[str])
+def suggest_terms(
+    q: str = Query(..., min_length=1, description="Prefix typed so far"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """
+    Autocomplete search terms from the embedded search index.
+    """
+    if directory.search_index is None:
+        raise HTTPException(status_code=503, detail="Search index not configured. Set GOLF_SEARCH_INDEX.")
+    
+    return directory.search_index.suggest(q, limit)
+
+
 @app.post("/update")
 async def update_catalog(background_tasks: BackgroundTasks):
     """
     Update the video catalog with latest data from YouTube.
     Requires YOUTUBE_API_KEY or GOOGLE_API_KEY environment variable.
     """
+    _require_database()
     if not directory.youtube_client:
         raise HTTPException(
             status_code=503,
@@ -136,6 +188,7 @@ def update_catalog_task():
     """Background task to update catalog."""
     directory.update_video_catalog()
     directory.update_rankings()
+    ranking_cache.refresh()
 
 
 @app.get("/stats")
@@ -143,6 +196,7 @@ def get_directory_stats():
     """
     Get statistics about the directory.
     """
+    _require_database()
     with directory.SessionLocal() as session:
         from youtube_analyzer.app.models_metadata import YouTubeVideo, YouTubeChannel
         
@@ -0,0 +1,155 @@
+"""
+Download planning for frame analysis.
+Instead of downloading the whole best-quality MP4, resolve a low-resolution
+stream and decide which time ranges are worth decoding: windows around
+scoring events mentioned in the captions, or evenly spaced samples. ffmpeg
+then reads only those ranges over HTTP while the pipeline consumes frames.
+"""
+
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import yt_dlp
+
+from analysis.vtt_parser import load_vtt
+
+logger = logging.getLogger(__name__)
+
+# 720p is enough for scoreboard OCR; H.264 decodes fastest on CPU-only workers
+ANALYSIS_FORMAT = (
+    'bestvideo[height<=720][vcodec^=avc1]/bestvideo[height<=720]/'
+    'best[height<=720]/worst'
+)
+
+# Videos shorter than this are decoded in full
+FULL_DECODE_SECONDS = int(os.getenv('FULL_DECODE_SECONDS', '1200'))
+EVENT_LEAD_SECONDS = 15  # Graphics often appear just before the commentary catches up
+EVENT_TRAIL_SECONDS = 30  # ...and stay up after the putt drops
+SAMPLE_SEGMENT_SECONDS = 60
+MAX_COVERAGE = float(os.getenv('MAX_DECODE_COVERAGE', '0.35'))  # Share of a long video we decode
+
+SCORING_PATTERN = re.compile(
+    r'\b(?:birdie|eagle|albatross|bogey|hole[- ]in[- ]one|ace|leaderboard|'
+    r'under par|over par|one under|two under|all square|\d+ up|to win)\b',
+    re.IGNORECASE
+)
+
+
+@dataclass
+class DownloadPlan:
+    """What to decode: a stream URL (or local path), its HTTP headers and the time ranges."""
+    source: str
+    duration: float
+    segments: List[Tuple[float, float]] = field(default_factory=list)
+    headers: dict = field(default_factory=dict)
+    format_note: str = ''
+
+    def input_options(self, start: float, end: float) -> List[str]:
+        """ffmpeg input options that seek to and bound one segment."""
+        options = ['-ss', f'{start:.2f}', '-t', f'{end - start:.2f}']
+        if self.headers:
+            header_lines = ''.join(f'{name}: {value}\r\n' for name, value in self.headers.items())
+            options = ['-headers', header_lines] + options
+        return options
+
+    @property
+    def decoded_seconds(self) -> float:
+        return sum(end - start for start, end in self.segments)
+
+
+def resolve_stream(youtube_url: str) -> dict:
+    """Resolve the low-resolution analysis format without downloading anything."""
+    ydl_opts = {
+        'format': ANALYSIS_FORMAT,
+        'quiet': True,
+        'ignoreconfig': True,
+        'nocheckcertificate': True,
+        'no_cachedir': True,
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(youtube_url, download=False)
+
+    # A merged format lists its parts; use the video-only part
+    chosen = (info.get('requested_formats') or [info])[0]
+    return {
+        'url': chosen['url'],
+        'headers': chosen.get('http_headers') or info.get('http_headers') or {},
+        'duration': float(info.get('duration') or 0),
+        'format_note': f"{chosen.get('format_id')} {chosen.get('height')}p {chosen.get('vcodec')}",
+    }
+
+
+def find_scoring_events(caption_path: Optional[str]) -> List[float]:
+    """Start times (seconds) of caption cues that mention a scoring event."""
+    if not caption_path or not os.path.exists(caption_path):
+        return []
+    # Rolling-caption repeats are already dropped, so each mention is one cue
+    return [start for start, _, text in load_vtt(caption_path).cues() if SCORING_PATTERN.search(text)]
+
+
+def _merge(segments: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    merged = []
+    for start, end in sorted(segments):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def plan_segments(duration: float, events: List[float]) -> List[Tuple[float, float]]:
+    """
+    Time ranges to decode. Short videos are decoded whole. Longer ones get a
+    window around every caption scoring event, topped up (or, without
+    events, replaced) by evenly spaced samples, within MAX_COVERAGE.
+    """
+    if duration <= 0:
+        return []
+    if duration <= FULL_DECODE_SECONDS:
+        return [(0.0, duration)]
+
+    budget = duration * MAX_COVERAGE
+    segments = _merge([
+        (max(event - EVENT_LEAD_SECONDS, 0.0), min(event + EVENT_TRAIL_SECONDS, duration))
+        for event in events
+    ])
+
+    # Too many events: keep the windows evenly across the video rather than the first ones
+    covered = sum(end - start for start, end in segments)
+    if covered > budget:
+        keep = max(int(len(segments) * budget / covered), 1)
+        stride = len(segments) / keep
+        segments = [segments[int(i * stride)] for i in range(keep)]
+        covered = sum(end - start for start, end in segments)
+
+    # Spend what is left on samples so quiet stretches still get looked at
+    remaining = budget - covered
+    samples = int(remaining // SAMPLE_SEGMENT_SECONDS)
+    if samples > 0:
+        step = duration / samples
+        for i in range(samples):
+            start = i * step + (step - SAMPLE_SEGMENT_SECONDS) / 2
+            segments.append((max(start, 0.0), min(start + SAMPLE_SEGMENT_SECONDS, duration)))
+
+    return _merge(segments)
+
+
+def plan_download(youtube_url: str, caption_path: Optional[str] = None) -> DownloadPlan:
+    """Resolve the analysis stream and choose the segments to decode."""
+    stream = resolve_stream(youtube_url)
+    events = find_scoring_events(caption_path)
+    plan = DownloadPlan(
+        source=stream['url'],
+        duration=stream['duration'],
+        segments=plan_segments(stream['duration'], events),
+        headers=stream['headers'],
+        format_note=stream['format_note'],
+    )
+    logger.info(
+        f"Download plan: {plan.format_note}, {len(events)} caption scoring events, "
+        f"{len(plan.segments)} segments covering {plan.decoded_seconds:.0f}s of {plan.duration:.0f}s"
+    )
+    return plan
@@ -20,6 +20,46 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Channels we actively track; also the whitelist for collaboration-graph suggestions
+TRACKED_CHANNELS = {
+    # Major Golf YouTubers
+    "UCq-Rqdgna3OJxPg3aBt3c3Q": "Rick Shiels Golf",
+    "UCfi-mPMOmche6WI-jkvnGXw": "Good Good",
+    "UC9ywmLLYtiWKC0nHPWA_53g": "GM Golf",
+    "UCDnv_1DzQGaHCPz6Jc6cfjQ": "TXG - Tour Experience Golf",
+    "UCVZMKsVxmgYpgtfcbkq1mZg": "Peter Finch Golf",
+    "UCZelGnfKLXic4gDP8xfwXKg": "Golf Sidekick",
+    "UCaioJ73g8HlZ8d3apaiCMxg": "Micah Morris Golf",
+    "UC0QLmupAq9GktezSAk_oVCw": "Bryan Bros Golf",
+    "UCgUueMmSpcl-aCTt5CuCKQw": "Grant Horvat Golf",
+    "UCl4Z0A7wt0aw-gHPcPXBxKA": "Luke Kwon Golf",
+    
+    # Instruction Focused
+    "UCXPXrE2M8jmr1kUGQ0vuPEw": "Danny Maude",
+    "UCQd_qgUk2olgFhH3RXvYmhg": "Me and My Golf",
+    "UCbQQKqbwJp3N_m7LwmJzYrw": "Clay Ballard - Top Speed Golf",
+    "UC9FgOZOz1vRGJCaReNQXKmA": "Athletic Motion Golf",
+    "UCAE0t7yWXUgXyKC3w5VeHKw": "Chris Ryan Golf",
+    
+    # Tour/Professional
+    "UCKwGZZMrhNYKzucCtTPY2Nw": "PGA TOUR",
+    "UCRBxbDlh5-1-9mXz1Dd7UCA": "DP World Tour",
+    "UCxu1btBKsH-iGJmqN3hf1Gw": "USGA",
+    "UC7TqDvBSuz9e_dKOaNGauJQ": "The Open",
+    
+    # Entertainment/Vlog Style
+    "UCaS8PbJ4skMeqsNJN7xAQmg": "Foreplay Golf",
+    "UCHmAKsNPQ1FdJ0hQ4WhZMPQ": "No Laying Up",
+    "UC2Xqy5e1NjdGNwTjmXTLkuA": "Random Golf Club",
+    "UCW21y7vjvMOJEGQzTK3MXQA": "Golf Life TV",
+    
+    # Rising/Newer Channels
+    "UC79Zncey_Jlk": "George Bryan",
+    "UCCHuiIcQ24gAyqJJa4fcJFA": "Divot Dudes",
+    "UCUOqlmPAo8h4pVQ4cuRECUg": "Big Wedge Golf",
+}
+
+
 
 class ExpandedGolfCollector:
     def __init__(self):
@@ -61,14 +101,13 @@ class ExpandedGolfCollector:
                     videos = self.directory.youtube_client.get_video_details(video_ids)
                     
                     with SessionLocal() as session:
-                        for video_data in videos:
-                            try:
-                                self.directory._upsert_video(session, video_data)
-                                session.commit()
-                                videos_collected += 1
-                            except Exception as e:
-                                session.rollback()
-                                logger.error(f"Error saving video: {e}")
+                        try:
+                            written = self.directory.ingest_videos(session, videos)
+                            session.commit()
+                            videos_collected += written
+                        except Exception as e:
+                            session.rollback()
+                            logger.error(f"Error saving video batch: {e}")
                 
                 next_page_token = playlist_response.get('nextPageToken')
                 if not next_page_token:
@@ -126,12 +165,12 @@ class ExpandedGolfCollector:
             )
             
             with SessionLocal() as session:
-                for video_data in videos:
-                    try:
-                        self.directory._upsert_video(session, video_data)
-                        session.commit()
-                    except Exception as e:
-                        session.rollback()
+                try:
+                    self.directory.ingest_videos(session, videos)
+                    session.commit()
+                except Exception as e:
+                    session.rollback()
+                    logger.error(f"Error saving video batch: {e}")
     
     def collect_tournament_content(self):
         """Collect content from major tournaments."""
@@ -149,62 +188,23 @@ class ExpandedGolfCollector:
             "PGA Tour highlights this week"
         ]
         
-        for tournament in tournaments:
-            videos = self.directory.youtube_client.search_golf_videos(
-                query=tournament,
-                max_results=20,
-                order="viewCount"
-            )
+        for tournament, videos in self.directory.search_planner.run(
+            tournaments, max_results=20, order="viewCount", category='tournament'
+        ):
+            if not videos:
+                continue
             
             with SessionLocal() as session:
-                for video_data in videos:
-                    try:
-                        self.directory._upsert_video(session, video_data)
-                        session.commit()
-                    except Exception as e:
-                        session.rollback()
+                try:
+                    self.directory.ingest_videos(session, videos)
+                    session.commit()
+                except Exception as e:
+                    session.rollback()
+                    logger.error(f"Error saving video batch: {e}")
     
     def expand_channel_list(self):
         """Expanded list of golf channels to track."""
-        channels = {
-            # Major Golf YouTubers
-            "UCq-Rqdgna3OJxPg3aBt3c3Q": "Rick Shiels Golf",
-            "UCfi-mPMOmche6WI-jkvnGXw": "Good Good",
-            "UC9ywmLLYtiWKC0nHPWA_53g": "GM Golf",
-            "UCDnv_1DzQGaHCPz6Jc6cfjQ": "TXG - Tour Experience Golf",
-            "UCVZMKsVxmgYpgtfcbkq1mZg": "Peter Finch Golf",
-            "UCZelGnfKLXic4gDP8xfwXKg": "Golf Sidekick",
-            "UCaioJ73g8HlZ8d3apaiCMxg": "Micah Morris Golf",
-            "UC0QLmupAq9GktezSAk_oVCw": "Bryan Bros Golf",
-            "UCgUueMmSpcl-aCTt5CuCKQw": "Grant Horvat Golf",
-            "UCl4Z0A7wt0aw-gHPcPXBxKA": "Luke Kwon Golf",
-            
-            # Instruction Focused
-            "UCXPXrE2M8jmr1kUGQ0vuPEw": "Danny Maude",
-            "UCQd_qgUk2olgFhH3RXvYmhg": "Me and My Golf",
-            "UCbQQKqbwJp3N_m7LwmJzYrw": "Clay Ballard - Top Speed Golf",
-            "UC9FgOZOz1vRGJCaReNQXKmA": "Athletic Motion Golf",
-            "UCAE0t7yWXUgXyKC3w5VeHKw": "Chris Ryan Golf",
-            
-            # Tour/Professional
-            "UCKwGZZMrhNYKzucCtTPY2Nw": "PGA TOUR",
-            "UCRBxbDlh5-1-9mXz1Dd7UCA": "DP World Tour",
-            "UCxu1btBKsH-iGJmqN3hf1Gw": "USGA",
-            "UC7TqDvBSuz9e_dKOaNGauJQ": "The Open",
-            
-            # Entertainment/Vlog Style
-            "UCaS8PbJ4skMeqsNJN7xAQmg": "Foreplay Golf",
-            "UCHmAKsNPQ1FdJ0hQ4WhZMPQ": "No Laying Up",
-            "UC2Xqy5e1NjdGNwTjmXTLkuA": "Random Golf Club",
-            "UCW21y7vjvMOJEGQzTK3MXQA": "Golf Life TV",
-            
-            # Rising/Newer Channels
-            "UC79Zncey_Jlk": "George Bryan",
-            "UCCHuiIcQ24gAyqJJa4fcJFA": "Divot Dudes",
-            "UCUOqlmPAo8h4pVQ4cuRECUg": "Big Wedge Golf",
-        }
-        
-        for channel_id, name in channels.items():
+        for channel_id, name in TRACKED_CHANNELS.items():
             logger.info(f"Collecting from {name}")
             self.collect_historical_channel_data(channel_id, max_videos=30)
     
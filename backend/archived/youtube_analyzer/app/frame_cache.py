@@ -0,0 +1,30 @@
+"""
+Content-addressed cache of frame analysis results.
+A result is keyed by the sha256 of the encoded frame bytes, the sha256 of
+the prompt (and request settings) and the model name, so re-analysing a
+video only sends the frames, or prompts, that changed.
+"""
+
+import hashlib
+from typing import Tuple
+
+from analysis.result_cache import LOCAL_CACHE_SIZE, ResultCache
+
+from .models import FrameResult
+
+FrameKey = Tuple[str, str, str]  # (frame_hash, prompt_hash, model)
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def frame_key(frame_bytes: bytes, prompt: str, model: str) -> FrameKey:
+    return sha256_hex(frame_bytes), sha256_hex(prompt.encode('utf-8')), model
+
+
+class FrameResultCache(ResultCache):
+    """Frame results by FrameKey."""
+
+    def __init__(self, session_factory=None, max_local: int = LOCAL_CACHE_SIZE):
+        super().__init__(FrameResult, ['frame_hash', 'prompt_hash', 'model'], 'result', session_factory, max_local)
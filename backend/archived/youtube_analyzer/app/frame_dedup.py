@@ -0,0 +1,156 @@
+"""
+Perceptual-hash deduplication for sampled video frames.
+Near-identical frames (static scoreboards, long held shots) are clustered so
+only one frame per cluster is sent to the vision model.
+"""
+
+import logging
+import os
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8  # 8x8 gradient bits -> 64-bit hash
+DEFAULT_THRESHOLD = int(os.getenv("FRAME_DEDUP_THRESHOLD", "6"))  # max differing bits per hash
+
+# A frame's signature is a whole-frame hash plus one per overlay region, so a
+# graphic covering a small part of the picture still separates two frames.
+# Regions are (top, bottom, left, right) fractions, matching graphic_filter.
+SIGNATURE_REGIONS = (
+    (0.0, 1.0, 0.0, 1.0),  # whole frame
+    (2 / 3, 1.0, 0.0, 1.0),  # lower third
+    (0.0, 0.2, 0.0, 1.0),  # top band
+    (0.0, 1.0, 0.0, 1 / 3),  # left column
+)
+
+# Bit count for every byte value, used to popcount XORed hashes in bulk
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def dhash(image) -> int:
+    """
+    Difference hash of a PIL image or 2-D/3-D uint8 array: shrink to
+    (HASH_SIZE + 1) x HASH_SIZE grayscale and set one bit per horizontal
+    gradient sign.
+    """
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    small = np.asarray(
+        image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BILINEAR),
+        dtype=np.int16,
+    )
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def frame_signature(image) -> Tuple[int, ...]:
+    """dHash of the whole frame and of each overlay region in SIGNATURE_REGIONS."""
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    gray = image.convert("L")
+    width, height = gray.size
+    return tuple(
+        dhash(gray.crop((int(left * width), int(top * height), int(right * width), int(bottom * height))))
+        for top, bottom, left, right in SIGNATURE_REGIONS
+    )
+
+
+def signature_file(image_path: str) -> Tuple[int, ...]:
+    with Image.open(image_path) as img:
+        img.draft("L", (HASH_SIZE * 32, HASH_SIZE * 32))  # JPEG DCT downscale, much faster decode
+        return frame_signature(img)
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _distances(signature: Tuple[int, ...], signatures: np.ndarray) -> np.ndarray:
+    """
+    Distance from one signature to every row of an (n, regions) uint64
+    array: the largest per-region Hamming distance.
+    """
+    xored = np.bitwise_xor(signatures, np.array(signature, dtype=np.uint64))
+    bits = _POPCOUNT[xored.view(np.uint8)].reshape(len(signatures), -1, 8).sum(axis=2)
+    return bits.max(axis=1)
+
+
+class FrameClusterer:
+    """
+    Streaming greedy leader clustering over frame signatures. Each frame
+    joins the nearest existing
+    representative within `threshold` bits, otherwise it starts a new
+    cluster. Comparing against all representatives (not only the previous
+    frame) also catches graphics that reappear later in the video.
+    """
+
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.count = 0
+        self._signatures = np.empty((64, len(SIGNATURE_REGIONS)), dtype=np.uint64)
+
+    def add(self, signature: Tuple[int, ...]) -> Tuple[int, bool]:
+        """Returns (cluster index, whether this signature started a new cluster)."""
+        if self.count:
+            distances = _distances(signature, self._signatures[:self.count])
+            nearest = int(distances.argmin())
+            if distances[nearest] <= self.threshold:
+                return nearest, False
+        if self.count == len(self._signatures):
+            self._signatures = np.resize(self._signatures, (self.count * 2, len(SIGNATURE_REGIONS)))
+        self._signatures[self.count] = signature
+        self.count += 1
+        return self.count - 1, True
+
+
+def cluster_signatures(signatures: Sequence[Tuple[int, ...]],
+                       threshold: int = DEFAULT_THRESHOLD) -> Tuple[List[int], List[int]]:
+    """
+    Cluster a list of frame signatures with FrameClusterer.
+
+    Returns (representative indexes, cluster position for every signature).
+    """
+    clusterer = FrameClusterer(threshold)
+    representatives: List[int] = []
+    assignment: List[int] = []
+    for i, signature in enumerate(signatures):
+        cluster, is_new = clusterer.add(signature)
+        if is_new:
+            representatives.append(i)
+        assignment.append(cluster)
+    return representatives, assignment
+
+
+def deduplicate_frames(frame_paths: Sequence[str], threshold: int = DEFAULT_THRESHOLD) -> Tuple[List[str], List[int]]:
+    """
+    Cluster frame files by perceptual signature.
+
+    Returns (representative frame paths, frame_map) where frame_map[i] is the
+    index into the representatives whose result applies to frame_paths[i].
+    Frames that fail to decode are kept as their own representative.
+    """
+    signatures = []
+    unreadable = []
+    for i, path in enumerate(frame_paths):
+        try:
+            signatures.append(signature_file(path))
+        except Exception as e:
+            logger.warning(f"Could not hash frame {path}: {e}")
+            signatures.append(None)
+            unreadable.append(i)
+
+    readable = [i for i, s in enumerate(signatures) if s is not None]
+    rep_positions, assignment = cluster_signatures([signatures[i] for i in readable], threshold)
+
+    representatives = [frame_paths[readable[pos]] for pos in rep_positions]
+    frame_map = [0] * len(frame_paths)
+    for i, cluster in zip(readable, assignment):
+        frame_map[i] = cluster
+    for i in unreadable:
+        frame_map[i] = len(representatives)
+        representatives.append(frame_paths[i])
+
+    return representatives, frame_map
@@ -0,0 +1,105 @@
+"""
+In-process frame pipeline for the analyzer worker.
+Sampled frames are decoded from ffmpeg stdout, hashed, pre-filtered and
+JPEG-encoded in memory; only the frames worth a model call leave the
+process, as data: URIs that the worker stores in the frame result store.
+"""
+
+import logging
+import os
+import tempfile
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .ai_processing import encode_frame_bytes, frame_data_uri
+from .download_planner import DownloadPlan
+from .frame_dedup import FrameClusterer, frame_signature, DEFAULT_THRESHOLD
+from .frame_sampler import (
+    DEFAULT_FRAME_BUDGET, copy_segment, iter_selected_frames, probe_change_scores, select_frames
+)
+from .graphic_filter import GRAPHIC_FILTER_ENABLED, GRAPHIC_THRESHOLD, is_likely_graphic
+
+logger = logging.getLogger(__name__)
+
+
+def _segment_frames(video_path: str, frame_budget: int, plan: Optional[DownloadPlan]
+                    ) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Yield sampled frames for the whole file, or for each planned segment in
+    turn. Segments are copied to a temp file first so each is fetched once.
+    """
+    if plan is None:
+        indexes = select_frames(probe_change_scores(video_path), frame_budget)
+        yield from iter_selected_frames(video_path, indexes)
+        return
+
+    decoded = plan.decoded_seconds or 1.0
+    with tempfile.TemporaryDirectory(prefix="segments_") as segments_dir:
+        for number, (start, end) in enumerate(plan.segments):
+            # Fetch the segment once; the probe and the selection pass both read the local copy
+            segment_path = copy_segment(
+                plan.source, os.path.join(segments_dir, f"segment_{number:03d}.mkv"), plan.input_options(start, end)
+            )
+            # Share the frame budget by segment length; every segment gets at least one frame
+            segment_budget = max(round(frame_budget * (end - start) / decoded), 1)
+            indexes = select_frames(probe_change_scores(segment_path), segment_budget)
+            yield from iter_selected_frames(segment_path, indexes)
+            os.remove(segment_path)
+
+
+def frame_call_savings(sampled: int, unique: int, analyzed: int, graphic_filter: bool) -> str:
+    """Log summary that credits skipped model calls to dedup and to the graphic filter separately."""
+    filtered = f"{unique - analyzed} skipped by the graphic filter" if graphic_filter else "graphic filter off"
+    return (f"{sampled} sampled, {unique} unique ({sampled - unique} calls saved by dedup), "
+            f"{analyzed} to analyze ({filtered})")
+
+
+def prepare_video_frames(video_path: Optional[str], frame_budget: int = DEFAULT_FRAME_BUDGET,
+                         persist_dir: Optional[str] = None,
+                         dedup_threshold: int = DEFAULT_THRESHOLD,
+                         graphic_threshold: float = GRAPHIC_THRESHOLD,
+                         graphic_filter: bool = GRAPHIC_FILTER_ENABLED,
+                         plan: Optional[DownloadPlan] = None) -> Tuple[List[str], List[int]]:
+    """
+    Sample, deduplicate and pre-filter a video's frames without writing them.
+
+    Frames come from the local `video_path`, or with a download `plan` from
+    the planned segments of its (remote) stream.
+
+    Returns (frames, frame_map): the encoded frames to analyze, and for every
+    sampled frame the index of the encoded frame whose result applies to it,
+    or -1 when its cluster showed no graphic (only with `graphic_filter` on).
+    With `persist_dir`, every sampled frame is also saved there as
+    frame_%04d.jpg, in the same encoding that is sent to the model.
+    """
+    if persist_dir:
+        os.makedirs(persist_dir, exist_ok=True)
+
+    clusterer = FrameClusterer(dedup_threshold)
+    cluster_frames: List[int] = []  # cluster -> position in `frames`, or -1
+    frames: List[str] = []
+    frame_map: List[int] = []
+
+    for position, (_, rgb) in enumerate(_segment_frames(video_path, frame_budget, plan)):
+        # Wraps the reused decode buffer; everything below finishes before the next frame
+        image = Image.fromarray(rgb)
+        encoded = None
+        if persist_dir:
+            # The file holds the bytes sent to the model, so a re-analysis hashes to the same cache keys
+            encoded = encode_frame_bytes(image)
+            with open(os.path.join(persist_dir, f"frame_{position + 1:04d}.jpg"), "wb") as f:
+                f.write(encoded)
+
+        cluster, is_new = clusterer.add(frame_signature(image))
+        if is_new:
+            if not graphic_filter or is_likely_graphic(image, graphic_threshold):
+                cluster_frames.append(len(frames))
+                frames.append(frame_data_uri(encoded if encoded is not None else encode_frame_bytes(image)))
+            else:
+                cluster_frames.append(-1)
+        frame_map.append(cluster_frames[cluster])
+
+    logger.info(f"Frame pipeline: {frame_call_savings(len(frame_map), clusterer.count, len(frames), graphic_filter)}")
+    return frames, frame_map
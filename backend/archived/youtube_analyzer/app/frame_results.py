@@ -0,0 +1,120 @@
+"""
+Per-analysis frames and frame results, kept in Redis outside the chord.
+The encoded frames are stored under one key each and task messages carry
+only the keys. Frame tasks write the OCR text of the frames that showed a
+graphic into a hash as they finish and return only a count, so chord
+results and the callback message stay small however many frames a video
+has. The callback reads the hash, and the frame map and transcript stored
+next to it, once.
+"""
+
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+# Long enough for the slowest chord to finish; entries are deleted after synthesis
+RESULT_TTL_SECONDS = int(os.getenv('FRAME_RESULT_TTL_SECONDS', str(6 * 3600)))
+
+
+class FrameResultStore:
+    """
+    Frame results by analysis ID. `frames` maps a candidate frame index to
+    its OCR text (frames without a graphic are not stored); `frame_map`
+    maps every sampled frame to a candidate index, or -1.
+    """
+
+    def __init__(self, client: redis.Redis, ttl: int = RESULT_TTL_SECONDS):
+        self.client = client
+        self.ttl = ttl
+
+    @classmethod
+    def from_url(cls, url: str) -> 'FrameResultStore':
+        return cls(redis.Redis.from_url(url, decode_responses=True))
+
+    def _frames_key(self, analysis_id: int) -> str:
+        return f"analysis:{analysis_id}:frames"
+
+    def _map_key(self, analysis_id: int) -> str:
+        return f"analysis:{analysis_id}:frame_map"
+
+    def _inputs_key(self, analysis_id: int) -> str:
+        return f"analysis:{analysis_id}:synthesis_inputs"
+
+    def _frame_key(self, analysis_id: int, index: int) -> str:
+        return f"analysis:{analysis_id}:frame:{index}"
+
+    def start(self, analysis_id: int, frame_map: List[int]):
+        """Clear results of an earlier run and store the frame map for the callback."""
+        with self.client.pipeline() as pipe:
+            pipe.delete(self._frames_key(analysis_id))
+            pipe.set(self._map_key(analysis_id), json.dumps(frame_map), ex=self.ttl)
+            pipe.execute()
+
+    def put_synthesis_inputs(self, analysis_id: int, transcript: str, transcript_chunks: Optional[list],
+                             caption_info: Optional[dict]):
+        """Store what the callback needs besides frame results, so its message carries only the ID."""
+        inputs = {'transcript': transcript, 'transcript_chunks': transcript_chunks, 'caption_info': caption_info}
+        self.client.set(self._inputs_key(analysis_id), json.dumps(inputs), ex=self.ttl)
+
+    def synthesis_inputs(self, analysis_id: int) -> Optional[dict]:
+        """{'transcript', 'transcript_chunks', 'caption_info'}, or None when missing or expired."""
+        stored = self.client.get(self._inputs_key(analysis_id))
+        return json.loads(stored) if stored is not None else None
+
+    def put_frames(self, analysis_id: int, frames: List[str]) -> List[str]:
+        """
+        Store encoded frames by candidate index. Returns their keys, in order.
+        Frames are always data: URIs; file paths would not resolve on other worker hosts.
+        """
+        if any(not frame.startswith("data:") for frame in frames):
+            raise ValueError("Frames must be stored as data: URIs, not file paths")
+        keys = [self._frame_key(analysis_id, index) for index in range(len(frames))]
+        with self.client.pipeline() as pipe:
+            for key, frame in zip(keys, frames):
+                pipe.set(key, frame, ex=self.ttl)
+            pipe.execute()
+        return keys
+
+    def load_frames(self, keys: List[str]) -> List[Optional[str]]:
+        """Encoded frames by key; None where a frame is missing or expired."""
+        return self.client.mget(keys) if keys else []
+
+    def drop_frames(self, keys: List[str]):
+        """Delete frames once their results are stored; the TTL covers batches that never finish."""
+        if keys:
+            self.client.delete(*keys)
+
+    def put(self, analysis_id: int, offset: int, results: List[Optional[str]]) -> int:
+        """Store one batch's results, the first at candidate index `offset`. Returns how many had text."""
+        found = {offset + i: text for i, text in enumerate(results) if text}
+        if found:
+            key = self._frames_key(analysis_id)
+            with self.client.pipeline() as pipe:
+                pipe.hset(key, mapping=found)
+                pipe.expire(key, self.ttl)
+                pipe.execute()
+        return len(found)
+
+    def frames(self, analysis_id: int) -> Dict[int, str]:
+        return {int(index): text for index, text in self.client.hgetall(self._frames_key(analysis_id)).items()}
+
+    def frame_map(self, analysis_id: int) -> Optional[List[int]]:
+        stored = self.client.get(self._map_key(analysis_id))
+        return json.loads(stored) if stored is not None else None
+
+    def ocr_results(self, analysis_id: int) -> List[Optional[str]]:
+        """OCR text (or None) for every sampled frame, in order."""
+        frames = self.frames(analysis_id)
+        frame_map = self.frame_map(analysis_id)
+        if frame_map is None:
+            logger.warning(f"[{analysis_id}] Frame map missing or expired; using stored frames in index order")
+            return [frames[index] for index in sorted(frames)]
+        return [frames.get(index) if index >= 0 else None for index in frame_map]
+
+    def clear(self, analysis_id: int):
+        self.client.delete(self._frames_key(analysis_id), self._map_key(analysis_id), self._inputs_key(analysis_id))
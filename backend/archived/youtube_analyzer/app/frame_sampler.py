@@ -0,0 +1,243 @@
+"""
+Adaptive frame sampling for the analyzer worker.
+A cheap low-resolution luma pass scores every probe frame for scene and
+graphic changes; full-size frames are then streamed only at the chosen
+timestamps, within a per-video frame budget.
+"""
+
+import functools
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PROBE_FPS = 2  # Luma probe rate; selected frames are indexes at this rate
+PROBE_WIDTH, PROBE_HEIGHT = 160, 90
+HISTOGRAM_BINS = 32
+
+SCENE_THRESHOLD = float(os.getenv("FRAME_SCENE_THRESHOLD", "0.25"))
+LOWER_THIRD_WEIGHT = 2.0  # Overlays live in the lower third; weight its pixel diff up
+SETTLE_FRAMES = 1  # Sample just after a transition so the graphic has finished animating in
+MIN_SPACING_SECONDS = 3
+MAX_GAP_SECONDS = 60  # Static stretches still get one frame per gap
+DEFAULT_FRAME_BUDGET = int(os.getenv("FRAME_BUDGET", "120"))
+
+OUTPUT_WIDTH, OUTPUT_HEIGHT = 1280, 720
+OUTPUT_SIZE = f"{OUTPUT_WIDTH}:{OUTPUT_HEIGHT}"
+
+# Preference order, with the check that the device actually exists on this host
+_HWACCEL_DEVICES = [
+    ("cuda", lambda: os.path.exists("/dev/nvidia0")),
+    ("qsv", lambda: os.path.exists("/dev/dri/renderD128")),
+    ("vaapi", lambda: os.path.exists("/dev/dri/renderD128")),
+    ("videotoolbox", lambda: sys.platform == "darwin"),
+]
+
+
+@functools.lru_cache(maxsize=1)
+def detect_hwaccel() -> List[str]:
+    """
+    Return ffmpeg input args for a hardware decoder that ffmpeg supports
+    and whose device is present, or [] to decode in software.
+    """
+    if os.getenv("FFMPEG_HWACCEL") == "none" or not shutil.which("ffmpeg"):
+        return []
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-hwaccels"], capture_output=True, text=True, timeout=10
+        )
+    except (subprocess.SubprocessError, OSError):
+        return []
+    supported = set(result.stdout.split())
+
+    for name, device_present in _HWACCEL_DEVICES:
+        if name in supported and device_present():
+            logger.info(f"Using ffmpeg hardware decoder: {name}")
+            return ["-hwaccel", name]
+    return []
+
+
+def _read_exact(stream, buffer: memoryview) -> bool:
+    """Fill `buffer` from a pipe; False on EOF before a full frame."""
+    filled = 0
+    while filled < len(buffer):
+        count = stream.readinto(buffer[filled:])
+        if not count:
+            return False
+        filled += count
+    return True
+
+
+def _read_stderr(stderr_file) -> str:
+    """
+    ffmpeg's stderr, written to a temp file rather than a pipe: nothing
+    reads a pipe until stdout ends, and a full one would stall ffmpeg.
+    """
+    stderr_file.seek(0)
+    return stderr_file.read().decode(errors="replace")
+
+
+def probe_change_scores(video_path: str, hwaccel: Optional[List[str]] = None,
+                        input_options: Optional[List[str]] = None) -> np.ndarray:
+    """
+    Decode the video at PROBE_FPS as tiny grayscale frames over a pipe and
+    return one change score per probe frame (0 for the first).
+
+    The score is the larger of the normalized luma-histogram distance to the
+    previous frame and the weighted mean pixel change in the lower third.
+    `input_options` go before -i, e.g. -ss/-t to probe one segment of a stream.
+    """
+    hwaccel = detect_hwaccel() if hwaccel is None else hwaccel
+    command = [
+        "ffmpeg", "-v", "error", *hwaccel, *(input_options or []), "-i", video_path,
+        "-vf", f"fps={PROBE_FPS},scale={PROBE_WIDTH}:{PROBE_HEIGHT}",
+        "-f", "rawvideo", "-pix_fmt", "gray", "pipe:1",
+    ]
+    frame_size = PROBE_WIDTH * PROBE_HEIGHT
+    lower_third = slice(PROBE_HEIGHT * 2 // 3, PROBE_HEIGHT)
+
+    current = np.empty((PROBE_HEIGHT, PROBE_WIDTH), dtype=np.uint8)
+    previous = np.empty_like(current)
+    view = memoryview(current).cast("B")
+    scores = []
+    prev_hist = None
+
+    stderr_file = tempfile.TemporaryFile()
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file, bufsize=frame_size * 8)
+    try:
+        while _read_exact(proc.stdout, view):
+            hist = np.bincount(current.ravel() >> 3, minlength=HISTOGRAM_BINS) / frame_size
+            if prev_hist is None:
+                scores.append(0.0)
+            else:
+                hist_diff = 0.5 * np.abs(hist - prev_hist).sum()
+                region_diff = np.abs(
+                    current[lower_third].astype(np.int16) - previous[lower_third]
+                ).mean() / 255
+                scores.append(max(hist_diff, LOWER_THIRD_WEIGHT * region_diff))
+            prev_hist = hist
+            previous[...] = current
+    finally:
+        proc.stdout.close()
+        proc.wait()
+        stderr = _read_stderr(stderr_file)
+        stderr_file.close()
+
+    if proc.returncode != 0:
+        if hwaccel:
+            logger.warning(f"Hardware decode failed ({stderr.strip()[:200]}), retrying in software")
+            return probe_change_scores(video_path, hwaccel=[], input_options=input_options)
+        raise subprocess.CalledProcessError(proc.returncode, command, stderr=stderr)
+    return np.asarray(scores, dtype=np.float32)
+
+
+def select_frames(scores: np.ndarray, frame_budget: int = DEFAULT_FRAME_BUDGET,
+                  threshold: float = SCENE_THRESHOLD, fps: float = PROBE_FPS) -> List[int]:
+    """
+    Choose probe-frame indexes to keep: strongest transitions first (spaced
+    at least MIN_SPACING_SECONDS apart), then evenly spaced fillers for gaps
+    longer than MAX_GAP_SECONDS. Over budget, fillers are dropped before
+    transitions and weak transitions before strong ones.
+    """
+    count = len(scores)
+    if count == 0 or frame_budget <= 0:
+        return []
+
+    min_spacing = max(int(MIN_SPACING_SECONDS * fps), 1)
+    max_gap = max(int(MAX_GAP_SECONDS * fps), 1)
+
+    kept = {}  # index -> priority
+    for index in np.argsort(-scores):
+        score = float(scores[index])
+        if score < threshold:
+            break
+        index = min(int(index) + SETTLE_FRAMES, count - 1)
+        if all(abs(index - other) >= min_spacing for other in kept):
+            kept[index] = score
+
+    # Fill long static stretches, including the start and end of the video
+    boundaries = [-1] + sorted(kept) + [count]
+    for start, end in zip(boundaries, boundaries[1:]):
+        gap = end - start
+        if gap > max_gap:
+            fillers = gap // max_gap
+            step = gap / (fillers + 1)
+            for k in range(1, fillers + 1):
+                kept.setdefault(int(start + k * step), 0.0)
+    if not kept:
+        kept[0] = 0.0
+
+    ranked = sorted(kept, key=lambda index: -kept[index])[:frame_budget]
+    return sorted(ranked)
+
+
+def _select_filter(indexes: List[int]) -> str:
+    """Filter chain that keeps only the given probe-frame indexes at output size."""
+    select = "+".join(f"eq(n\\,{index})" for index in indexes)
+    return f"fps={PROBE_FPS},select='{select}',scale={OUTPUT_SIZE}"
+
+
+def copy_segment(source: str, segment_path: str, input_options: Optional[List[str]] = None) -> str:
+    """
+    Copy the video stream of `source` (within `input_options`, e.g. -ss/-t)
+    to a local file without re-encoding, so a remote segment is read once
+    however many passes decode it. The copy starts at the keyframe at or
+    before the requested start.
+    """
+    command = [
+        "ffmpeg", "-y", "-v", "error", *(input_options or []), "-i", source,
+        "-map", "0:v:0", "-c", "copy", segment_path,
+    ]
+    subprocess.run(command, check=True, capture_output=True, text=True, timeout=3600)
+    return segment_path
+
+
+def iter_selected_frames(video_path: str, indexes: List[int],
+                         hwaccel: Optional[List[str]] = None,
+                         input_options: Optional[List[str]] = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Stream the selected probe-frame indexes as RGB arrays straight from
+    ffmpeg stdout, without touching disk.
+
+    The same (OUTPUT_HEIGHT, OUTPUT_WIDTH, 3) buffer is refilled for every
+    frame; copy it if it has to outlive the next iteration.
+    """
+    if not indexes:
+        return
+    hwaccel = detect_hwaccel() if hwaccel is None else hwaccel
+    command = [
+        "ffmpeg", "-v", "error", *hwaccel, *(input_options or []), "-i", video_path,
+        "-vf", _select_filter(indexes),
+        "-fps_mode", "vfr", "-f", "rawvideo", "-pix_fmt", "rgb24", "pipe:1",
+    ]
+    frame = np.empty((OUTPUT_HEIGHT, OUTPUT_WIDTH, 3), dtype=np.uint8)
+    view = memoryview(frame).cast("B")
+
+    stderr_file = tempfile.TemporaryFile()
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file, bufsize=len(view))
+    emitted = 0
+    try:
+        while emitted < len(indexes) and _read_exact(proc.stdout, view):
+            yield indexes[emitted], frame
+            emitted += 1
+    finally:
+        proc.stdout.close()
+        if emitted == len(indexes):
+            proc.kill()
+        proc.wait()
+        stderr = _read_stderr(stderr_file)
+        stderr_file.close()
+
+    if emitted < len(indexes) and proc.returncode != 0:
+        if hwaccel and emitted == 0:
+            logger.warning(f"Hardware decode failed ({stderr.strip()[:200]}), retrying in software")
+            yield from iter_selected_frames(video_path, indexes, hwaccel=[], input_options=input_options)
+            return
+        raise subprocess.CalledProcessError(proc.returncode, command, stderr=stderr)
@@ -6,30 +6,61 @@ A metadata-driven approach to organizing golf content on YouTube
 import os
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional
-from sqlalchemy import desc, func
+from sqlalchemy import desc, event, func
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from youtube_analyzer.app.models import YouTubeVideo, YouTubeChannel, VideoRanking
 from youtube_analyzer.app.database import engine, SessionLocal, Base
 from youtube_analyzer.app.youtube_metadata import YouTubeMetadataClient
+from youtube_analyzer.app.search_index import VideoSearchIndex
+from youtube_analyzer.app.categorizer import categorizer
+from youtube_analyzer.app.search_planner import SearchPlanner
 import isodate
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Search index updates staged on a session, applied only once it commits
+PENDING_INDEX_UPDATES = 'pending_search_index_updates'
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_index_updates(session: Session):
+    for search_index, video in session.info.pop(PENDING_INDEX_UPDATES, []):
+        search_index.add_video(video)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_index_updates(session: Session):
+    session.info.pop(PENDING_INDEX_UPDATES, None)
+
 
 class GolfDirectory:
-    def __init__(self):
-        # Use existing PostgreSQL database
-        Base.metadata.create_all(bind=engine)
+    def __init__(self, offline: bool = False):
+        """
+        With `offline=True` no database connection is made and search is served
+        from the embedded index at GOLF_SEARCH_INDEX (demo and edge instances).
+        """
+        self.offline = offline
+        if not offline:
+            # Use existing PostgreSQL database
+            Base.metadata.create_all(bind=engine)
         self.SessionLocal = SessionLocal
         
+        index_path = os.getenv('GOLF_SEARCH_INDEX')
+        self.search_index = VideoSearchIndex.open(index_path) if index_path else None
+        if offline and self.search_index is None:
+            raise ValueError("Offline mode requires GOLF_SEARCH_INDEX to point at a search index file")
+        
         api_key = os.getenv('YOUTUBE_API_KEY') or os.getenv('GOOGLE_API_KEY')
         self.youtube_client = YouTubeMetadataClient(api_key) if api_key else None
+        self.search_planner = SearchPlanner(self.youtube_client, self.SessionLocal) if api_key else None
     
-    def update_video_catalog(self, search_terms: List[str] = None):
+    def update_video_catalog(self, search_terms: List[str] = None, budget: Optional[int] = None):
         """
         Update the video catalog with latest golf videos.
+        Terms are planned by yield within `budget` quota units (default: what's left today).
         """
         if not self.youtube_client:
             print("No YouTube API key configured")
@@ -47,92 +78,119 @@ class GolfDirectory:
             ]
         
         with self.SessionLocal() as session:
-            for term in search_terms:
-                print(f"Searching for: {term}")
-                videos = self.youtube_client.search_golf_videos(query=term, max_results=25)
+            for term, videos in self.search_planner.run(search_terms, budget, max_results=25):
+                print(f"Searching for: {term} ({len(videos)} new videos)")
+                if not videos:
+                    continue
                 
-                for video_data in videos:
-                    try:
-                        self._upsert_video(session, video_data)
-                        session.commit()
-                    except Exception as e:
-                        session.rollback()
-                        print(f"Error saving video {video_data.get('id')}: {str(e)}")
+                try:
+                    self.ingest_videos(session, videos)
+                    session.commit()
+                except Exception as e:
+                    session.rollback()
+                    print(f"Error saving videos for {term}: {str(e)}")
+        
+        self.save_search_index()
+    
+    def save_search_index(self):
+        """Persist the embedded search index if upserts changed it."""
+        if self.search_index is not None and self.search_index.dirty:
+            self.search_index.save()
     
     def _upsert_video(self, session: Session, video_data: Dict):
         """
         Insert or update video and channel data.
         """
-        # Upsert channel
-        channel = session.query(YouTubeChannel).filter_by(id=video_data['channel_id']).first()
-        if not channel:
-            channel = YouTubeChannel(
-                id=video_data['channel_id'],
-                title=video_data['channel_title']
-            )
-            session.add(channel)
-            # Flush to avoid duplicate key errors in bulk operations
-            try:
-                session.flush()
-            except:
-                # Channel might have been added by another video in this batch
-                session.rollback()
-                channel = session.query(YouTubeChannel).filter_by(id=video_data['channel_id']).first()
+        self.ingest_videos(session, [video_data])
+    
+    def ingest_videos(self, session: Session, videos: List[Dict]) -> int:
+        """
+        Insert or update a batch of videos and their channels with two
+        INSERT ... ON CONFLICT statements. The caller commits once per batch;
+        the embedded search index sees the videos only after that commit.
+        Returns the number of distinct videos written.
+        """
+        if not videos:
+            return 0
+        
+        # Dedupe in memory: one statement cannot touch the same key twice
+        channels = {}
+        latest = {}
+        for video_data in videos:
+            channels.setdefault(video_data['channel_id'], video_data['channel_title'])
+            latest[video_data['id']] = video_data
+        
+        video_list = list(latest.values())
+        categories = categorizer.categorize_many(
+            f"{v['title']} {(v['description'] or '')[:1000]}" for v in video_list
+        )
+        now = datetime.now(timezone.utc)
+        rows = [
+            self._video_row(video_data, category, now)
+            for video_data, category in zip(video_list, categories)
+        ]
         
-        # Upsert video
-        video = session.query(YouTubeVideo).filter_by(id=video_data['id']).first()
-        if not video:
-            video = YouTubeVideo(id=video_data['id'])
-            session.add(video)
+        channel_stmt = pg_insert(YouTubeChannel.__table__).values([
+            {'id': channel_id, 'title': title} for channel_id, title in channels.items()
+        ]).on_conflict_do_nothing(index_elements=['id'])
+        session.execute(channel_stmt)
         
-        # Update video data
-        video.title = video_data['title']
-        video.description = video_data['description'][:1000]  # Truncate long descriptions
-        video.channel_id = video_data['channel_id']
+        video_stmt = pg_insert(YouTubeVideo.__table__).values(rows)
+        video_stmt = video_stmt.on_conflict_do_update(
+            index_elements=['id'],
+            set_={
+                **{column: video_stmt.excluded[column] for column in rows[0] if column != 'id'},
+                'updated_at': func.now()
+            }
+        )
+        session.execute(video_stmt)
+        
+        if self.search_index is not None:
+            session.info.setdefault(PENDING_INDEX_UPDATES, []).extend(
+                (self.search_index, {**row, 'channel_title': video_data['channel_title']})
+                for video_data, row in zip(video_list, rows)
+            )
+        
+        return len(rows)
+    
+    def _video_row(self, video_data: Dict, category: str, now: datetime) -> Dict:
+        """
+        Compute the stored youtube_videos row for one API video dict.
+        """
         # Parse published date with timezone
-        published_str = video_data['published_at'].replace('Z', '+00:00')
-        video.published_at = datetime.fromisoformat(published_str)
-        video.view_count = video_data['view_count']
-        video.like_count = video_data['like_count']
-        video.comment_count = video_data['comment_count']
-        video.engagement_rate = video_data['engagement_rate']
-        video.thumbnail_url = video_data['thumbnail']
+        published_at = datetime.fromisoformat(video_data['published_at'].replace('Z', '+00:00'))
+        if not published_at.tzinfo:
+            published_at = published_at.replace(tzinfo=timezone.utc)
         
         # Parse duration
         try:
-            duration = isodate.parse_duration(video_data['duration'])
-            video.duration_seconds = int(duration.total_seconds())
-        except:
-            video.duration_seconds = 0
+            duration_seconds = int(isodate.parse_duration(video_data['duration']).total_seconds())
+        except Exception:
+            duration_seconds = 0
         
-        # Calculate view velocity (handle timezone-aware datetime)
-        now = datetime.now(video.published_at.tzinfo) if video.published_at.tzinfo else datetime.now()
-        days_since_upload = (now - video.published_at).days or 1
-        video.view_velocity = video.view_count / days_since_upload
+        days_since_upload = (now - published_at).days or 1
         
-        # Categorize video based on title/description
-        video.category = self._categorize_video(video.title, video.description)
+        return {
+            'id': video_data['id'],
+            'title': video_data['title'],
+            'description': (video_data['description'] or '')[:1000],  # Truncate long descriptions
+            'channel_id': video_data['channel_id'],
+            'published_at': published_at,
+            'view_count': video_data['view_count'],
+            'like_count': video_data['like_count'],
+            'comment_count': video_data['comment_count'],
+            'engagement_rate': video_data['engagement_rate'],
+            'thumbnail_url': video_data['thumbnail'],
+            'duration_seconds': duration_seconds,
+            'view_velocity': video_data['view_count'] / days_since_upload,
+            'category': category
+        }
     
     def _categorize_video(self, title: str, description: str) -> str:
         """
-        Simple categorization based on keywords.
+        Keyword categorization, see categorizer.VideoCategorizer.
         """
-        text = (title + " " + description).lower()
-        
-        categories = {
-            'instruction': ['lesson', 'tip', 'how to', 'tutorial', 'teach', 'swing', 'putting', 'chipping'],
-            'equipment': ['review', 'club', 'ball', 'gear', 'equipment', 'shaft', 'driver', 'iron'],
-            'tour': ['pga', 'tour', 'tournament', 'round', 'leaderboard', 'championship'],
-            'highlights': ['highlight', 'best', 'shot', 'hole in one', 'ace', 'eagle'],
-            'vlog': ['vlog', 'course', 'round', 'playing', 'golf with'],
-            'news': ['news', 'update', 'announcement', 'breaking']
-        }
-        
-        for category, keywords in categories.items():
-            if any(keyword in text for keyword in keywords):
-                return category
-        
-        return 'general'
+        return categorizer.categorize(title, description)
     
     def update_rankings(self):
         """
@@ -267,29 +325,50 @@ class GolfDirectory:
             
             return results
     
-    def search_videos(self, query: str, category: Optional[str] = None) -> List[Dict]:
+    def search_videos(self, query: str, category: Optional[str] = None,
+                      page: int = 1, page_size: int = 50) -> List[Dict]:
         """
         Search videos in the local database.
+        
+        Uses the GIN-indexed `search_vector` column, so matching is
+        case-insensitive and stemmed. Results are ordered by relevance
+        (title hits rank above description hits), then by views.
         """
+        if self.offline:
+            return self.search_index.search(query, category, page=page, page_size=page_size)
+        
         with self.SessionLocal() as session:
-            search = session.query(YouTubeVideo)
+            ts_query = func.websearch_to_tsquery('english', query)
+            relevance = func.ts_rank_cd(YouTubeVideo.search_vector, ts_query).label('relevance')
             
-            # Text search in title and description
-            search = search.filter(
-                (YouTubeVideo.title.contains(query)) |
-                (YouTubeVideo.description.contains(query))
+            search = session.query(
+                YouTubeVideo.id,
+                YouTubeVideo.title,
+                YouTubeVideo.view_count,
+                YouTubeVideo.category,
+                YouTubeVideo.published_at,
+                YouTubeChannel.title.label('channel_title'),
+                relevance
+            ).join(
+                YouTubeChannel, YouTubeVideo.channel_id == YouTubeChannel.id
+            ).filter(
+                YouTubeVideo.search_vector.op('@@')(ts_query)
             )
             
+            # Filter in the same query so the planner can combine the category and text indexes
             if category:
                 search = search.filter(YouTubeVideo.category == category)
             
-            videos = search.order_by(desc(YouTubeVideo.view_count)).limit(50).all()
+            page = max(page, 1)
+            videos = search.order_by(
+                desc('relevance'), desc(YouTubeVideo.view_count)
+            ).offset((page - 1) * page_size).limit(page_size).all()
             
             results = []
             for video in videos:
                 results.append({
                     'title': video.title,
-                    'channel': video.channel.title,
+                    'channel': video.channel_title,
                     'views': f"{video.view_count:,}",
                     'category': video.category,
                     'published': video.published_at.strftime('%Y-%m-%d'),
@@ -0,0 +1,105 @@
+"""
+Cheap local pre-filter for on-screen graphics.
+Scores downscaled grayscale frames for overlay-like structure (dense
+high-contrast text rows, flat banner backgrounds, long straight banner
+edges) so frames without a scoreboard never reach the vision model.
+
+The filter is off unless GRAPHIC_FILTER=1. On the synthetic frame set in
+backend/tests/fixtures/graphic_frames (graphic_filter_eval.json) it keeps
+every overlay at 0.3 but also passes rope lines and grandstands (precision
+0.64); tune GRAPHIC_THRESHOLD with evaluate_graphic_filter.py against
+labeled broadcast frames before turning it on by default.
+"""
+
+import logging
+import os
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+GRAPHIC_FILTER_ENABLED = os.getenv("GRAPHIC_FILTER") == "1"
+GRAPHIC_THRESHOLD = float(os.getenv("GRAPHIC_THRESHOLD", "0.3"))
+ANALYSIS_SIZE = (480, 270)  # Keeps 720p broadcast text around 10 px tall
+
+EDGE_DELTA = 60  # Luma step that counts as a text/graphic edge
+TEXT_ROW_DENSITY = 0.08  # Fraction of edge pixels that makes a row look like text
+TEXT_BAND = 0.08  # Share of a region's rows that one line of overlay text fills
+FLAT_ROW_STD = 6.0  # Solid banner rows barely vary along the row
+MIN_BANNER_LUMA = 20  # Ignore black letterbox bars
+BORDER_SPAN = 0.4  # A banner edge runs across this fraction of the region width
+
+# Text rows gate the score; banner evidence scales it up to 1
+TEXT_WEIGHT, FLAT_WEIGHT, BORDER_WEIGHT = 0.5, 0.3, 0.2
+
+
+def _load_gray(image) -> np.ndarray:
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    if isinstance(image, str):
+        with Image.open(image) as img:
+            img.draft("L", ANALYSIS_SIZE)  # JPEG DCT downscale while decoding
+            return np.asarray(img.convert("L").resize(ANALYSIS_SIZE), dtype=np.float32)
+    return np.asarray(image.convert("L").resize(ANALYSIS_SIZE), dtype=np.float32)
+
+
+def _region_score(region: np.ndarray) -> float:
+    edges = np.abs(np.diff(region, axis=1)) > EDGE_DELTA
+    text_rows = (edges.mean(axis=1) > TEXT_ROW_DENSITY).mean()
+
+    flat_rows = ((region.std(axis=1) < FLAT_ROW_STD) & (region.mean(axis=1) > MIN_BANNER_LUMA)).mean()
+
+    horizontal_edges = np.abs(np.diff(region, axis=0)) > EDGE_DELTA
+    border = float((horizontal_edges.mean(axis=1) > BORDER_SPAN).any())
+
+    text = min(text_rows / TEXT_BAND, 1.0)
+    return text * (TEXT_WEIGHT + FLAT_WEIGHT * min(flat_rows * 3, 1.0) + BORDER_WEIGHT * border)
+
+
+def graphic_score(image) -> float:
+    """
+    Overlay likelihood in [0, 1] for a path, PIL image or uint8 array.
+    Regions where broadcast graphics usually sit are scored separately and
+    the best one wins.
+    """
+    gray = _load_gray(image)
+    height, width = gray.shape
+    regions = (
+        gray[height * 2 // 3:, :],  # lower third: name bars, hole info
+        gray[:height // 5, :],  # top band: tickers
+        gray[:, :width // 3],  # left column: leaderboards
+    )
+    return max(_region_score(region) for region in regions)
+
+
+def is_likely_graphic(image, threshold: float = GRAPHIC_THRESHOLD) -> bool:
+    return graphic_score(image) >= threshold
+
+
+def filter_frames(frame_paths: Sequence[str], threshold: float = GRAPHIC_THRESHOLD,
+                  enabled: bool = GRAPHIC_FILTER_ENABLED) -> Tuple[List[str], List[int]]:
+    """
+    Split frames into those worth a model call and those that are skipped.
+
+    Returns (kept paths, position of each input frame in the kept list or
+    -1 when skipped). Frames that fail to score are kept, and every frame
+    is kept when the filter is not enabled.
+    """
+    if not enabled:
+        return list(frame_paths), list(range(len(frame_paths)))
+    kept: List[str] = []
+    positions: List[int] = []
+    for path in frame_paths:
+        try:
+            keep = is_likely_graphic(path, threshold)
+        except Exception as e:
+            logger.warning(f"Could not score frame {path}: {e}")
+            keep = True
+        if keep:
+            positions.append(len(kept))
+            kept.append(path)
+        else:
+            positions.append(-1)
+    return kept, positions
@@ -127,14 +127,13 @@ class HistoricalCollector:
                         
                         # Save to database
                         with SessionLocal() as session:
-                            for video_data in videos:
-                                try:
-                                    self.directory._upsert_video(session, video_data)
-                                    session.commit()
-                                    collected += 1
-                                except Exception as e:
-                                    session.rollback()
-                                    logger.error(f"Error saving video: {e}")
+                            try:
+                                written = self.directory.ingest_videos(session, videos)
+                                session.commit()
+                                collected += written
+                            except Exception as e:
+                                session.rollback()
+                                logger.error(f"Error saving video batch: {e}")
                         
                         logger.info(f"Collected {collected} videos so far...")
                         
@@ -198,12 +197,12 @@ class HistoricalCollector:
                 
                 # Save videos
                 with SessionLocal() as session:
-                    for video_data in videos:
-                        try:
-                            self.directory._upsert_video(session, video_data)
-                            session.commit()
-                        except Exception as e:
-                            session.rollback()
+                    try:
+                        self.directory.ingest_videos(session, videos)
+                        session.commit()
+                    except Exception as e:
+                        session.rollback()
+                        logger.error(f"Error saving video batch: {e}")
                             
             except Exception as e:
                 logger.error(f"Error in discovery search '{search_term}': {e}")
@@ -2,12 +2,21 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import logging
+import os
+from typing import List, Optional
 from fastapi import FastAPI, Depends, HTTPException
-from pydantic import BaseModel, HttpUrl
-from sqlalchemy.orm import Session
+from celery import group
+from celery.utils import uuid
+from pydantic import BaseModel, Field, HttpUrl
+from sqlalchemy import bindparam, func, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from analysis import models as analysis_models
 from .worker import process_video, process_video_direct
-from .database import engine, Base, get_db
+from .database import engine, Base, get_async_db
 from .models import VideoAnalysis
+from .video_urls import normalize_video_url
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,6 +24,7 @@ logger = logging.getLogger(__name__)
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+analysis_models.Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="YouTube Golf Performance Analyzer",
@@ -27,7 +37,32 @@ class VideoSubmissionRequest(BaseModel):
     youtube_url: HttpUrl
 
 class TaskResponse(BaseModel):
-    task_id: str
+    task_id: Optional[str] = None
+    status: Optional[str] = None
+
+# Postgres allows 32767 bind parameters per statement. The bulk insert binds 3
+# per row (URL, status, task ID) and the lookup of existing records up to 2
+# per URL, so one request can never exceed 32767 // 3 URLs; the default leaves
+# headroom and keeps the response to a size clients handle comfortably.
+MAX_BIND_PARAMETERS = 32767
+MAX_BULK_URLS = min(int(os.getenv("MAX_BULK_URLS", "5000")), MAX_BIND_PARAMETERS // 3)
+
+class BulkSubmissionRequest(BaseModel):
+    youtube_urls: List[str] = Field(..., min_length=1, max_length=MAX_BULK_URLS)
+
+class SubmissionResult(BaseModel):
+    youtube_url: str
+    video_id: Optional[str] = None
+    status: str  # QUEUED, DUPLICATE, INVALID or FAILED
+    current_status: Optional[str] = None  # Status of the existing analysis, for duplicates
+    task_id: Optional[str] = None
+
+class BulkTaskResponse(BaseModel):
+    queued: int
+    duplicates: int
+    invalid: int
+    failed: int
+    results: List[SubmissionResult]
 
 
 @app.get("/")
@@ -40,44 +75,175 @@ async def submit_video_for_analysis(
     request: VideoSubmissionRequest,
     force: bool = False,
     persist_files: bool = False,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Accepts a YouTube URL, checks if it has been analyzed,
     adds it to the processing queue if not, and returns a task ID.
+    The URL is stored in its canonical watch form, so variants of the same
+    video are duplicates; anything that is not a video URL is rejected.
     A `force=true` query parameter can be used to re-run analysis.
     A `persist_files=true` query parameter saves files for re-analysis.
     """
     logger.info(f"Received request for URL: {request.youtube_url}, force={force}, persist_files={persist_files}")
-    video_url_str = str(request.youtube_url)
-    analysis = db.query(VideoAnalysis).filter(VideoAnalysis.youtube_url == video_url_str).first()
+    submitted_url = str(request.youtube_url)
+    video_id, video_url_str = normalize_video_url(submitted_url)
+    if not video_id:
+        raise HTTPException(status_code=422, detail="Not a YouTube video URL")
+    if submitted_url != video_url_str:
+        # Records created before URLs were normalized are stored as submitted
+        legacy_url = (await db.execute(
+            select(VideoAnalysis.youtube_url).where(VideoAnalysis.youtube_url == submitted_url)
+        )).scalar_one_or_none()
+        video_url_str = legacy_url or video_url_str
+
+    # Create the record, or claim an existing one on force=true, in one statement.
+    # The task ID is chosen up front so the row is complete before the task can run.
+    task_id = uuid()
+    statement = pg_insert(VideoAnalysis).values(youtube_url=video_url_str, status="QUEUED", task_id=task_id)
+    if force:
+        updates = {"status": "QUEUED", "task_id": task_id, "updated_at": func.now()}
+    else:
+        # A no-op update, so RETURNING also reports an existing record
+        updates = {"youtube_url": statement.excluded.youtube_url}
+    statement = statement.on_conflict_do_update(index_elements=["youtube_url"], set_=updates).returning(
+        VideoAnalysis.id, VideoAnalysis.task_id, VideoAnalysis.status,
+        literal_column("xmax = 0").label("inserted"),
+    )
+    analysis = (await db.execute(statement)).one()
+    await db.commit()
 
-    if analysis and not force:
+    if not analysis.inserted and not force:
         logger.warning(f"Duplicate request for URL: {video_url_str}. Current status: {analysis.status}. Use force=true to re-run.")
         return {"task_id": analysis.task_id, "status": f"DUPLICATE - Current status is {analysis.status}"}
 
-    # If the analysis doesn't exist, create it
-    if not analysis:
-        logger.info(f"No existing record found for {video_url_str}. Creating new record.")
-        analysis = VideoAnalysis(youtube_url=video_url_str)
-        db.add(analysis)
-        db.commit()
-        db.refresh(analysis)
-
-    # At this point, we have an `analysis` object, either new or pre-existing (with force=true)
-    # We can now queue the task and update the record.
-    analysis.status = "QUEUED"
-    db.commit()
-
+    # Publishing to the broker is blocking network I/O; keep it off the event loop
     logger.info(f"Dispatching direct video analysis task to Celery for analysis ID: {analysis.id}...")
-    task = process_video_direct.delay(
-        analysis_id=analysis.id,
-        youtube_url=video_url_str,
-        persist_files=persist_files
+    try:
+        await run_in_threadpool(
+            process_video_direct.apply_async,
+            kwargs={"analysis_id": analysis.id, "youtube_url": video_url_str, "persist_files": persist_files},
+            task_id=task_id,
+        )
+    except Exception as e:
+        logger.error(f"Could not dispatch analysis ID {analysis.id}: {e}")
+        await db.execute(update(VideoAnalysis).where(VideoAnalysis.id == analysis.id).values(status="FAILED"))
+        await db.commit()
+        raise HTTPException(status_code=503, detail="Task queue unavailable")
+    logger.info(f"Direct analysis task dispatched with ID: {task_id}")
+
+    return {"task_id": task_id, "status": "QUEUED"}
+
+
+@app.post("/analyze-videos/", response_model=BulkTaskResponse)
+async def submit_videos_for_analysis(
+    request: BulkSubmissionRequest,
+    force: bool = False,
+    persist_files: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Bulk version of /analyze-video/ for up to MAX_BULK_URLS URLs.
+    URLs are normalized to video IDs; repeats within the request share one
+    result. Existing analyses are found in one query, new ones are inserted
+    in one statement, and all tasks are published as one Celery group.
+    `force=true` re-queues existing analyses as well.
+    """
+    logger.info(f"Received bulk request for {len(request.youtube_urls)} URLs, force={force}, persist_files={persist_files}")
+
+    # First submitted URL per video ID; both it and the canonical form may already be stored
+    videos = {}
+    for url in request.youtube_urls:
+        video_id, canonical = normalize_video_url(url)
+        if video_id and video_id not in videos:
+            videos[video_id] = (url, canonical)
+
+    existing = {}
+    if videos:
+        stored_urls = {url: video_id for video_id, (submitted, canonical) in videos.items()
+                       for url in (submitted, canonical)}
+        rows = await db.execute(
+            select(VideoAnalysis.id, VideoAnalysis.youtube_url, VideoAnalysis.task_id, VideoAnalysis.status)
+            .where(VideoAnalysis.youtube_url.in_(list(stored_urls)))
+        )
+        for row in rows:
+            existing.setdefault(stored_urls[row.youtube_url], row)
+
+    # video_id -> (analysis ID, canonical or stored URL, task ID) for everything to dispatch
+    dispatch = {}
+    new_ids = [video_id for video_id in videos if video_id not in existing]
+    if new_ids:
+        task_ids = {video_id: uuid() for video_id in new_ids}
+        # A concurrent submission of the same video wins the conflict; it is reported as a duplicate below
+        inserted = await db.execute(
+            pg_insert(VideoAnalysis)
+            .values([{"youtube_url": videos[video_id][1], "status": "QUEUED", "task_id": task_ids[video_id]}
+                     for video_id in new_ids])
+            .on_conflict_do_nothing(index_elements=["youtube_url"])
+            .returning(VideoAnalysis.id, VideoAnalysis.youtube_url)
+        )
+        canonical_ids = {videos[video_id][1]: video_id for video_id in new_ids}
+        for analysis_id, youtube_url in inserted:
+            video_id = canonical_ids[youtube_url]
+            dispatch[video_id] = (analysis_id, youtube_url, task_ids[video_id])
+    if force and existing:
+        requeued = {video_id: (row.id, row.youtube_url, uuid()) for video_id, row in existing.items()}
+        # One executemany on the session's connection; each row gets its own task ID
+        connection = await db.connection()
+        await connection.execute(
+            update(VideoAnalysis)
+            .where(VideoAnalysis.id == bindparam("analysis_id"))
+            .values(status="QUEUED", task_id=bindparam("new_task_id"), updated_at=func.now()),
+            [{"analysis_id": analysis_id, "new_task_id": task_id} for analysis_id, _, task_id in requeued.values()],
+        )
+        dispatch.update(requeued)
+    await db.commit()
+
+    failed = set()
+    if dispatch:
+        tasks = group(
+            process_video_direct.signature(
+                kwargs={"analysis_id": analysis_id, "youtube_url": youtube_url, "persist_files": persist_files},
+                task_id=task_id,
+            )
+            for analysis_id, youtube_url, task_id in dispatch.values()
+        )
+        # One producer and connection for the whole batch, off the event loop
+        try:
+            await run_in_threadpool(tasks.apply_async)
+            logger.info(f"Dispatched {len(dispatch)} direct analysis tasks")
+        except Exception as e:
+            logger.error(f"Could not dispatch {len(dispatch)} analysis tasks: {e}")
+            await db.execute(
+                update(VideoAnalysis)
+                .where(VideoAnalysis.id.in_([analysis_id for analysis_id, _, _ in dispatch.values()]))
+                .values(status="FAILED")
+            )
+            await db.commit()
+            failed = set(dispatch)
+
+    results = []
+    for url in request.youtube_urls:
+        video_id, _ = normalize_video_url(url)
+        if video_id is None:
+            results.append(SubmissionResult(youtube_url=url, status="INVALID"))
+        elif video_id in failed:
+            results.append(SubmissionResult(youtube_url=url, video_id=video_id, status="FAILED"))
+        elif video_id in dispatch:
+            results.append(SubmissionResult(youtube_url=url, video_id=video_id, status="QUEUED",
+                                            task_id=dispatch[video_id][2]))
+        elif video_id in existing:
+            row = existing[video_id]
+            results.append(SubmissionResult(youtube_url=url, video_id=video_id, status="DUPLICATE",
+                                            current_status=row.status, task_id=row.task_id))
+        else:
+            # Inserted by a concurrent request between our lookup and insert
+            results.append(SubmissionResult(youtube_url=url, video_id=video_id, status="DUPLICATE"))
+
+    counts = {status: sum(1 for result in results if result.status == status)
+              for status in ("QUEUED", "DUPLICATE", "INVALID", "FAILED")}
+    logger.info(f"Bulk submission: {counts}")
+    return BulkTaskResponse(
+        queued=counts["QUEUED"], duplicates=counts["DUPLICATE"], invalid=counts["INVALID"],
+        failed=counts["FAILED"], results=results,
     )
-    
-    analysis.task_id = task.id
-    db.commit()
-    logger.info(f"Direct analysis task dispatched with ID: {task.id}")
-
-    return {"task_id": task.id, "status": "QUEUED"} 
\ No newline at end of file
@@ -3,11 +3,15 @@
 Add YouTube metadata tables to existing PostgreSQL database.
 """
 
-from youtube_analyzer.app.database import engine, Base
+from youtube_analyzer.app.database import engine, Base, SessionLocal
 from youtube_analyzer.app.models import (
     VideoAnalysis, Character, CharacterAppearance,
-    YouTubeChannel, YouTubeVideo, VideoRanking, SearchQuery
+    YouTubeChannel, YouTubeVideo, VideoRanking, SearchQuery, SearchResultCache, ChannelMentionLookup, FrameResult, CharacterProfile,
+    SEARCH_VECTOR_EXPRESSION
 )
+from analysis import models as analysis_models
+from youtube_analyzer.app.character_processing_v2 import normalize_name, rebuild_character_profiles
+from sqlalchemy import text
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -21,8 +25,16 @@ def migrate_database():
     try:
         # Create all tables (will skip existing ones)
         Base.metadata.create_all(bind=engine)
+        analysis_models.Base.metadata.create_all(bind=engine)
         logger.info("✓ YouTube metadata tables created successfully")
         
+        # create_all does not alter existing tables, so add the search column explicitly
+        add_search_index()
+        add_ranking_run_id()
+        add_search_yield_columns()
+        add_character_normalized_name()
+        build_character_profiles()
+        
         # Check what tables exist
         from sqlalchemy import inspect
         inspector = inspect(engine)
@@ -48,5 +60,94 @@ def migrate_database():
         raise
 
 
+def add_search_index():
+    """Add the generated full-text search column and its GIN index to youtube_videos."""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "ALTER TABLE youtube_videos ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPRESSION}) STORED"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_video_search ON youtube_videos USING gin (search_vector)"
+        ))
+    logger.info("✓ Full-text search column and index ready")
+
+
+def add_ranking_run_id():
+    """Add the trending snapshot run_id column and index to video_rankings."""
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE video_rankings ADD COLUMN IF NOT EXISTS run_id VARCHAR"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_ranking_run ON video_rankings (run_id, ranking_type, rank)"
+        ))
+    logger.info("✓ Ranking run_id column and index ready")
+
+
+def add_search_yield_columns():
+    """Add the columns SearchPlanner uses to learn per-term yield to search_queries."""
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE search_queries ADD COLUMN IF NOT EXISTS new_video_count INTEGER"))
+        conn.execute(text("ALTER TABLE search_queries ADD COLUMN IF NOT EXISTS quota_cost INTEGER"))
+    logger.info("✓ Search yield columns ready")
+
+
+def add_character_normalized_name():
+    """
+    Add and backfill the normalized name used to match characters, merge
+    characters whose names normalize the same, and index it as unique.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE characters ADD COLUMN IF NOT EXISTS normalized_name VARCHAR"))
+        # Backfilled in Python so existing rows match normalize_name exactly
+        rows = conn.execute(text("SELECT id, name FROM characters WHERE normalized_name IS NULL")).fetchall()
+        if rows:
+            conn.execute(
+                text("UPDATE characters SET normalized_name = :normalized WHERE id = :id"),
+                [{"id": row.id, "normalized": normalize_name(row.name)} for row in rows],
+            )
+        
+        index = conn.execute(text(
+            "SELECT indexdef FROM pg_indexes WHERE indexname = 'ix_characters_normalized_name'"
+        )).scalar()
+        merged = 0
+        if index is None or "UNIQUE" not in index:
+            merged = merge_duplicate_characters(conn)
+            conn.execute(text("DROP INDEX IF EXISTS ix_characters_normalized_name"))
+            conn.execute(text(
+                "CREATE UNIQUE INDEX ix_characters_normalized_name ON characters (normalized_name)"
+            ))
+    logger.info(f"✓ Character normalized names ready ({len(rows)} backfilled, {merged} duplicates merged)")
+
+
+def merge_duplicate_characters(conn) -> int:
+    """
+    Fold characters sharing a normalized name into the oldest one: their
+    appearances move over and the affected profiles are dropped, to be
+    rebuilt by build_character_profiles. Returns how many were merged.
+    """
+    duplicates = conn.execute(text(
+        "SELECT id, MIN(id) OVER (PARTITION BY normalized_name) AS keep_id FROM characters "
+        "WHERE normalized_name IS NOT NULL"
+    )).fetchall()
+    duplicates = [{"id": row.id, "keep_id": row.keep_id} for row in duplicates if row.id != row.keep_id]
+    if not duplicates:
+        return 0
+    conn.execute(text("UPDATE character_appearances SET character_id = :keep_id WHERE character_id = :id"), duplicates)
+    conn.execute(
+        text("DELETE FROM character_profiles WHERE character_id IN (:id, :keep_id)"),
+        duplicates,
+    )
+    conn.execute(text("DELETE FROM characters WHERE id = :id"), duplicates)
+    return len(duplicates)
+
+
+def build_character_profiles():
+    """Build aggregate profiles for characters recorded before profiles existed."""
+    with SessionLocal() as db:
+        built = rebuild_character_profiles(db)
+        db.commit()
+    logger.info(f"✓ Character profiles ready ({built} built)")
+
+
 if __name__ == "__main__":
     migrate_database()
\ No newline at end of file
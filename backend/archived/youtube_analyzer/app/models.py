@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, UniqueConstraint, Boolean, Float, ForeignKey, BigInteger, JSON, Index
+from sqlalchemy import Column, Integer, String, DateTime, Text, UniqueConstraint, Boolean, Float, ForeignKey, BigInteger, JSON, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from .database import Base
 
 class VideoAnalysis(Base):
@@ -25,6 +26,7 @@ class Character(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
+    normalized_name = Column(String, nullable=True, unique=True, index=True)  # Lookup key, see character_processing_v2.normalize_name
     channel_name = Column(String, nullable=True)  # YouTube channel if known
     overall_notes = Column(Text, nullable=True)  # General notes about this person
     confirmed_identity = Column(Boolean, default=False)  # Manual verification this is correct person
@@ -35,6 +37,7 @@ class Character(Base):
     
     # Relationships
     character_appearances = relationship("CharacterAppearance", back_populates="character")
+    profile = relationship("CharacterProfile", uselist=False, back_populates="character")
 
 class CharacterAppearance(Base):
     __tablename__ = "character_appearances"
@@ -84,8 +87,40 @@ class CharacterAppearance(Base):
     character = relationship("Character", back_populates="character_appearances")
     video_analysis = relationship("VideoAnalysis")
 
+class CharacterProfile(Base):
+    """Running aggregate of a character's appearances, updated as each one is recorded."""
+    __tablename__ = "character_profiles"
+    
+    character_id = Column(Integer, ForeignKey("characters.id"), primary_key=True)
+    appearance_count = Column(Integer, nullable=False, default=0)
+    
+    # Numeric trait -> sum and number of appearances that rated it
+    trait_sums = Column(JSON, nullable=False, default=dict)
+    trait_counts = Column(JSON, nullable=False, default=dict)
+    
+    # Deduplicated across appearances, in first-seen order
+    quotes = Column(JSON, nullable=False, default=list)
+    catchphrases = Column(JSON, nullable=False, default=list)
+    signature_moments = Column(JSON, nullable=False, default=list)
+    
+    # Source of the latest categorical and visual traits
+    latest_appearance_id = Column(Integer, ForeignKey("character_appearances.id"), nullable=True)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    character = relationship("Character", back_populates="profile")
+    latest_appearance = relationship("CharacterAppearance")
+
 
 # YouTube Metadata Tables
+
+# Title matches weigh more than description matches when ranking search results
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
 class YouTubeChannel(Base):
     __tablename__ = 'youtube_channels'
     
@@ -145,6 +180,11 @@ class YouTubeVideo(Base):
     category = Column(String)  # 'instruction', 'equipment', 'tour', etc.
     is_hd = Column(Boolean, default=False)
     
+    # Full-text search document, maintained by Postgres on every insert/update.
+    # Deferred so loading videos never selects it: only search queries name it,
+    # and databases without the column (the SQLite demos) still load videos.
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)))
+    
     # Relationships
     channel = relationship("YouTubeChannel", back_populates="videos")
     video_analysis = relationship("VideoAnalysis", backref="youtube_metadata")
@@ -158,6 +198,7 @@ class YouTubeVideo(Base):
         Index('idx_video_velocity', 'view_velocity'),
         Index('idx_video_category', 'category'),
         Index('idx_video_channel', 'channel_id'),
+        Index('idx_video_search', 'search_vector', postgresql_using='gin'),
     )
 
 
@@ -170,6 +211,7 @@ class VideoRanking(Base):
     rank = Column(Integer)
     score = Column(Float)  # Ranking score based on algorithm
     date = Column(DateTime(timezone=True), server_default=func.now())
+    run_id = Column(String, nullable=True)  # Snapshot tag for TrendingDetector runs
     
     # Relationships
     video = relationship("YouTubeVideo", back_populates="rankings")
@@ -178,6 +220,7 @@ class VideoRanking(Base):
     __table_args__ = (
         Index('idx_ranking_type_date', 'ranking_type', 'date'),
         Index('idx_ranking_video', 'video_id'),
+        Index('idx_ranking_run', 'run_id', 'ranking_type', 'rank'),
     )
 
 
@@ -188,10 +231,40 @@ class SearchQuery(Base):
     query = Column(String, nullable=False)
     category = Column(String)
     result_count = Column(Integer)
+    new_video_count = Column(Integer, nullable=True)  # Results not yet in the catalog
+    quota_cost = Column(Integer, nullable=True)  # API units spent; 0 when served from cache
     executed_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Track popular searches
     __table_args__ = (
         Index('idx_search_query', 'query'),
         Index('idx_search_executed', 'executed_at'),
-    ) 
\ No newline at end of file
+    )
+
+
+class SearchResultCache(Base):
+    __tablename__ = 'search_result_cache'
+    
+    query = Column(String, primary_key=True)
+    window = Column(String, primary_key=True)  # Order, date window and page size of the search
+    video_ids = Column(JSON)  # Video IDs returned by the API, in result order
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now()) 
+
+
+class ChannelMentionLookup(Base):
+    __tablename__ = 'channel_mention_lookups'
+    
+    name_key = Column(String, primary_key=True)  # Lowercased name as mentioned in videos
+    query = Column(String, nullable=False)  # Search run for it
+    found_channels = Column(JSON)  # [[channel title, channel ID], ...] in result order; empty when nothing matched
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class FrameResult(Base):
+    __tablename__ = 'frame_analysis_cache'
+    
+    frame_hash = Column(String(64), primary_key=True)  # sha256 of the encoded frame bytes
+    prompt_hash = Column(String(64), primary_key=True)  # sha256 of the prompt and request settings
+    model = Column(String, primary_key=True)
+    result = Column(Text, nullable=False)  # Raw model text, or the frame's JSON entry for batch requests
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
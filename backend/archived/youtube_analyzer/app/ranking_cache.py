@@ -0,0 +1,123 @@
+"""
+In-memory ranking cache for the Golf YouTube Directory API
+Holds pre-serialized JSON responses so ranking reads never touch the database
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RANKING_TYPES = ['daily_trending', 'weekly_trending', 'all_time_views', 'high_engagement']
+CHANNELS_KEY = 'top_channels'
+
+# Limits that are serialized eagerly on every refresh; any other limit is
+# built from the pre-encoded rows on first request and kept until the next refresh.
+LIMIT_BUCKETS = (10, 20, 50, 100)
+MAX_LIMIT = 100
+
+
+class RankingSnapshot:
+    """Immutable set of encoded rankings produced by one refresh."""
+
+    def __init__(self, rows: Dict[str, List[bytes]], version: int):
+        self.version = version
+        self.created_at = time.time()
+        self._rows = rows
+        self._payloads: Dict[Tuple[str, int], Tuple[bytes, str]] = {}
+        self._lock = threading.Lock()
+
+        for key in rows:
+            for limit in LIMIT_BUCKETS:
+                self._payloads[(key, limit)] = self._encode(key, limit)
+
+    def _encode(self, key: str, limit: int) -> Tuple[bytes, str]:
+        body = b"[" + b",".join(self._rows.get(key, [])[:limit]) + b"]"
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=12).hexdigest()
+        return body, etag
+
+    def get(self, key: str, limit: int) -> Tuple[bytes, str]:
+        """Return (json_bytes, etag) for a ranking key and limit."""
+        payload = self._payloads.get((key, limit))
+        if payload is None:
+            with self._lock:
+                payload = self._payloads.get((key, limit))
+                if payload is None:
+                    payload = self._encode(key, limit)
+                    self._payloads[(key, limit)] = payload
+        return payload
+
+
+class RankingCache:
+    """
+    Serves rankings and top channels from a snapshot rebuilt after
+    `GolfDirectory.update_rankings` or when the TTL expires.
+    """
+
+    def __init__(self, directory, ttl_seconds: int = 300):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[RankingSnapshot] = None
+        self._version = 0
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> RankingSnapshot:
+        """Reload all rankings from the database and swap in a new snapshot."""
+        with self._refresh_lock:
+            started = time.perf_counter()
+            rows = {}
+            for ranking_type in RANKING_TYPES:
+                rows[ranking_type] = [
+                    json.dumps(row, separators=(',', ':')).encode('utf-8')
+                    for row in self.directory.get_rankings(ranking_type, MAX_LIMIT)
+                ]
+            rows[CHANNELS_KEY] = [
+                json.dumps(row, separators=(',', ':')).encode('utf-8')
+                for row in self.directory.get_top_channels(MAX_LIMIT)
+            ]
+
+            self._version += 1
+            # Reference assignment is atomic, readers never see a partial snapshot
+            self._snapshot = RankingSnapshot(rows, self._version)
+            logger.info(
+                f"Ranking cache refreshed (version {self._version}) "
+                f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+            )
+            return self._snapshot
+
+    def get(self, key: str, limit: int) -> Tuple[bytes, str]:
+        """Return (json_bytes, etag), loading the first snapshot if needed."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.refresh()
+        return snapshot.get(key, limit)
+
+    def is_stale(self) -> bool:
+        snapshot = self._snapshot
+        return snapshot is None or time.time() - snapshot.created_at >= self.ttl_seconds
+
+    def start(self):
+        """Start the background thread that refreshes the cache on TTL expiry."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ranking-cache-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.is_stale():
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.error(f"Ranking cache refresh failed: {e}")
+            self._stop.wait(min(self.ttl_seconds, 30))
@@ -0,0 +1,421 @@
+"""
+Embedded Search Index for the Golf YouTube Directory
+A pure-Python inverted index used when search must work without PostgreSQL
+(demo and edge instances), persisted to a memory-mapped file
+"""
+
+import bisect
+import functools
+import hashlib
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+from array import array
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Title and channel hits count more than description hits when computing term frequency
+FIELD_WEIGHTS = (('title', 3), ('channel_title', 2), ('description', 1))
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+MAGIC = b"GOLFIDX1"
+HEADER = struct.Struct("<8sQQQQQ")  # magic, docs offset/len, terms offset/len, postings offset
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def _encode_varint(value: int, out: bytearray):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _locked(method):
+    """Run an index method under the index's lock."""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return locked
+
+
+class PostingList:
+    """
+    Doc numbers (delta-encoded) and term frequencies for one term.
+    Lists loaded from disk stay as varint bytes inside the mmap until first use.
+    """
+
+    __slots__ = ('gaps', 'freqs', 'last_doc', '_raw', '_count')
+
+    def __init__(self, raw: Optional[memoryview] = None, count: int = 0):
+        self.gaps = array('I')
+        self.freqs = array('H')
+        self.last_doc = 0
+        self._raw = raw
+        self._count = count
+
+    def __len__(self):
+        return self._count if self._raw is not None else len(self.gaps)
+
+    def _decode(self):
+        raw, self._raw = self._raw, None
+        value = shift = 0
+        pending_gap = None
+        doc = 0
+        for byte in raw:
+            value |= (byte & 0x7F) << shift
+            if byte & 0x80:
+                shift += 7
+                continue
+            if pending_gap is None:
+                pending_gap = value
+            else:
+                self.gaps.append(pending_gap)
+                self.freqs.append(value)
+                doc += pending_gap
+                pending_gap = None
+            value = shift = 0
+        self.last_doc = doc
+
+    def append(self, doc: int, freq: int):
+        if self._raw is not None:
+            self._decode()
+        self.gaps.append(doc - self.last_doc)
+        self.freqs.append(min(freq, 0xFFFF))
+        self.last_doc = doc
+
+    def __iter__(self):
+        """Yield (doc_number, term_frequency) pairs in doc order."""
+        if self._raw is not None:
+            self._decode()
+        doc = 0
+        for gap, freq in zip(self.gaps, self.freqs):
+            doc += gap
+            yield doc, freq
+
+
+class VideoSearchIndex:
+    """
+    Inverted index over video titles, descriptions and channel names
+    with BM25 ranking and prefix matching for autocomplete.
+    Public methods hold a per-index lock, so one index can be shared by
+    threads: queries decode posting lists in place and updates grow them.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.dirty = False
+        self._video_ids: List[Optional[str]] = []  # doc number -> video id (None once replaced)
+        self._doc_numbers: Dict[str, int] = {}
+        self._docs: List[Optional[Dict]] = []  # stored display fields
+        self._doc_lengths = array('I')
+        self._total_length = 0
+        self._postings: Dict[str, PostingList] = {}
+        self._sorted_terms: Optional[List[str]] = None
+        self._mmap = None
+        self._lock = threading.RLock()
+
+    @property
+    def live_count(self) -> int:
+        return len(self._doc_numbers)
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    @_locked
+    def add_video(self, video: Dict):
+        """
+        Add or update a video. Expects the keys produced by YouTubeMetadataClient
+        (id, title, description, channel_title, view_count) plus category.
+        """
+        video_id = video['id']
+        published = video.get('published_at')
+        if isinstance(published, datetime):
+            published = published.strftime('%Y-%m-%d')
+        elif published:
+            published = str(published)[:10]
+
+        stored = {
+            'title': video.get('title') or '',
+            'channel': video.get('channel_title') or '',
+            'views': int(video.get('view_count') or 0),
+            'category': video.get('category') or 'general',
+            'published': published or '',
+        }
+        text_key = hashlib.blake2b(
+            '\x00'.join((stored['title'], stored['channel'], video.get('description') or '')).encode('utf-8'),
+            digest_size=8
+        ).hexdigest()
+
+        existing = self._doc_numbers.get(video_id)
+        if existing is not None:
+            previous = self._docs[existing]
+            if previous.get('_text_key') == text_key:
+                # Only statistics changed, no need to re-index the text
+                stored['_text_key'] = text_key
+                self._docs[existing] = stored
+                self.dirty = True
+                return
+            self._remove(existing)
+
+        term_freqs: Dict[str, int] = {}
+        length = 0
+        for field, weight in FIELD_WEIGHTS:
+            for token in tokenize(video.get(field) or ''):
+                term_freqs[token] = term_freqs.get(token, 0) + weight
+                length += weight
+
+        doc = len(self._video_ids)
+        stored['_text_key'] = text_key
+        self._video_ids.append(video_id)
+        self._docs.append(stored)
+        self._doc_lengths.append(length)
+        self._doc_numbers[video_id] = doc
+        self._total_length += length
+
+        for term, freq in term_freqs.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = PostingList()
+                self._sorted_terms = None
+            posting.append(doc, freq)
+
+        self.dirty = True
+
+    @_locked
+    def remove_video(self, video_id: str):
+        doc = self._doc_numbers.get(video_id)
+        if doc is not None:
+            self._remove(doc)
+            self.dirty = True
+
+    def _remove(self, doc: int):
+        # Postings keep the stale doc number; it is skipped at query time and dropped on save
+        del self._doc_numbers[self._video_ids[doc]]
+        self._video_ids[doc] = None
+        self._docs[doc] = None
+        self._total_length -= self._doc_lengths[doc]
+        self._doc_lengths[doc] = 0
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def _terms_with_prefix(self, prefix: str) -> List[str]:
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        terms = self._sorted_terms
+        start = bisect.bisect_left(terms, prefix)
+        end = bisect.bisect_left(terms, prefix + '\uffff')
+        return terms[start:end]
+
+    @_locked
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """Return indexed terms starting with `prefix`, most common first."""
+        prefix = prefix.lower().strip()
+        if not prefix:
+            return []
+        candidates = self._terms_with_prefix(prefix)
+        candidates.sort(key=lambda term: len(self._postings[term]), reverse=True)
+        return candidates[:limit]
+
+    @_locked
+    def search(self, query: str, category: Optional[str] = None,
+               page: int = 1, page_size: int = 50, prefix: bool = True) -> List[Dict]:
+        """
+        BM25-ranked search returning the same dicts as GolfDirectory.search_videos.
+        With `prefix`, the last query word also matches longer terms (search-as-you-type).
+        """
+        tokens = tokenize(query)
+        if not tokens or not self._doc_numbers:
+            return []
+
+        query_terms = [[token] for token in tokens[:-1]]
+        last = tokens[-1]
+        if prefix:
+            expansions = self._terms_with_prefix(last)[:50]
+            query_terms.append(expansions or [last])
+        else:
+            query_terms.append([last])
+
+        total_docs = self.live_count
+        avg_length = self._total_length / total_docs if total_docs else 1.0
+        scores: Dict[int, float] = {}
+
+        for alternatives in query_terms:
+            for term in alternatives:
+                posting = self._postings.get(term)
+                if posting is None:
+                    continue
+                matches = [(doc, freq) for doc, freq in posting if self._docs[doc] is not None]
+                if not matches:
+                    continue
+                df = len(matches)
+                idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+                for doc, freq in matches:
+                    norm = K1 * (1 - B + B * self._doc_lengths[doc] / avg_length)
+                    scores[doc] = scores.get(doc, 0.0) + idf * freq * (K1 + 1) / (freq + norm)
+
+        if category:
+            scores = {doc: s for doc, s in scores.items() if self._docs[doc]['category'] == category}
+
+        ranked = sorted(scores, key=lambda doc: (-scores[doc], -self._docs[doc]['views']))
+        page = max(page, 1)
+        results = []
+        for doc in ranked[(page - 1) * page_size:page * page_size]:
+            stored = self._docs[doc]
+            results.append({
+                'title': stored['title'],
+                'channel': stored['channel'],
+                'views': f"{stored['views']:,}",
+                'category': stored['category'],
+                'published': stored['published'],
+                'url': f"https://youtube.com/watch?v={self._video_ids[doc]}"
+            })
+        return results
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @_locked
+    def save(self, path: Optional[str] = None):
+        """Write a compacted copy of the index (stale doc numbers dropped) atomically."""
+        path = path or self.path
+        if not path:
+            raise ValueError("No path given for saving the search index")
+
+        renumber = {}
+        video_ids, docs, lengths = [], [], []
+        for doc, video_id in enumerate(self._video_ids):
+            if video_id is None:
+                continue
+            renumber[doc] = len(video_ids)
+            video_ids.append(video_id)
+            docs.append(self._docs[doc])
+            lengths.append(self._doc_lengths[doc])
+
+        postings_blob = bytearray()
+        terms = []
+        for term in sorted(self._postings):
+            start = len(postings_blob)
+            count = previous = 0
+            for doc, freq in self._postings[term]:
+                new_doc = renumber.get(doc)
+                if new_doc is None:
+                    continue
+                _encode_varint(new_doc - previous, postings_blob)
+                _encode_varint(freq, postings_blob)
+                previous = new_doc
+                count += 1
+            if count:
+                terms.append([term, count, start, len(postings_blob) - start])
+
+        docs_bytes = json.dumps(
+            {'ids': video_ids, 'docs': docs, 'lengths': lengths}, separators=(',', ':')
+        ).encode('utf-8')
+        terms_bytes = json.dumps(terms, separators=(',', ':')).encode('utf-8')
+
+        docs_offset = HEADER.size
+        terms_offset = docs_offset + len(docs_bytes)
+        postings_offset = terms_offset + len(terms_bytes)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, docs_offset, len(docs_bytes),
+                                terms_offset, len(terms_bytes), postings_offset))
+            f.write(docs_bytes)
+            f.write(terms_bytes)
+            f.write(postings_blob)
+        os.replace(tmp_path, path)
+        self.dirty = False
+        logger.info(f"Saved search index with {len(video_ids)} videos and {len(terms)} terms to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> 'VideoSearchIndex':
+        """Map an index file into memory; posting lists are decoded lazily per term."""
+        index = cls(path)
+        with open(path, 'rb') as f:
+            index._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(index._mmap)
+        magic, docs_offset, docs_len, terms_offset, terms_len, postings_offset = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a golf search index")
+
+        doc_data = json.loads(bytes(view[docs_offset:docs_offset + docs_len]))
+        index._video_ids = doc_data['ids']
+        index._docs = doc_data['docs']
+        index._doc_lengths = array('I', doc_data['lengths'])
+        index._doc_numbers = {video_id: doc for doc, video_id in enumerate(index._video_ids)}
+        index._total_length = sum(index._doc_lengths)
+
+        postings = view[postings_offset:]
+        for term, count, start, nbytes in json.loads(bytes(view[terms_offset:terms_offset + terms_len])):
+            index._postings[term] = PostingList(postings[start:start + nbytes], count)
+
+        logger.info(f"Loaded search index with {index.live_count} videos from {path}")
+        return index
+
+    @classmethod
+    def open(cls, path: str) -> 'VideoSearchIndex':
+        """Load the index at `path`, or start an empty one that will be saved there."""
+        if os.path.exists(path):
+            return cls.load(path)
+        return cls(path)
+
+
+def build_index_from_database(database_url: str, output_path: str) -> VideoSearchIndex:
+    """Build an index file from any database with the youtube_videos schema (including the SQLite demo DBs)."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from youtube_analyzer.app.models import YouTubeVideo, YouTubeChannel
+
+    index = VideoSearchIndex(output_path)
+    Session = sessionmaker(bind=create_engine(database_url))
+    with Session() as session:
+        rows = session.query(
+            YouTubeVideo.id,
+            YouTubeVideo.title,
+            YouTubeVideo.description,
+            YouTubeVideo.view_count,
+            YouTubeVideo.category,
+            YouTubeVideo.published_at,
+            YouTubeChannel.title.label('channel_title')
+        ).outerjoin(
+            YouTubeChannel, YouTubeVideo.channel_id == YouTubeChannel.id
+        ).yield_per(1000)
+
+        for row in rows:
+            index.add_video(row._asdict())
+
+    index.save()
+    return index
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) != 3:
+        print("Usage: python -m youtube_analyzer.app.search_index <database_url> <output_path>")
+        sys.exit(1)
+
+    built = build_index_from_database(sys.argv[1], sys.argv[2])
+    print(f"Indexed {built.live_count} videos into {sys.argv[2]}")
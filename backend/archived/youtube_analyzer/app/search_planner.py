@@ -0,0 +1,207 @@
+"""
+Search Planner for YouTube Collection
+Caches search results, learns which terms still surface new videos and
+spends the daily search budget on the terms with the best yield
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from youtube_analyzer.app.database import SessionLocal
+from youtube_analyzer.app.models import YouTubeVideo, SearchQuery, SearchResultCache
+
+logger = logging.getLogger(__name__)
+
+SEARCH_QUOTA_COST = 100  # search().list
+DETAILS_QUOTA_COST = 1  # videos().list for up to 50 IDs
+PLANNER_CATEGORY = 'planner'
+
+# Terms without history are scored as if one search had returned this many
+# new videos per quota unit, so they get tried before proven low-yield terms.
+PRIOR_YIELD = 0.1
+PRIOR_WEIGHT = SEARCH_QUOTA_COST
+
+
+class SearchPlanner:
+    """
+    Shared front end for `search().list` calls made by the collectors.
+
+    Results are cached per (query, window), where the window captures the
+    order, page size and publishedAfter day. Every call records its result
+    count, how many results were new to the catalog and the quota it cost,
+    which `term_yields` turns into a new-videos-per-unit estimate.
+    """
+
+    def __init__(self, youtube_client, session_factory=SessionLocal,
+                 daily_budget: Optional[int] = None, cache_ttl: timedelta = timedelta(hours=12),
+                 history_days: int = 30):
+        self.youtube_client = youtube_client
+        self.SessionLocal = session_factory
+        self.daily_budget = daily_budget or int(os.getenv('YOUTUBE_SEARCH_BUDGET', '5000'))
+        self.cache_ttl = cache_ttl
+        self.history_days = history_days
+        self.quota_spent = 0  # Units spent by this planner instance
+
+    @staticmethod
+    def window_key(order: str, max_results: int, published_after: Optional[datetime]) -> str:
+        day = published_after.strftime('%Y-%m-%d') if published_after else 'all'
+        return f"{order}:{max_results}:{day}"
+
+    # ------------------------------------------------------------------
+    # Budget and yield
+    # ------------------------------------------------------------------
+
+    def remaining_budget(self) -> int:
+        """Daily search budget minus the units recorded since midnight UTC."""
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        with self.SessionLocal() as session:
+            spent = session.query(func.coalesce(func.sum(SearchQuery.quota_cost), 0)).filter(
+                SearchQuery.executed_at >= today
+            ).scalar()
+        return max(self.daily_budget - int(spent), 0)
+
+    def term_yields(self, terms: List[str]) -> Dict[str, float]:
+        """Smoothed new videos per quota unit for each term over the history window."""
+        since = datetime.now(timezone.utc) - timedelta(days=self.history_days)
+        with self.SessionLocal() as session:
+            history = dict(
+                (query, (new or 0, cost or 0)) for query, new, cost in session.query(
+                    SearchQuery.query,
+                    func.sum(SearchQuery.new_video_count),
+                    func.sum(SearchQuery.quota_cost)
+                ).filter(
+                    SearchQuery.query.in_(terms),
+                    SearchQuery.executed_at >= since,
+                    SearchQuery.quota_cost > 0
+                ).group_by(SearchQuery.query)
+            )
+
+        yields = {}
+        for term in terms:
+            new, cost = history.get(term, (0, 0))
+            yields[term] = (new + PRIOR_YIELD * PRIOR_WEIGHT) / (cost + PRIOR_WEIGHT)
+        return yields
+
+    def _fresh_cache(self, session, terms: List[str], window: str) -> Dict[str, List[str]]:
+        cutoff = datetime.now(timezone.utc) - self.cache_ttl
+        return dict(session.query(SearchResultCache.query, SearchResultCache.video_ids).filter(
+            SearchResultCache.query.in_(terms),
+            SearchResultCache.window == window,
+            SearchResultCache.fetched_at >= cutoff
+        ))
+
+    def plan(self, terms: List[str], budget: Optional[int] = None, order: str = 'viewCount',
+             max_results: int = 25, published_after: Optional[datetime] = None) -> List[str]:
+        """
+        Pick which terms to run: every term with a fresh cached result (free),
+        then the highest-yield remaining terms that fit in the budget.
+        """
+        terms = list(dict.fromkeys(terms))
+        if budget is None:
+            budget = self.remaining_budget()
+
+        window = self.window_key(order, max_results, published_after)
+        with self.SessionLocal() as session:
+            cached = self._fresh_cache(session, terms, window)
+
+        uncached = [term for term in terms if term not in cached]
+        yields = self.term_yields(uncached)
+        uncached.sort(key=lambda term: -yields[term])
+        affordable = uncached[:budget // (SEARCH_QUOTA_COST + DETAILS_QUOTA_COST)]
+
+        skipped = len(uncached) - len(affordable)
+        if skipped:
+            logger.info(f"Search budget of {budget} units covers {len(affordable)} new searches, "
+                        f"skipping {skipped} low-yield terms")
+        return [term for term in terms if term in cached] + affordable
+
+    # ------------------------------------------------------------------
+    # Searching
+    # ------------------------------------------------------------------
+
+    def _search_ids(self, query: str, max_results: int, order: str,
+                    published_after: Optional[datetime], category: str,
+                    new_only: bool) -> Tuple[List[str], List[str]]:
+        """
+        Return (every result ID, IDs not in the catalog yet) for a search,
+        served from the cache when fresh, and record what it cost. The
+        details call is charged for the new IDs, or for all of them when
+        the caller wants the full result set.
+        """
+        window = self.window_key(order, max_results, published_after)
+        with self.SessionLocal() as session:
+            cached = self._fresh_cache(session, [query], window)
+            if query in cached:
+                video_ids, cost = cached[query], 0
+            else:
+                video_ids = self.youtube_client.search_video_ids(
+                    query=query, max_results=max_results, order=order,
+                    published_after=published_after
+                )
+                cost = SEARCH_QUOTA_COST
+                session.execute(pg_insert(SearchResultCache).values(
+                    query=query, window=window, video_ids=video_ids, fetched_at=func.now()
+                ).on_conflict_do_update(
+                    index_elements=['query', 'window'],
+                    set_={'video_ids': video_ids, 'fetched_at': func.now()}
+                ))
+
+            stored = {video_id for (video_id,) in session.query(YouTubeVideo.id).filter(
+                YouTubeVideo.id.in_(video_ids)
+            )} if video_ids else set()
+            new_ids = [video_id for video_id in video_ids if video_id not in stored]
+            if (new_ids if new_only else video_ids):
+                cost += DETAILS_QUOTA_COST
+
+            session.add(SearchQuery(
+                query=query,
+                category=category,
+                result_count=len(video_ids),
+                new_video_count=len(new_ids),
+                quota_cost=cost
+            ))
+            session.commit()
+
+        self.quota_spent += cost
+        return video_ids, new_ids
+
+    def search_new_ids(self, query: str, max_results: int = 25, order: str = 'viewCount',
+                       published_after: Optional[datetime] = None,
+                       category: str = PLANNER_CATEGORY) -> List[str]:
+        """Return the IDs a search yields that are not in the catalog yet."""
+        return self._search_ids(query, max_results, order, published_after, category, new_only=True)[1]
+
+    def search(self, query: str, max_results: int = 25, order: str = 'viewCount',
+               published_after: Optional[datetime] = None,
+               category: str = PLANNER_CATEGORY, new_only: bool = True) -> List[Dict]:
+        """
+        Like `search_golf_videos`, served from the cache when fresh. With
+        `new_only` (for ingestion) only videos not already stored are
+        returned; otherwise every result, for callers that look at the
+        whole result set such as channel discovery.
+        """
+        video_ids, new_ids = self._search_ids(query, max_results, order, published_after, category, new_only)
+        wanted = new_ids if new_only else video_ids
+        if not wanted:
+            return []
+        return self.youtube_client.get_video_details(wanted)
+
+    def run(self, terms: List[str], budget: Optional[int] = None, order: str = 'viewCount',
+            max_results: int = 25, published_after: Optional[datetime] = None,
+            category: str = PLANNER_CATEGORY, categories: Optional[Dict[str, str]] = None,
+            new_only: bool = True) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        Plan `terms` within the budget and yield (term, videos) per search;
+        see `search` for `new_only`. Each search is recorded under
+        `categories[term]` when given, else `category`.
+        """
+        categories = categories or {}
+        for term in self.plan(terms, budget, order, max_results, published_after):
+            try:
+                yield term, self.search(term, max_results, order, published_after,
+                                        categories.get(term, category), new_only)
+            except Exception as e:
+                logger.error(f"Search for '{term}' failed: {e}")
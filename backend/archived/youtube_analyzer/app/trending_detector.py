@@ -5,172 +5,180 @@ Identifies trending videos through multiple signals
 
 import logging
 from datetime import datetime, timedelta, timezone
-from sqlalchemy import func, and_
+from sqlalchemy import func, or_, select, insert, delete, literal
 from youtube_analyzer.app.database import SessionLocal
-from youtube_analyzer.app.models import YouTubeVideo, VideoRanking
+from youtube_analyzer.app.models import YouTubeVideo, YouTubeChannel, VideoRanking
 from youtube_analyzer.app.golf_directory import GolfDirectory
 
 logger = logging.getLogger(__name__)
 
+TRENDING_TYPES = ('hourly_velocity', 'engagement_spike', 'viral_potential')
+KEEP_RUNS = 3  # Older snapshots are pruned at the end of each run
+
 
 class TrendingDetector:
     def __init__(self):
         self.directory = GolfDirectory()
     
-    def calculate_trending_scores(self):
-        """Calculate trending scores based on multiple factors."""
+    def calculate_trending_scores(self) -> str:
+        """
+        Calculate trending scores based on multiple factors.
+        
+        Each signal is written as a complete snapshot tagged with this run's ID
+        by one INSERT ... SELECT, with ranks assigned by ROW_NUMBER(). Older
+        runs are pruned, so the cost of a run does not grow with history.
+        """
+        now = datetime.now(timezone.utc)
+        run_id = now.strftime('%Y%m%dT%H%M%S%f')
+        
         with SessionLocal() as session:
-            # 1. View Velocity Score (views per hour for recent videos)
-            logger.info("Calculating view velocity scores...")
-            
-            # Videos from last 48 hours
-            cutoff_48h = datetime.now(timezone.utc) - timedelta(hours=48)
-            recent_videos = session.query(YouTubeVideo).filter(
-                YouTubeVideo.published_at >= cutoff_48h
-            ).all()
-            
-            for video in recent_videos:
-                hours_since_upload = (datetime.now(timezone.utc) - video.published_at).total_seconds() / 3600
-                if hours_since_upload > 0:
-                    hourly_velocity = video.view_count / hours_since_upload
-                    
-                    # Create velocity ranking
-                    ranking = VideoRanking(
-                        video_id=video.id,
-                        ranking_type='hourly_velocity',
-                        score=hourly_velocity,
-                        rank=0  # Will be updated later
-                    )
-                    session.add(ranking)
-            
-            # 2. Engagement Spike Detection
-            logger.info("Detecting engagement spikes...")
-            
-            # Find videos with unusually high engagement
-            avg_engagement = session.query(func.avg(YouTubeVideo.engagement_rate)).scalar() or 3.0
-            high_engagement_videos = session.query(YouTubeVideo).filter(
-                and_(
-                    YouTubeVideo.engagement_rate > avg_engagement * 1.5,
-                    YouTubeVideo.view_count > 10000,
-                    YouTubeVideo.published_at >= datetime.now(timezone.utc) - timedelta(days=7)
-                )
-            ).all()
-            
-            for video in high_engagement_videos:
-                ranking = VideoRanking(
-                    video_id=video.id,
-                    ranking_type='engagement_spike',
-                    score=video.engagement_rate,
-                    rank=0
-                )
-                session.add(ranking)
-            
-            # 3. Viral Potential Score
-            logger.info("Calculating viral potential...")
-            
-            # Videos growing faster than channel average
-            channel_avg_views = session.query(
-                YouTubeVideo.channel_id,
-                func.avg(YouTubeVideo.view_count).label('avg_views')
-            ).group_by(YouTubeVideo.channel_id).subquery()
-            
-            viral_candidates = session.query(YouTubeVideo).join(
-                channel_avg_views,
-                YouTubeVideo.channel_id == channel_avg_views.c.channel_id
-            ).filter(
-                and_(
-                    YouTubeVideo.view_count > channel_avg_views.c.avg_views * 2,
-                    YouTubeVideo.published_at >= datetime.now(timezone.utc) - timedelta(days=3)
-                )
-            ).all()
-            
-            for video in viral_candidates:
-                ranking = VideoRanking(
-                    video_id=video.id,
-                    ranking_type='viral_potential',
-                    score=video.view_count,
-                    rank=0
-                )
-                session.add(ranking)
+            for ranking_type, scores in self._signal_queries(now):
+                logger.info(f"Calculating {ranking_type} snapshot...")
+                session.execute(self._snapshot_insert(scores, ranking_type, run_id, now))
             
+            self._prune_old_runs(session)
             session.commit()
-            
-            # Update ranks
-            self._update_ranking_positions(session)
+        
+        logger.info(f"Trending run {run_id} complete")
+        return run_id
     
-    def _update_ranking_positions(self, session):
-        """Update rank positions for all ranking types."""
-        ranking_types = ['hourly_velocity', 'engagement_spike', 'viral_potential']
+    def _signal_queries(self, now: datetime):
+        """Yield (ranking_type, select of video_id/score) for each trending signal."""
+        videos = YouTubeVideo.__table__
         
-        for ranking_type in ranking_types:
-            # Get rankings ordered by score
-            rankings = session.query(VideoRanking).filter_by(
-                ranking_type=ranking_type
-            ).order_by(VideoRanking.score.desc()).all()
-            
-            # Update ranks
-            for i, ranking in enumerate(rankings, 1):
-                ranking.rank = i
+        # 1. View Velocity Score (views per hour for videos from the last 48 hours)
+        hours_since_upload = func.extract('epoch', literal(now) - videos.c.published_at) / 3600.0
+        yield 'hourly_velocity', select(
+            videos.c.id.label('video_id'),
+            (videos.c.view_count / hours_since_upload).label('score')
+        ).where(
+            videos.c.published_at >= now - timedelta(hours=48),
+            videos.c.published_at < now
+        )
+        
+        # 2. Engagement Spike Detection (unusually high engagement this week)
+        avg_engagement = select(
+            func.coalesce(func.avg(videos.c.engagement_rate), 3.0)
+        ).scalar_subquery()
+        yield 'engagement_spike', select(
+            videos.c.id.label('video_id'),
+            videos.c.engagement_rate.label('score')
+        ).where(
+            videos.c.engagement_rate > avg_engagement * 1.5,
+            videos.c.view_count > 10000,
+            videos.c.published_at >= now - timedelta(days=7)
+        )
         
-        session.commit()
+        # 3. Viral Potential Score (videos growing faster than their channel average)
+        channel_avg_views = select(
+            videos.c.channel_id,
+            func.avg(videos.c.view_count).label('avg_views')
+        ).group_by(videos.c.channel_id).subquery()
+        yield 'viral_potential', select(
+            videos.c.id.label('video_id'),
+            videos.c.view_count.label('score')
+        ).join(
+            channel_avg_views, videos.c.channel_id == channel_avg_views.c.channel_id
+        ).where(
+            videos.c.view_count > channel_avg_views.c.avg_views * 2,
+            videos.c.published_at >= now - timedelta(days=3)
+        )
+    
+    def _snapshot_insert(self, scores, ranking_type: str, run_id: str, now: datetime):
+        """Build INSERT ... SELECT that ranks one signal's scores with ROW_NUMBER()."""
+        scored = scores.subquery()
+        ranked = select(
+            scored.c.video_id,
+            literal(ranking_type),
+            func.row_number().over(order_by=(scored.c.score.desc(), scored.c.video_id)),
+            scored.c.score,
+            literal(now),
+            literal(run_id)
+        )
+        return insert(VideoRanking.__table__).from_select(
+            ['video_id', 'ranking_type', 'rank', 'score', 'date', 'run_id'], ranked
+        )
+    
+    def _prune_old_runs(self, session):
+        """Delete trending snapshots older than the last KEEP_RUNS runs (and untagged legacy rows)."""
+        rankings = VideoRanking.__table__
+        keep = [row[0] for row in session.execute(
+            select(rankings.c.run_id).where(
+                rankings.c.ranking_type.in_(TRENDING_TYPES),
+                rankings.c.run_id.isnot(None)
+            ).distinct().order_by(rankings.c.run_id.desc()).limit(KEEP_RUNS)
+        )]
+        
+        result = session.execute(
+            delete(rankings).where(
+                rankings.c.ranking_type.in_(TRENDING_TYPES),
+                or_(rankings.c.run_id.is_(None), rankings.c.run_id.notin_(keep))
+            )
+        )
+        if result.rowcount:
+            logger.info(f"Pruned {result.rowcount} rankings from older trending runs")
     
     def get_trending_report(self):
-        """Generate trending content report."""
+        """Generate trending content report from the latest run."""
+        report = {
+            'timestamp': datetime.now().isoformat(),
+            'trending_now': [],
+            'rising_fast': [],
+            'viral_potential': []
+        }
+        
         with SessionLocal() as session:
-            report = {
-                'timestamp': datetime.now().isoformat(),
-                'trending_now': [],
-                'rising_fast': [],
-                'viral_potential': []
-            }
-            
-            # Get top trending by velocity
-            velocity_rankings = session.query(VideoRanking).filter_by(
-                ranking_type='hourly_velocity'
-            ).order_by(VideoRanking.rank).limit(10).all()
-            
-            for ranking in velocity_rankings:
-                video = ranking.video
+            latest_run = session.query(func.max(VideoRanking.run_id)).filter(
+                VideoRanking.ranking_type.in_(TRENDING_TYPES)
+            ).scalar_subquery()
+            
+            rows = session.query(
+                VideoRanking.ranking_type,
+                VideoRanking.score,
+                YouTubeVideo.id,
+                YouTubeVideo.title,
+                YouTubeVideo.view_count,
+                YouTubeVideo.published_at,
+                YouTubeChannel.title.label('channel_title')
+            ).join(
+                YouTubeVideo, VideoRanking.video_id == YouTubeVideo.id
+            ).join(
+                YouTubeChannel, YouTubeVideo.channel_id == YouTubeChannel.id
+            ).filter(
+                VideoRanking.run_id == latest_run,
+                VideoRanking.ranking_type.in_(TRENDING_TYPES),
+                VideoRanking.rank <= 10
+            ).order_by(VideoRanking.ranking_type, VideoRanking.rank).all()
+        
+        for row in rows:
+            url = f"https://youtube.com/watch?v={row.id}"
+            if row.ranking_type == 'hourly_velocity':
                 report['trending_now'].append({
-                    'title': video.title,
-                    'channel': video.channel.title,
-                    'views': video.view_count,
-                    'hourly_velocity': ranking.score,
-                    'published': video.published_at.isoformat(),
-                    'url': f"https://youtube.com/watch?v={video.id}"
+                    'title': row.title,
+                    'channel': row.channel_title,
+                    'views': row.view_count,
+                    'hourly_velocity': row.score,
+                    'published': row.published_at.isoformat(),
+                    'url': url
                 })
-            
-            # Get engagement spikes
-            engagement_rankings = session.query(VideoRanking).filter_by(
-                ranking_type='engagement_spike'
-            ).order_by(VideoRanking.rank).limit(10).all()
-            
-            for ranking in engagement_rankings:
-                video = ranking.video
+            elif row.ranking_type == 'engagement_spike':
                 report['rising_fast'].append({
-                    'title': video.title,
-                    'channel': video.channel.title,
-                    'engagement_rate': ranking.score,
-                    'views': video.view_count,
-                    'url': f"https://youtube.com/watch?v={video.id}"
+                    'title': row.title,
+                    'channel': row.channel_title,
+                    'engagement_rate': row.score,
+                    'views': row.view_count,
+                    'url': url
                 })
-            
-            # Get viral potential
-            viral_rankings = session.query(VideoRanking).filter_by(
-                ranking_type='viral_potential'
-            ).order_by(VideoRanking.rank).limit(10).all()
-            
-            for ranking in viral_rankings:
-                video = ranking.video
+            else:
                 report['viral_potential'].append({
-                    'title': video.title,
-                    'channel': video.channel.title,
-                    'views': video.view_count,
-                    'published': video.published_at.isoformat(),
-                    'url': f"https://youtube.com/watch?v={video.id}"
+                    'title': row.title,
+                    'channel': row.channel_title,
+                    'views': row.view_count,
+                    'published': row.published_at.isoformat(),
+                    'url': url
                 })
-            
-            return report
+        
+        return report
     
     def monitor_real_time(self):
         """Check for trending content every hour."""
@@ -197,12 +205,12 @@ class TrendingDetector:
                 )
                 
                 with SessionLocal() as session:
-                    for video_data in videos:
-                        try:
-                            self.directory._upsert_video(session, video_data)
-                            session.commit()
-                        except Exception as e:
-                            session.rollback()
+                    try:
+                        self.directory.ingest_videos(session, videos)
+                        session.commit()
+                    except Exception as e:
+                        session.rollback()
+                        logger.error(f"Error saving video batch: {e}")
                             
             except Exception as e:
                 logger.error(f"Error searching for {term}: {e}")
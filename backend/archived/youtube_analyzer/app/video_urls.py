@@ -0,0 +1,34 @@
+"""
+YouTube URL normalization shared by the submission endpoints.
+Watch, short, embed and live URLs and bare IDs all map to one canonical
+watch URL, so the same video is only ever stored and queued once.
+"""
+
+import re
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+VIDEO_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+VIDEO_PATH_PREFIXES = ("shorts", "embed", "live", "v")
+
+
+def normalize_video_url(url: str) -> Tuple[Optional[str], Optional[str]]:
+    """(video ID, canonical watch URL) for a YouTube URL or bare video ID, or (None, None)."""
+    url = url.strip()
+    if VIDEO_ID.match(url):
+        video_id = url
+    else:
+        parsed = urlparse(url if "://" in url else f"https://{url}")
+        host = (parsed.hostname or "").lower()
+        parts = [part for part in parsed.path.split("/") if part]
+        video_id = None
+        if host == "youtu.be" and parts:
+            video_id = parts[0]
+        elif host == "youtube.com" or host.endswith(".youtube.com"):
+            if parts[:1] == ["watch"]:
+                video_id = parse_qs(parsed.query).get("v", [None])[0]
+            elif len(parts) >= 2 and parts[0] in VIDEO_PATH_PREFIXES:
+                video_id = parts[1]
+        if not video_id or not VIDEO_ID.match(video_id):
+            return None, None
+    return video_id, f"https://www.youtube.com/watch?v={video_id}"
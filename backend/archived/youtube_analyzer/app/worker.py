@@ -5,17 +5,28 @@ import logging
 import os
 import subprocess
 import tempfile
+import time
 import yt_dlp
 import json
 import re
 from celery import Celery, group, chord
 from urllib.parse import urlparse, parse_qs
 
+from analysis.gemini_client import get_gemini_client
+from analysis.summarizer import SINGLE_PASS_TOKENS, TranscriptChunk, chunk_transcript, estimate_tokens
+from analysis.transcript_store import TranscriptStore
+from analysis.vtt_parser import load_vtt
+
 from .database import SessionLocal
 from .models import VideoAnalysis
-from .ai_processing import analyze_frame, transcribe_audio, synthesize_results, extract_character_traits, analyze_golf_video_direct
-from .vtt_parser import parse_vtt_file
+from .ai_processing import analyze_frame, analyze_frames_batch, frame_data_uri, frame_label, read_frame, transcribe_audio, synthesize_results, extract_character_traits, analyze_golf_video_direct
 from .character_processing_v2 import process_character_analysis
+from .frame_dedup import deduplicate_frames
+from .graphic_filter import GRAPHIC_FILTER_ENABLED, filter_frames
+from .frame_pipeline import frame_call_savings, prepare_video_frames
+from .download_planner import ANALYSIS_FORMAT, DownloadPlan, plan_download
+from .celery_queues import celery_settings
+from .frame_results import FrameResultStore
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -30,13 +41,87 @@ celery_app = Celery(
 celery_app.conf.update(
     task_track_started=True,
     imports=('youtube_analyzer.app.worker',),
-    task_default_queue='celery',
+    # Routed download, frame-analysis and synthesis queues; see celery_queues
+    **celery_settings(),
 )
 
+transcript_store = TranscriptStore(SessionLocal)
+# Frame tasks write results here instead of returning them through the chord
+frame_results = FrameResultStore.from_url(celery_app.conf.broker_url)
+
+# Frames packed into one multi-image Gemini request
+FRAME_BATCH_SIZE = int(os.getenv('FRAME_BATCH_SIZE', '8'))
+
+BATCH_OCR_PROMPT = """
+You are an expert data extractor for sports broadcasts.
+You will receive several frames from a golf video, each preceded by a "Frame <index>:" label.
+For EACH frame, determine if it contains an on-screen graphic (like a scoreboard, leaderboard, or player statistics).
+
+Return a JSON array with one object per frame:
+- `index`: the frame's index from its label
+- `has_graphic`: true if a graphic is present
+- `extracted_text`: when a graphic is present, ALL text from the graphic extracted with OCR
+
+Example:
+[
+  {"index": 0, "has_graphic": true, "extracted_text": "LEADERBOARD\n1. T. Woods -12\n2. R. McIlroy -10"},
+  {"index": 1, "has_graphic": false}
+]
+"""
+
+@celery_app.task(name='app.worker.analyze_frame_batch_task')
+def analyze_frame_batch_task(frame_paths: list[str] = None, analysis_id: int = None, offset: int = 0,
+                             frame_keys: list[str] = None):
+    """
+    Analyze a batch of frames in a single request. Returns OCR text (or
+    None) per frame; with `analysis_id`, the text is stored in the frame
+    result store (the first frame at candidate index `offset`) and only the
+    number of frames with graphics is returned.
+    Frames are given as file paths, or as `frame_keys` of encoded frames in
+    the frame result store, which are deleted once their results are stored.
+    """
+    if frame_keys is None:
+        results = _analyze_frame_batch(frame_paths)
+    else:
+        frames = frame_results.load_frames(frame_keys)
+        present = [i for i, frame in enumerate(frames) if frame is not None]
+        if len(present) < len(frames):
+            logger.warning(f"[{analysis_id}] {len(frames) - len(present)} frames at offset {offset} missing or expired")
+        results = [None] * len(frames)
+        for i, text in zip(present, _analyze_frame_batch([frames[i] for i in present]) if present else []):
+            results[i] = text
+    if analysis_id is None:
+        return results
+    found = frame_results.put(analysis_id, offset, results)
+    if frame_keys is not None:
+        frame_results.drop_frames(frame_keys)
+    return found
+
+def _analyze_frame_batch(frame_paths: list[str]) -> list:
+    started = time.perf_counter()
+    try:
+        entries = analyze_frames_batch(frame_paths, BATCH_OCR_PROMPT)
+    except Exception as e:
+        logger.error(f"Batch analysis of {len(frame_paths)} frames failed, falling back to single frames: {e}")
+        return [analyze_frame_task(frame_path) for frame_path in frame_paths]
+
+    results = [None] * len(frame_paths)
+    for entry in entries if isinstance(entries, list) else []:
+        index = entry.get("index")
+        if isinstance(index, int) and 0 <= index < len(frame_paths) and entry.get("has_graphic"):
+            results[index] = entry.get("extracted_text") or None
+
+    found = sum(1 for text in results if text)
+    logger.info(
+        f"Analyzed {len(frame_paths)} frames in one request "
+        f"({time.perf_counter() - started:.1f}s), {found} with graphics"
+    )
+    return results
+
 @celery_app.task(name='app.worker.analyze_frame_task')
 def analyze_frame_task(frame_path: str):
     """A new Celery task to analyze a single frame."""
-    logger.info(f"Analyzing frame: {frame_path}")
+    logger.info(f"Analyzing frame: {frame_label(frame_path)}")
     prompt = """
 You are an expert data extractor for sports broadcasts.
 Analyze the provided image from a golf video. Your task is to determine if it contains an on-screen graphic (like a scoreboard, leaderboard, or player statistics).
@@ -59,7 +144,7 @@ Example for a frame without a graphic:
     
     try:
         raw_analysis_result = analyze_frame(frame_path, prompt)
-        logger.debug(f"Raw AI response for {frame_path}: {raw_analysis_result}")
+        logger.debug(f"Raw AI response for {frame_label(frame_path)}: {raw_analysis_result}")
         
         # Clean up potential markdown formatting
         match = re.search(r"```(json)?\n(.*)```", raw_analysis_result, re.DOTALL)
@@ -72,28 +157,28 @@ Example for a frame without a graphic:
             analysis_json = json.loads(json_str)
             if analysis_json.get("has_graphic"):
                 extracted_text = analysis_json.get("extracted_text")
-                logger.info(f"Frame {frame_path} contained graphic with text: {extracted_text[:100]}...")
+                logger.info(f"Frame {frame_label(frame_path)} contained graphic with text: {extracted_text[:100]}...")
                 return extracted_text
             else:
-                logger.debug(f"Frame {frame_path} determined to have no graphic")
+                logger.debug(f"Frame {frame_label(frame_path)} determined to have no graphic")
                 return None
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON for frame {frame_path}. Raw response: {raw_analysis_result[:500]}...")
+            logger.error(f"Failed to parse JSON for frame {frame_label(frame_path)}. Raw response: {raw_analysis_result[:500]}...")
             logger.error(f"JSON parse error: {e}")
             # Try to extract text anyway if the response looks like it contains relevant content
             if any(keyword in raw_analysis_result.lower() for keyword in ['hole', 'par', 'team', 'score', 'yd']):
-                logger.warning(f"JSON failed but content looks relevant, returning raw text for {frame_path}")
+                logger.warning(f"JSON failed but content looks relevant, returning raw text for {frame_label(frame_path)}")
                 return raw_analysis_result
             return None
             
     except Exception as e:
-        logger.error(f"Error analyzing frame {frame_path}: {e}", exc_info=True)
+        logger.error(f"Error analyzing frame {frame_label(frame_path)}: {e}", exc_info=True)
         return None
 
 @celery_app.task(name='app.worker.analyze_appearance_task')  
 def analyze_appearance_task(frame_path: str):
     """Analyze a frame specifically for character appearance details."""
-    logger.info(f"Analyzing appearance in frame: {frame_path}")
+    logger.info(f"Analyzing appearance in frame: {frame_label(frame_path)}")
     prompt = """
 You are a character appearance analyst for video content.
 Analyze this golf video frame to identify and describe any people visible in detail.
@@ -149,7 +234,7 @@ If no people are clearly visible, return {"people_found": false}
     
     try:
         raw_analysis_result = analyze_frame(frame_path, prompt)
-        logger.debug(f"Raw appearance analysis for {frame_path}: {raw_analysis_result}")
+        logger.debug(f"Raw appearance analysis for {frame_label(frame_path)}: {raw_analysis_result}")
         
         # Clean up potential markdown formatting
         match = re.search(r"```(json)?\\n(.*)```", raw_analysis_result, re.DOTALL)
@@ -162,26 +247,52 @@ If no people are clearly visible, return {"people_found": false}
             analysis_json = json.loads(json_str)
             if analysis_json.get("people_found"):
                 descriptions = analysis_json.get("character_descriptions", [])
-                logger.info(f"Frame {frame_path} found {len(descriptions)} people with appearance details")
+                logger.info(f"Frame {frame_label(frame_path)} found {len(descriptions)} people with appearance details")
                 return descriptions
             else:
-                logger.debug(f"Frame {frame_path} - no people found")
+                logger.debug(f"Frame {frame_label(frame_path)} - no people found")
                 return None
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse appearance JSON for frame {frame_path}: {e}")
+            logger.error(f"Failed to parse appearance JSON for frame {frame_label(frame_path)}: {e}")
             return None
             
     except Exception as e:
-        logger.error(f"Error analyzing appearance in frame {frame_path}: {e}", exc_info=True)
+        logger.error(f"Error analyzing appearance in frame {frame_label(frame_path)}: {e}", exc_info=True)
         return None
 
 @celery_app.task(name='app.worker.synthesize_and_save_task')
-def synthesize_and_save_task(ocr_results: list[str], transcript: str, analysis_id: int, caption_info: dict = None):
+def synthesize_and_save_task(ocr_results: list, transcript: str = None, analysis_id: int = None, caption_info: dict = None,
+                             frame_map: list[int] = None, batched: bool = False, started_at: float = None,
+                             transcript_chunks: list = None, streamed: bool = False):
     """
     Callback task to synthesize results and update the database.
-    Receives results from all frame analysis tasks.
+    Receives results from all frame analysis tasks. When frames were
+    deduplicated or pre-filtered, frame_map[i] is the result index for
+    frame i, or -1 if the frame was skipped as having no graphic.
+    Batched results arrive as one list per request and are flattened first.
+    Streamed results were written to the frame result store, along with the
+    frame map, the transcript and caption_info; ocr_results then only holds
+    a count per batch and the message carries only the analysis ID.
+    transcript_chunks ([text, start, end] per chunk) marks a transcript too
+    long for one prompt; scoring synthesis then works from chunk notes.
     """
+    if started_at is not None:
+        logger.info(f"[{analysis_id}] Frame analysis took {time.time() - started_at:.1f}s")
     logger.info(f"[{analysis_id}] All frames analyzed. Starting synthesis.")
+    if streamed:
+        logger.info(f"[{analysis_id}] {sum(ocr_results)} frames with graphics in {len(ocr_results)} batches")
+        ocr_results = frame_results.ocr_results(analysis_id)
+        inputs = frame_results.synthesis_inputs(analysis_id)
+        if inputs is None:
+            logger.error(f"[{analysis_id}] Transcript missing or expired in the frame result store")
+            inputs = {}
+        transcript = inputs.get('transcript') or ""
+        transcript_chunks = inputs.get('transcript_chunks')
+        caption_info = inputs.get('caption_info')
+    elif batched:
+        ocr_results = [text for batch in ocr_results for text in batch]
+    if frame_map is not None:
+        ocr_results = [ocr_results[i] if i >= 0 else None for i in frame_map]
     db = SessionLocal()
     try:
         analysis = db.query(VideoAnalysis).filter(VideoAnalysis.id == analysis_id).first()
@@ -193,12 +304,13 @@ def synthesize_and_save_task(ocr_results: list[str], transcript: str, analysis_i
         logger.info(f"[{analysis_id}] Synthesizing text from {len(successful_extractions)} frames and transcript.")
 
         # Extract golf scoring data
-        final_summary = synthesize_results(transcript, successful_extractions)
+        transcript_source = [TranscriptChunk(*chunk) for chunk in transcript_chunks] if transcript_chunks else transcript
+        final_summary = synthesize_results(transcript_source, successful_extractions)
         logger.info(f"[{analysis_id}] Final Synthesized Analysis:\n{final_summary}")
         
         # Extract character personality traits for parody creation
         logger.info(f"[{analysis_id}] Extracting character traits...")
-        character_traits = extract_character_traits(transcript, successful_extractions)
+        character_traits = extract_character_traits(transcript_source, successful_extractions)
         logger.info(f"[{analysis_id}] Character Traits Analysis:\n{character_traits}")
         
         analysis.result = final_summary
@@ -219,6 +331,7 @@ def synthesize_and_save_task(ocr_results: list[str], transcript: str, analysis_i
         
         db.commit()
         logger.info(f"[{analysis_id}] Analysis complete and saved to DB.")
+        get_gemini_client().log_metrics()
 
     except Exception as e:
         logger.error(f"[{analysis_id}] Error in synthesis task: {e}", exc_info=True)
@@ -227,6 +340,8 @@ def synthesize_and_save_task(ocr_results: list[str], transcript: str, analysis_i
             db.commit()
     finally:
         db.close()
+        if streamed:
+            frame_results.clear(analysis_id)
 
 def get_video_duration(video_path: str) -> float:
     """Gets the duration of a video file in seconds using ffprobe."""
@@ -278,40 +393,14 @@ def extract_audio(video_path: str, output_dir: str, video_id: str) -> str:
     logger.info(f"Audio extracted to: {audio_path}")
     return audio_path
 
-def extract_frames(video_path: str, output_dir: str) -> str:
-    """Extracts frames from a video file using FFmpeg."""
-    frames_dir = os.path.join(output_dir, "frames")
-    os.makedirs(frames_dir, exist_ok=True)
-
-    logger.info(f"Starting frame extraction for {video_path}")
-    # Extract 1 frame every 30 seconds (since we have captions, we need fewer frames for OCR)
-    # For long videos, this prevents excessive processing while still capturing scoreboards
-    command = [
-        'ffmpeg', '-y', 
-        '-hwaccel', 'videotoolbox',  # Use hardware acceleration if available
-        '-i', video_path, 
-        '-vf', 'scale=1280:720,fps=1/30',  # Lower resolution, much fewer frames
-        '-q:v', '8',  # Good quality but faster processing
-        os.path.join(frames_dir, 'frame_%04d.jpg')
-    ]
-    try:
-        logger.info(f"Running ffmpeg (frames) command: {' '.join(command)}")
-        # Using a long timeout to handle large files
-        result = subprocess.run(command, check=True, capture_output=True, text=True, timeout=3600)
-        logger.info("ffmpeg (frames) completed successfully.")
-        logger.debug(f"ffmpeg (frames) stdout:\n{result.stdout}")
-        logger.debug(f"ffmpeg (frames) stderr:\n{result.stderr}")
-    except subprocess.CalledProcessError as e:
-        logger.error(f"FFmpeg (frames) failed with exit code {e.returncode}")
-        logger.error(f"ffmpeg (frames) stdout:\n{e.stdout}")
-        logger.error(f"ffmpeg (frames) stderr:\n{e.stderr}")
-        raise
-
-    logger.info(f"Frames extracted to: {frames_dir}")
-    return frames_dir
-
-def _download_and_process_video(youtube_url: str, target_dir: str) -> (str, str, str, str | None):
-    """Downloads and processes a video, saving assets to the target directory."""
+def _download_and_process_video(youtube_url: str, target_dir: str, persist_files: bool = False):
+    """
+    Downloads a video's captions to the target directory and prepares its frame source.
+    Returns (video_id, audio_path, video_path, caption_path, download_plan): with
+    persist_files the analysis-resolution MP4 is downloaded to video_path, otherwise
+    video_path is None and download_plan lists the stream ranges to decode.
+    Frames are decoded later, in-process, by _perform_ai_analysis.
+    """
     try:
         logger.info(f"Downloading video to directory: {target_dir}")
         video_id = get_video_id(youtube_url)
@@ -320,115 +409,80 @@ def _download_and_process_video(youtube_url: str, target_dir: str) -> (str, str,
 
         video_path = os.path.join(target_dir, f"{video_id}.mp4")
         
-        # Always try to download captions first, then decide on video format
-        logger.info("Attempting to download captions...")
-        captions_available = False
-        
-        # Try to download captions first
-        caption_opts = {
-            'skip_download': True,
-            'writeautomaticsub': True,
-            'writesubtitles': True,
-            'subtitleslangs': ['en', 'en-US', 'en-GB'],
-            'subtitlesformat': 'vtt',
-            'outtmpl': video_path,
-            'quiet': False,
-        }
-        
+        # Captions come from the transcript store; yt-dlp only runs on a miss
+        logger.info("Loading captions...")
         try:
-            with yt_dlp.YoutubeDL(caption_opts) as ydl:
-                info = ydl.extract_info(youtube_url, download=True)
-                
-                # Check if any caption files were downloaded
-                caption_variants = [
-                    f"{video_id}.en.vtt",
-                    f"{video_id}.en-US.vtt", 
-                    f"{video_id}.en-GB.vtt"
-                ]
-                
-                for variant in caption_variants:
-                    full_path = os.path.join(target_dir, variant)
-                    if os.path.exists(full_path) and os.path.getsize(full_path) > 100:  # Must be substantial
-                        captions_available = True
-                        logger.info(f"Captions successfully downloaded: {variant} ({os.path.getsize(full_path)} bytes)")
-                        break
-                        
-                if not captions_available:
-                    logger.error("No caption files found after download attempt")
-                    
+            vtt_content = transcript_store.captions(video_id)
         except Exception as e:
-            logger.error(f"Caption download failed: {e}")
-        
+            logger.error(f"Caption lookup failed: {e}")
+            vtt_content = None
+
         # Error out if no captions are available
-        if not captions_available:
+        if not vtt_content:
             raise ValueError(f"No captions available for video {youtube_url}. Captions are required for accurate golf analysis.")
-        
-        # Download video only (no audio needed since we have captions)
-        logger.info("Captions confirmed - downloading video only")
-        ydl_opts = {
-            'format': 'bestvideo[ext=mp4]/best[ext=mp4]',
-            'outtmpl': video_path,
-            'quiet': False,
-            'ignoreconfig': True,
-            'nocheckcertificate': True,
-            'no_cachedir': True,
-            'progress': True,
-        }
-        
-        logger.info(f"yt-dlp options: {json.dumps(ydl_opts, indent=2)}")
-
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([youtube_url])
-        
-        logger.info(f"Video download reported as complete. Verifying file at: {video_path}")
-        if not os.path.exists(video_path):
-             raise FileNotFoundError(f"yt-dlp claims success, but file does not exist: {video_path}")
 
-        duration = get_video_duration(video_path)
-        if duration == 0.0:
-            raise ValueError("Could not determine video duration, processing cannot continue.")
+        caption_path = os.path.join(target_dir, f"{video_id}.en.vtt")
+        with open(caption_path, 'w', encoding='utf-8') as f:
+            f.write(vtt_content)
+        logger.info(f"Captions ready: {caption_path} ({len(vtt_content)} chars)")
 
-        # --- FFmpeg processing steps ---
         # Skip audio extraction since captions are required
         logger.info("Skipping audio extraction - using captions only")
         audio_path = None
-        frames_dir = extract_frames(video_path, target_dir)
-        
-        # Check for the downloaded caption files (try multiple variants)
-        caption_variants = [
-            f"{video_id}.en.vtt",
-            f"{video_id}.en-US.vtt", 
-            f"{video_id}.en-GB.vtt",
-            f"{video_id}.live_chat.json"  # Sometimes live chat is available
-        ]
-        
-        caption_path = None
-        for variant in caption_variants:
-            full_path = os.path.join(target_dir, variant)
-            if os.path.exists(full_path):
-                caption_path = full_path
-                logger.info(f"Found caption file: {variant}")
-                break
-        
-        if not caption_path:
-            logger.info("No caption files found for this video.")
-            # List all files in directory for debugging
-            all_files = os.listdir(target_dir)
-            vtt_files = [f for f in all_files if f.endswith('.vtt')]
-            logger.info(f"All files in target directory: {all_files}")
-            logger.info(f"VTT files found: {vtt_files}")
-
-        return video_id, audio_path, frames_dir, caption_path
+
+        if persist_files:
+            # Keep a local low-resolution copy alongside the persisted frames
+            logger.info("Captions confirmed - downloading analysis-resolution video to keep")
+            ydl_opts = {
+                'format': ANALYSIS_FORMAT,
+                'outtmpl': video_path,
+                'quiet': False,
+                'ignoreconfig': True,
+                'nocheckcertificate': True,
+                'no_cachedir': True,
+                'progress': True,
+            }
+            
+            logger.info(f"yt-dlp options: {json.dumps(ydl_opts, indent=2)}")
+
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                ydl.download([youtube_url])
+            
+            logger.info(f"Video download reported as complete. Verifying file at: {video_path}")
+            if not os.path.exists(video_path):
+                 raise FileNotFoundError(f"yt-dlp claims success, but file does not exist: {video_path}")
+
+            duration = get_video_duration(video_path)
+            if duration == 0.0:
+                raise ValueError("Could not determine video duration, processing cannot continue.")
+            download_plan = None
+        else:
+            # Nothing is downloaded: ffmpeg reads only the planned ranges of the stream
+            logger.info("Captions confirmed - planning range reads of the analysis stream")
+            download_plan = plan_download(youtube_url, caption_path)
+            if download_plan.duration == 0.0:
+                raise ValueError("Could not determine video duration, processing cannot continue.")
+            video_path = None
+
+        return video_id, audio_path, video_path, caption_path, download_plan
     except Exception as e:
         logger.error(f"An error occurred in _download_and_process_video: {e}", exc_info=True)
         raise
 
-def _perform_ai_analysis(analysis_id: int, video_id: str, audio_path: str, frames_dir: str, caption_path: str | None):
-    """Sets up and launches the asynchronous analysis pipeline."""
+def _perform_ai_analysis(analysis_id: int, video_id: str, audio_path: str, frames_dir: str, caption_path: str | None,
+                         video_path: str | None = None, persist_files: bool = False,
+                         download_plan: DownloadPlan | None = None):
+    """
+    Sets up and launches the asynchronous analysis pipeline.
+    Frames come from the planned stream ranges or `video_path` when given
+    (written to `frames_dir` only with persist_files), otherwise from JPEGs
+    already in `frames_dir`.
+    """
     logger.info(f"[{analysis_id}] Starting AI analysis pipeline for video_id: {video_id}")
     
     # 1. Prioritize captions over transcription
     transcript = ""
+    transcript_chunks = None
     caption_info = {
         'found': False,
         'preview': None,
@@ -438,12 +492,16 @@ def _perform_ai_analysis(analysis_id: int, video_id: str, audio_path: str, frame
     if caption_path and os.path.exists(caption_path):
         logger.info(f"[{analysis_id}] Reading captions from: {caption_path}")
         try:
-            with open(caption_path, 'r', encoding='utf-8') as f:
-                vtt_content = f.read()
-            # Parse VTT to extract clean text
-            transcript = parse_vtt_file(vtt_content)
+            # Stream the VTT into clean text, dropping rolling-caption repeats
+            captions = load_vtt(caption_path)
+            transcript = captions.text
             logger.info(f"[{analysis_id}] Parsed Caption Text ({len(transcript)} chars): {transcript[:500]}...")
             
+            # Long transcripts are summarized per chunk at synthesis; split them here on cue boundaries
+            if estimate_tokens(transcript) > SINGLE_PASS_TOKENS:
+                transcript_chunks = [[chunk.text, chunk.start, chunk.end] for chunk in chunk_transcript(captions)]
+                logger.info(f"[{analysis_id}] Transcript split into {len(transcript_chunks)} chunks for summarization")
+            
             # Store caption info
             caption_info['found'] = True
             caption_info['preview'] = transcript[:1000] if transcript else "VTT file found but no text extracted"
@@ -460,21 +518,30 @@ def _perform_ai_analysis(analysis_id: int, video_id: str, audio_path: str, frame
         logger.error(f"[{analysis_id}] Critical error: No caption file found in analysis phase")
         raise ValueError("No caption file found - this should have been caught during download")
 
-    # 2. Define the parallel frame analysis tasks
-    if os.path.exists(frames_dir):
+    # 2. Collect the frames worth a model call and map every sampled frame to a result
+    frames_dir = frames_dir or ""
+    if download_plan is not None or (video_path and os.path.exists(video_path)):
+        # Decode, dedup and filter in-process; frames hit disk only when persisting
+        candidates, frame_map = prepare_video_frames(
+            video_path, persist_dir=frames_dir if persist_files else None, plan=download_plan
+        )
+    elif os.path.exists(frames_dir):
+        # Re-analysis of frames persisted by an earlier run
         frame_files = sorted([os.path.join(frames_dir, f) for f in os.listdir(frames_dir) if f.endswith('.jpg')])
         
-        # Define the group of parallel tasks for the chord header
-        header = group(analyze_frame_task.s(frame_path) for frame_path in frame_files)
-        
-        # Define the callback task that will run after the header is complete
-        callback = synthesize_and_save_task.s(transcript=transcript, analysis_id=analysis_id, caption_info=caption_info)
+        # Only one frame per cluster of near-duplicates goes to the model
+        representatives, frame_map = deduplicate_frames(frame_files)
         
-        # Execute the chord
-        chord(header)(callback)
-        logger.info(f"[{analysis_id}] Launched a chord of {len(frame_files)} frame analysis tasks.")
+        # With GRAPHIC_FILTER=1, skip representatives that show no overlay-like structure
+        candidates, positions = filter_frames(representatives)
+        frame_map = [positions[i] for i in frame_map]
+        # Frame tasks may run on other hosts, so the store holds the file contents, not local paths
+        candidates = [frame_data_uri(read_frame(path)) for path in candidates]
+        logger.info(f"[{analysis_id}] Frame dedup: " + frame_call_savings(
+            len(frame_files), len(representatives), len(candidates), GRAPHIC_FILTER_ENABLED
+        ))
     else:
-        logger.warning(f"[{analysis_id}] Frames directory not found. Cannot start analysis.")
+        logger.warning(f"[{analysis_id}] No video or frames directory found. Cannot start analysis.")
         # If there are no frames, we should probably mark the task as failed.
         db = SessionLocal()
         try:
@@ -484,6 +551,30 @@ def _perform_ai_analysis(analysis_id: int, video_id: str, audio_path: str, frame
                 db.commit()
         finally:
             db.close()
+        return
+
+    # 3. Define the group of parallel tasks for the chord header, FRAME_BATCH_SIZE frames per request.
+    # Results stream into the frame result store, so each member returns a count
+    # and the callback message does not grow with the number of frames
+    # Encoded frames and the transcript are stored next to the results; task messages carry only keys and IDs
+    frame_results.start(analysis_id, frame_map)
+    frame_results.put_synthesis_inputs(analysis_id, transcript, transcript_chunks, caption_info)
+    frame_keys = frame_results.put_frames(analysis_id, candidates)
+    offsets = range(0, len(candidates), FRAME_BATCH_SIZE)
+    header = group(
+        analyze_frame_batch_task.s(frame_keys=frame_keys[offset:offset + FRAME_BATCH_SIZE],
+                                   analysis_id=analysis_id, offset=offset)
+        for offset in offsets
+    )
+    
+    # Define the callback task that will run after the header is complete
+    callback = synthesize_and_save_task.s(analysis_id=analysis_id, streamed=True, started_at=time.time())
+    
+    # Execute the chord
+    chord(header)(callback)
+    logger.info(
+        f"[{analysis_id}] Launched a chord of {len(offsets)} batched requests for {len(candidates)} frames."
+    )
 
 @celery_app.task(bind=True, name='app.worker.process_video_direct')
 def process_video_direct(self, analysis_id: int, youtube_url: str, persist_files: bool = False):
@@ -519,7 +610,8 @@ def process_video_direct(self, analysis_id: int, youtube_url: str, persist_files
             
             logger.info("Downloading video for direct analysis...")
             ydl_opts = {
-                'format': 'best[ext=mp4]/best',
+                # Gemini samples video at low resolution anyway; 720p with audio keeps the commentary
+                'format': 'best[height<=720][ext=mp4]/best[ext=mp4]/best',
                 'outtmpl': video_path,
                 'quiet': False,
                 'ignoreconfig': True,
@@ -603,15 +695,17 @@ def process_video(self, analysis_id: int, youtube_url: str, skip_download: bool
             logger.info(f"[{analysis_id}] Re-analyzing. Using persistent directory: {persistent_dir}")
             target_dir = persistent_dir
         else:
-            # Always use persistent files since async tasks need access to frames
+            # Captions always land here; the video and frames are saved only with persist_files
             logger.info(f"[{analysis_id}] Using persistent directory: {persistent_dir}")
             os.makedirs(persistent_dir, exist_ok=True)
             target_dir = persistent_dir
 
         try:
+            frames_dir = os.path.join(target_dir, "frames")
+            video_path = None
+            download_plan = None
             if skip_download:
                 video_id = get_video_id(youtube_url)
-                frames_dir = os.path.join(target_dir, "frames")
                 
                 # Look for captions (required)
                 caption_path = None
@@ -634,10 +728,14 @@ def process_video(self, analysis_id: int, youtube_url: str, skip_download: bool
                 # No audio needed since we have captions
                 audio_path = None
             else:
-                 video_id, audio_path, frames_dir, caption_path = _download_and_process_video(youtube_url, target_dir)
+                 video_id, audio_path, video_path, caption_path, download_plan = _download_and_process_video(
+                     youtube_url, target_dir, persist_files=persist_files
+                 )
             
-            # Launch the async pipeline
-            _perform_ai_analysis(analysis_id, video_id, audio_path, frames_dir, caption_path)
+            # Launch the async pipeline; frames go to the frame result store and tasks get their keys, so no video file is needed afterwards
+            _perform_ai_analysis(analysis_id, video_id, audio_path, frames_dir, caption_path,
+                                 video_path=video_path, persist_files=persist_files,
+                                 download_plan=download_plan)
 
         except Exception as e:
             logger.error(f"An error occurred during processing for analysis ID {analysis_id}: {e}", exc_info=True)
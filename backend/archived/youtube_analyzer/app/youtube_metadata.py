@@ -22,6 +22,17 @@ class YouTubeMetadataClient:
             order: Sort order - "viewCount", "date", "rating", "relevance"
             published_after: Only return videos published after this date
         """
+        video_ids = self.search_video_ids(query, max_results, order, published_after)
+        return self.get_video_details(video_ids)
+    
+    def search_video_ids(self,
+                         query: str = "golf",
+                         max_results: int = 50,
+                         order: str = "viewCount",
+                         published_after: Optional[datetime] = None) -> List[str]:
+        """
+        Run a search (100 quota units) and return only the matching video IDs.
+        """
         search_params = {
             'part': 'snippet',
             'q': query,
@@ -37,8 +48,7 @@ class YouTubeMetadataClient:
         
         response = self.youtube.search().list(**search_params).execute()
         
-        video_ids = [item['id']['videoId'] for item in response['items']]
-        return self.get_video_details(video_ids)
+        return [item['id']['videoId'] for item in response['items']]
     
     def get_video_details(self, video_ids: List[str]) -> List[Dict]:
         """
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming VTT parser against the old whole-file parser.
+Generates synthetic YouTube-style rolling auto-captions for multi-hour
+broadcasts and reports parse time, peak memory and transcript size.
+
+Usage:
+    python benchmark_vtt.py [hours ...]
+"""
+
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from analysis.vtt_parser import load_vtt
+
+DEFAULT_HOURS = [1, 3, 6]
+CUE_SECONDS = 2.5
+WORDS_PER_CUE = 7
+LOOKUPS = 10_000
+
+WORDS = (
+    "and that is a beautiful swing right down the middle of the fairway birdie putt "
+    "for the lead here at the masters he will need to get this one up and down "
+    "eagle chance on the par five leaderboard looking crowded now two under par"
+).split()
+
+
+def _timestamp(seconds: float) -> str:
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
+
+
+def write_rolling_captions(path: str, hours: float, seed: int = 42) -> int:
+    """Write a rolling auto-caption file; returns the number of spoken words."""
+    rng = random.Random(seed)
+    spoken = 0
+    previous_line = ''
+    t = 0.0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("WEBVTT\nKind: captions\nLanguage: en\n\n")
+        while t < hours * 3600:
+            words = rng.choices(WORDS, k=WORDS_PER_CUE)
+            spoken += len(words)
+            timed = words[0] + ''.join(
+                f"<{_timestamp(t + (i + 1) * CUE_SECONDS / len(words))}><c> {word}</c>"
+                for i, word in enumerate(words[1:])
+            )
+            # The cue that adds new words, repeating the previous line above them
+            f.write(f"{_timestamp(t)} --> {_timestamp(t + CUE_SECONDS)} align:start position:0%\n")
+            f.write(f"{previous_line or ' '}\n{timed}\n\n")
+            line = ' '.join(words)
+            # The 10ms cue that holds the finished line before it scrolls up
+            f.write(f"{_timestamp(t + CUE_SECONDS)} --> {_timestamp(t + CUE_SECONDS + 0.01)} align:start position:0%\n")
+            f.write(f"{line}\n \n\n")
+            previous_line = line
+            t += CUE_SECONDS + 0.01
+    return spoken
+
+
+def legacy_parse(vtt_content: str) -> str:
+    """The previous AIProcessor._parse_vtt_content."""
+    lines = vtt_content.split('\n')
+    transcript_lines = []
+    for line in lines:
+        line = line.strip()
+        if '-->' in line or not line or line.startswith('WEBVTT'):
+            continue
+        if line.isdigit():
+            continue
+        line = re.sub(r'<[^>]+>', '', line)
+        line = re.sub(r'&nbsp;', ' ', line)
+        line = re.sub(r'&[a-zA-Z]+;', '', line)
+        if line:
+            transcript_lines.append(line)
+    return ' '.join(transcript_lines)
+
+
+def _legacy_from_file(path: str) -> str:
+    with open(path, 'r', encoding='utf-8') as f:
+        return legacy_parse(f.read())
+
+
+def measure(parse, path: str):
+    """Time one parse, then repeat it under tracemalloc (which skews timing) for peak memory."""
+    started = time.perf_counter()
+    result = parse(path)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    parse(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    hours_list = [float(h) for h in sys.argv[1:]] or DEFAULT_HOURS
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for hours in hours_list:
+            path = os.path.join(temp_dir, f"captions_{hours}h.vtt")
+            spoken = write_rolling_captions(path, hours)
+            size_mb = os.path.getsize(path) / 1e6
+
+            legacy_text, legacy_time, legacy_peak = measure(_legacy_from_file, path)
+            transcript, new_time, new_peak = measure(load_vtt, path)
+
+            rng = random.Random(7)
+            started = time.perf_counter()
+            for _ in range(LOOKUPS):
+                at = rng.uniform(0, hours * 3600 - 60)
+                transcript.text_between(at, at + 60)
+            lookup_us = (time.perf_counter() - started) / LOOKUPS * 1e6
+
+            print(f"\n{hours:g}h captions: {size_mb:.1f} MB, {spoken:,} spoken words")
+            print(f"  legacy:    {legacy_time * 1000:8.1f} ms  peak {legacy_peak / 1e6:6.1f} MB  "
+                  f"{len(legacy_text.split()):,} words")
+            print(f"  streaming: {new_time * 1000:8.1f} ms  peak {new_peak / 1e6:6.1f} MB  "
+                  f"{len(transcript.text.split()):,} words in {len(transcript):,} cues")
+            print(f"  60s window lookup: {lookup_us:.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -71,6 +71,43 @@ CREATE TABLE IF NOT EXISTS monitored_channels (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Transcripts table (captions and metadata fetched once per video and language)
+CREATE TABLE IF NOT EXISTS transcripts (
+    video_id VARCHAR NOT NULL,
+    lang VARCHAR NOT NULL,
+    source VARCHAR NOT NULL,
+    content BYTEA NOT NULL,
+    content_hash VARCHAR(64) NOT NULL,
+    char_count INTEGER,
+    fetched_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (video_id, lang)
+);
+
+-- Videos whose caption fetch found nothing (re-checked after CAPTION_MISS_TTL_HOURS)
+CREATE TABLE IF NOT EXISTS caption_misses (
+    video_id VARCHAR NOT NULL,
+    lang VARCHAR NOT NULL,
+    checked_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (video_id, lang)
+);
+
+-- Transcript chunk summaries (map step of long-transcript summarization)
+CREATE TABLE IF NOT EXISTS transcript_chunk_summaries (
+    key VARCHAR(64) PRIMARY KEY,
+    summary TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Frame analysis results by frame content, prompt and model (re-analysis cache)
+CREATE TABLE IF NOT EXISTS frame_analysis_cache (
+    frame_hash VARCHAR(64) NOT NULL,
+    prompt_hash VARCHAR(64) NOT NULL,
+    model VARCHAR NOT NULL,
+    result TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (frame_hash, prompt_hash, model)
+);
+
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_youtube_videos_channel_id ON youtube_videos(channel_id);
 CREATE INDEX IF NOT EXISTS idx_youtube_videos_published_at ON youtube_videos(published_at);
@@ -141,7 +178,7 @@ SELECT * FROM video_of_day_candidates;
 DO $$
 BEGIN
     RAISE NOTICE 'Golf Directory database schema created successfully!';
-    RAISE NOTICE 'Tables created: youtube_videos, youtube_channels, video_analyses, api_quota_usage, video_view_history, monitored_channels';
+    RAISE NOTICE 'Tables created: youtube_videos, youtube_channels, video_analyses, api_quota_usage, video_view_history, monitored_channels, transcripts, caption_misses, transcript_chunk_summaries, frame_analysis_cache';
     RAISE NOTICE 'Indexes created for optimal performance';
     RAISE NOTICE 'Whitelisted channels inserted';
     RAISE NOTICE 'Ready for scheduler deployment!';
@@ -18,6 +18,7 @@ import psycopg2.extras
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any
 import schedule
+import threading
 import json
 from dataclasses import dataclass
 from dotenv import load_dotenv
@@ -25,6 +26,7 @@ from dotenv import load_dotenv
 # Local imports
 from youtube_client import YouTubeClient
 from ai_processor import AIProcessor
+from analysis.transcript_store import TranscriptStore
 
 # Load environment variables
 load_dotenv()
@@ -142,7 +144,10 @@ class GolfScheduler:
         
         # Initialize components
         self.youtube_client = YouTubeClient(youtube_api_key)
-        self.ai_processor = AIProcessor(google_api_key, elevenlabs_api_key)
+        self.transcript_store = TranscriptStore.from_url(self.db_url)
+        self.ai_processor = AIProcessor(google_api_key, elevenlabs_api_key, self.transcript_store)
+        self.transcript_prefetch_candidates = int(os.getenv('TRANSCRIPT_PREFETCH_CANDIDATES', '5'))
+        self._prefetch_thread: Optional[threading.Thread] = None
         self.db_manager = DatabaseManager(self.db_url)
         self.daily_quota_limit = 10000
         self.quota_reserve_percentage = 0.2  # Reserve 20% for essential operations
@@ -439,39 +444,43 @@ class GolfScheduler:
         except Exception as e:
             logger.error(f"Error in collect today videos: {e}")
     
+    def get_video_of_day_candidates(self, cur, limit: int = 1) -> List[tuple]:
+        """(id, title) of the top video of the day candidates, best first"""
+        # Matches momentum scoring from Next.js
+        query = """
+        SELECT yv.id, yv.title
+        FROM youtube_videos yv
+        JOIN youtube_channels yc ON yv.channel_id = yc.id
+        WHERE yv.channel_id = ANY(%s::text[])
+          AND yv.view_count > 100
+          AND yv.duration_seconds >= 60
+          AND yv.thumbnail_url IS NOT NULL
+          AND yv.published_at >= NOW() - INTERVAL '14 days'
+        ORDER BY 
+          CASE 
+            WHEN yv.published_at >= NOW() - INTERVAL '1 day' THEN yv.view_count * 5000
+            WHEN yv.published_at >= NOW() - INTERVAL '2 days' THEN yv.view_count * 100
+            WHEN yv.published_at >= NOW() - INTERVAL '3 days' THEN yv.view_count * 10
+            ELSE yv.view_count
+          END DESC
+        LIMIT %s
+        """
+        cur.execute(query, (self.whitelisted_channels, limit))
+        return cur.fetchall()
+    
     def generate_ai_for_video_of_day(self):
         """Generate AI analysis for video of the day if missing"""
         try:
             with self.db_manager.get_connection() as conn:
                 with conn.cursor() as cur:
-                    # Get video of the day (matches momentum scoring from Next.js)
-                    query = """
-                    SELECT yv.id, yv.title
-                    FROM youtube_videos yv
-                    JOIN youtube_channels yc ON yv.channel_id = yc.id
-                    WHERE yv.channel_id = ANY(%s::text[])
-                      AND yv.view_count > 100
-                      AND yv.duration_seconds >= 60
-                      AND yv.thumbnail_url IS NOT NULL
-                      AND yv.published_at >= NOW() - INTERVAL '14 days'
-                    ORDER BY 
-                      CASE 
-                        WHEN yv.published_at >= NOW() - INTERVAL '1 day' THEN yv.view_count * 5000
-                        WHEN yv.published_at >= NOW() - INTERVAL '2 days' THEN yv.view_count * 100
-                        WHEN yv.published_at >= NOW() - INTERVAL '3 days' THEN yv.view_count * 10
-                        ELSE yv.view_count
-                      END DESC
-                    LIMIT 1
-                    """
-                    
-                    cur.execute(query, (self.whitelisted_channels,))
-                    video_row = cur.fetchone()
+                    # Get video of the day
+                    candidates = self.get_video_of_day_candidates(cur)
                     
-                    if not video_row:
+                    if not candidates:
                         logger.info("No video of the day candidate found")
                         return
                     
-                    video_id, title = video_row
+                    video_id, title = candidates[0]
                     
                     # Check if AI analysis exists
                     cur.execute("""
@@ -501,6 +510,28 @@ class GolfScheduler:
         except Exception as e:
             logger.error(f"Error generating AI for video of the day: {e}")
     
+    def prefetch_candidate_transcripts(self):
+        """Store captions for the upcoming video of the day candidates"""
+        try:
+            with self.db_manager.get_connection() as conn:
+                with conn.cursor() as cur:
+                    candidates = self.get_video_of_day_candidates(cur, self.transcript_prefetch_candidates)
+            
+            stored = self.transcript_store.prefetch([video_id for video_id, _ in candidates])
+            logger.info(f"Transcript prefetch: {stored} new of {len(candidates)} candidates")
+        except Exception as e:
+            logger.error(f"Error prefetching transcripts: {e}")
+    
+    def start_transcript_prefetch(self):
+        """Run the prefetch in a background thread so yt-dlp never blocks the schedule"""
+        if self._prefetch_thread and self._prefetch_thread.is_alive():
+            logger.info("Transcript prefetch still running, skipping")
+            return
+        self._prefetch_thread = threading.Thread(
+            target=self.prefetch_candidate_transcripts, name="transcript-prefetch", daemon=True
+        )
+        self._prefetch_thread.start()
+    
     def perform_collect_whitelisted_videos(self):
         """
         Collect recent videos from whitelisted channels (every hour)
@@ -619,17 +650,20 @@ class GolfScheduler:
         logger.info("- Collect today videos + AI: Every 2 hours (reduced from 30 minutes)")
         logger.info("- Collect whitelisted channels: Every 2 hours (reduced from 30 minutes)")
         logger.info("- Daily maintenance: Every day at 3 AM")
+        logger.info("- Transcript prefetch for video of the day candidates: Every hour (background)")
         
-        # Schedule the 4 tasks (optimized for quota usage)
+        # Schedule the 5 tasks (optimized for quota usage)
         schedule.every(5).minutes.do(self.perform_view_count_updates)  # Reduced frequency by 60%
         schedule.every(2).hours.do(self.perform_collect_today_videos)  # Reduced frequency by 75%
         schedule.every(2).hours.do(self.perform_collect_whitelisted_videos)  # Reduced frequency by 75%
         schedule.every().day.at("03:00").do(self.perform_maintenance_update)
+        schedule.every(1).hours.do(self.start_transcript_prefetch)
         
         # Run initial collections on startup
         logger.info("Running initial collections on startup...")
         self.perform_collect_today_videos()
         self.perform_collect_whitelisted_videos()
+        self.start_transcript_prefetch()
         
         # Main scheduler loop
         logger.info("Scheduler started. Press Ctrl+C to stop.")
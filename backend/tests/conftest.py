@@ -0,0 +1,9 @@
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Shared modules import as analysis.*, the archived analyzer as youtube_analyzer.app.*
+for path in (BACKEND_DIR, os.path.join(BACKEND_DIR, "archived")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Regenerate the labeled frame set used to measure the graphic pre-filter.
+
+Frames are synthetic 640x360 golf-course scenes (sky, tree line, fairway,
+a player) drawn with a fixed seed. Frames under graphic/ carry a broadcast
+overlay: a lower-third name bar, a left-column leaderboard or a top ticker.
+Frames under no_graphic/ are hard negatives with course signage, a
+grandstand, a flag or a rope line but no overlay.
+
+Synthetic frames exercise the detector's cues, not its accuracy on real
+broadcasts; measure a real frame set before changing the filter default.
+
+Usage:
+    python make_graphic_frames.py [output_dir]
+"""
+
+import os
+import random
+import sys
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+WIDTH, HEIGHT = 640, 360
+SEED = 37
+FRAMES_PER_KIND = 3
+
+PLAYERS = ["T. WOODS", "R. MCILROY", "J. SPIETH", "S. SCHEFFLER", "J. RAHM", "V. HOVLAND"]
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "graphic_frames")
+
+
+def _font(size: int):
+    return ImageFont.load_default(size=size)
+
+
+def draw_course(rng: random.Random) -> Image.Image:
+    """Sky gradient, tree line, textured fairway and a player."""
+    image = Image.new("RGB", (WIDTH, HEIGHT))
+    draw = ImageDraw.Draw(image)
+    horizon = rng.randint(110, 160)
+    for y in range(horizon):
+        shade = int(150 + 80 * y / horizon)
+        draw.line([(0, y), (WIDTH, y)], fill=(shade - 60, shade - 20, shade))
+    for y in range(horizon, HEIGHT):
+        shade = int(90 + 50 * (y - horizon) / (HEIGHT - horizon))
+        draw.line([(0, y), (WIDTH, y)], fill=(shade // 3, shade, shade // 3))
+    for _ in range(rng.randint(6, 12)):
+        x = rng.randint(-40, WIDTH)
+        radius = rng.randint(25, 60)
+        draw.ellipse([x, horizon - radius, x + 2 * radius, horizon + radius // 2],
+                     fill=(20, rng.randint(50, 80), 25))
+    # Mowing stripes, softened below
+    for x in range(0, WIDTH, 48):
+        draw.polygon([(x, HEIGHT), (x + 24, HEIGHT), (x + 12, horizon), (x + 6, horizon)], fill=(60, 120, 50))
+    px = rng.randint(150, WIDTH - 150)
+    py = rng.randint(horizon + 40, HEIGHT - 120)
+    draw.rectangle([px, py, px + 26, py + 60], fill=(rng.randint(150, 240), 40, 40))
+    draw.rectangle([px + 2, py + 60, px + 24, py + 110], fill=(230, 230, 225))
+    draw.ellipse([px + 3, py - 22, px + 23, py], fill=(210, 170, 140))
+    image = image.filter(ImageFilter.GaussianBlur(1.2))
+    noise = Image.frombytes("L", (WIDTH, HEIGHT), rng.randbytes(WIDTH * HEIGHT)).convert("RGB")
+    return Image.blend(image, noise.filter(ImageFilter.GaussianBlur(1)), 0.15)
+
+
+def lower_third(image: Image.Image, rng: random.Random):
+    draw = ImageDraw.Draw(image)
+    top = HEIGHT - rng.randint(70, 90)
+    draw.rectangle([30, top, 420, top + 26], fill=(15, 35, 90))
+    draw.rectangle([30, top + 26, 420, top + 46], fill=(235, 235, 235))
+    draw.text((40, top + 4), rng.choice(PLAYERS), font=_font(18), fill=(255, 255, 255))
+    draw.text((40, top + 28), f"HOLE {rng.randint(1, 18)}  PAR {rng.randint(3, 5)}  "
+                              f"{rng.randint(120, 560)} YDS", font=_font(14), fill=(20, 20, 20))
+
+
+def leaderboard(image: Image.Image, rng: random.Random):
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([12, 40, 200, 250], fill=(10, 25, 60))
+    draw.text((22, 48), "LEADERBOARD", font=_font(16), fill=(255, 220, 60))
+    for row, name in enumerate(rng.sample(PLAYERS, 5)):
+        y = 76 + row * 33
+        draw.line([(12, y - 4), (200, y - 4)], fill=(90, 110, 160))
+        draw.text((22, y), f"{row + 1}. {name}", font=_font(14), fill=(255, 255, 255))
+        draw.text((160, y), f"-{rng.randint(1, 15)}", font=_font(14), fill=(255, 255, 255))
+
+
+def ticker(image: Image.Image, rng: random.Random):
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 8, WIDTH, 36], fill=(240, 240, 240))
+    text = "   ".join(f"{name} -{rng.randint(1, 12)}" for name in rng.sample(PLAYERS, 4))
+    draw.text((10, 13), text, font=_font(16), fill=(10, 10, 10))
+
+
+def course_sign(image: Image.Image, rng: random.Random):
+    """A tee sign standing in the scene, mid-frame."""
+    draw = ImageDraw.Draw(image)
+    x, y = rng.randint(300, 480), rng.randint(150, 190)
+    draw.rectangle([x + 40, y + 50, x + 46, y + 100], fill=(60, 50, 40))
+    draw.rectangle([x, y, x + 86, y + 50], fill=(30, 70, 40))
+    draw.text((x + 8, y + 6), f"HOLE {rng.randint(1, 18)}", font=_font(14), fill=(240, 240, 220))
+    draw.text((x + 8, y + 26), f"{rng.randint(120, 560)} Y", font=_font(14), fill=(240, 240, 220))
+
+
+def grandstand(image: Image.Image, rng: random.Random):
+    """Rows of spectators behind the green."""
+    draw = ImageDraw.Draw(image)
+    for row in range(6):
+        y = 70 + row * 9
+        for x in range(rng.randint(0, 6), WIDTH, 7):
+            color = tuple(rng.randint(40, 250) for _ in range(3))
+            draw.ellipse([x, y, x + 5, y + 6], fill=color)
+
+
+def flag(image: Image.Image, rng: random.Random):
+    draw = ImageDraw.Draw(image)
+    x = rng.randint(200, 440)
+    draw.line([(x, 120), (x, 260)], fill=(250, 250, 250), width=3)
+    draw.polygon([(x, 120), (x + 40, 132), (x, 144)], fill=(230, 200, 20))
+
+
+def fence(image: Image.Image, rng: random.Random):
+    """A white rope-and-stake line across the lower third."""
+    draw = ImageDraw.Draw(image)
+    y = HEIGHT - rng.randint(60, 90)
+    draw.line([(0, y), (WIDTH, y + rng.randint(-10, 10))], fill=(245, 245, 245), width=2)
+    for x in range(0, WIDTH, 28):
+        draw.line([(x, y - 14), (x, y + 14)], fill=(245, 245, 245), width=3)
+
+
+GRAPHICS = [lower_third, leaderboard, ticker]
+SCENERY = [course_sign, grandstand, flag, fence]
+
+
+def main():
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DIR
+    rng = random.Random(SEED)
+    for label, painters in (("graphic", GRAPHICS), ("no_graphic", SCENERY)):
+        os.makedirs(os.path.join(output_dir, label), exist_ok=True)
+        for painter in painters:
+            for n in range(FRAMES_PER_KIND):
+                image = draw_course(rng)
+                # Some overlays sit over scenery that also shows up in the negatives
+                if label == "graphic" and rng.random() < 0.5:
+                    rng.choice(SCENERY)(image, rng)
+                painter(image, rng)
+                image.save(os.path.join(output_dir, label, f"{painter.__name__}_{n}.jpg"), quality=85)
+    print(f"Frames written to {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+from youtube_analyzer.app.categorizer import DEFAULT_CATEGORY, VideoCategorizer
+
+categorizer = VideoCategorizer()
+
+
+def test_highest_weighted_category_wins():
+    assert categorizer.categorize("Driver review", "Testing the new shaft") == 'equipment'
+    assert categorizer.categorize("How to fix your slice", None) == 'instruction'
+
+
+def test_phrases_and_word_starts():
+    assert categorizer.score("hole in one")['highlights'] == 2.5
+    assert categorizer.score("three tips") == {'instruction': 1.5}
+    # "face" must not count as "ace"
+    assert categorizer.categorize_text("club face angle") == 'equipment'
+    assert 'highlights' not in categorizer.score("club face angle")
+
+
+def test_ties_go_to_the_earlier_category():
+    # 'round' scores 0.5 for both tour and vlog
+    assert categorizer.categorize_text("round") == 'tour'
+
+
+def test_no_keywords_is_general():
+    assert categorizer.categorize("Sunday morning", "") == DEFAULT_CATEGORY
+
+
+def test_categorize_many_keeps_order():
+    texts = ["PGA Championship final round", "breaking news", "nothing here"]
+    assert categorizer.categorize_many(texts) == ['tour', 'news', DEFAULT_CATEGORY]
+
+
+def test_custom_keywords():
+    custom = VideoCategorizer({'mine': {'putter': 1.0}})
+    assert custom.categorize_text("new putter") == 'mine'
@@ -0,0 +1,21 @@
+import pytest
+
+from youtube_analyzer.app.character_processing_v2 import normalize_name
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Rory McIlroy", "rory mcilroy"),
+    ("  RORY   McIlroy ", "rory mcilroy"),
+    ("Rory Mc-Ilroy.", "rory mcilroy"),
+    ("J.J. Spaun", "jj spaun"),
+    ("Ludvig Åberg", "ludvig åberg"),
+    ("Ｂｒｙｓｏｎ", "bryson"),  # Full-width letters fold to ASCII
+    ("STRASSE", "strasse"),
+    ("Straße", "strasse"),
+])
+def test_normalize_name(name, expected):
+    assert normalize_name(name) == expected
+
+
+def test_same_person_same_key():
+    assert normalize_name("Bryson DeChambeau") == normalize_name("bryson dechambeau!")
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from youtube_analyzer.app.collab_graph import WATERMARK_OVERLAP, CollaborationGraph, is_distinctive_name
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+CHANNELS = {
+    'UC_A': 'Alpha Golf Show',
+    'UC_B': 'Bravo Swings',
+    'UC_C': 'Charlie Putts!',
+    'UC_D': 'Delta Drives',
+    'UC_G': 'Golf',
+}
+
+
+@pytest.fixture
+def graph():
+    graph = CollaborationGraph()
+    graph.set_known_channels(CHANNELS)
+    return graph
+
+
+def _video(video_id, channel_id, title, minutes=0):
+    return video_id, channel_id, title, None, T0 + timedelta(minutes=minutes)
+
+
+def test_generic_and_short_titles_are_not_matched(graph):
+    assert not is_distinctive_name('Golf')
+    assert not is_distinctive_name('Golf Tips TV')
+    assert is_distinctive_name('Bravo Swings')
+    assert graph.add_video('UC_A', 'Golf with friends', 'more golf') == 0
+
+
+def test_titles_ending_in_punctuation_match(graph):
+    assert graph.add_video('UC_A', 'Nine holes with Charlie Putts!', None) == 1
+    assert [key for key, _, _ in graph.neighbors('UC_A')] == ['UC_C']
+
+
+def test_names_match_only_as_whole_words(graph):
+    assert graph.add_video('UC_A', 'xbravo swingsx', None) == 0
+
+
+def test_handles_and_unknown_mentions(graph):
+    graph.add_video('UC_A', 'Match vs @BravoSwings and @NewGolfer', None)
+    assert {key for key, _, _ in graph.neighbors('UC_A')} == {'UC_B', 'mention:newgolfer'}
+    assert graph.name('mention:newgolfer') == '@NewGolfer'
+
+
+def test_edges_are_undirected_and_weighted(graph):
+    graph.add_video('UC_A', 'Bravo Swings round', None)
+    graph.add_video('UC_B', 'Rematch with Alpha Golf Show', None)
+    graph.add_video('UC_A', 'Delta Drives day', None)
+    assert graph.neighbors('UC_A') == [('UC_B', 'Bravo Swings', 2.0), ('UC_D', 'Delta Drives', 1.0)]
+    assert graph.neighbors('UC_B') == [('UC_A', 'Alpha Golf Show', 2.0)]
+
+
+def test_pagerank_ranks_the_hub_first(graph):
+    for channel_id in ('UC_B', 'UC_C', 'UC_D'):
+        graph.add_video(channel_id, 'Playing with Alpha Golf Show', None)
+    ranks = graph.pagerank()
+    assert sum(ranks.values()) == pytest.approx(1.0)
+    assert max(ranks, key=ranks.get) == 'UC_A'
+    assert ranks['UC_B'] == pytest.approx(ranks['UC_C'])
+
+
+def test_two_hop_suggestions(graph):
+    # A - B - D and A - C - D: D is two hops from A by two paths; B and C are direct
+    # A path scores its weakest edge, so the A - C - D path (2, 2) outweighs A - B - D (1, 1)
+    graph.add_video('UC_A', 'Bravo Swings and Charlie Putts!', None)
+    graph.add_video('UC_A', 'Charlie Putts! rematch', None)
+    graph.add_video('UC_B', 'Delta Drives', None)
+    graph.add_video('UC_C', 'Delta Drives', None)
+    graph.add_video('UC_C', 'Delta Drives again', None)
+    suggestions = graph.two_hop_suggestions(['UC_A'])
+    assert [s['key'] for s in suggestions] == ['UC_D']
+    assert suggestions[0]['score'] == 3.0
+    assert suggestions[0]['via'] == 'Charlie Putts!'
+
+
+def test_late_commits_inside_the_overlap_are_added_once(graph):
+    assert graph.add_videos([_video('v1', 'UC_A', 'Bravo Swings', minutes=10)]) == 1
+    # A transaction that started earlier commits after v1 was ingested
+    late = _video('v0', 'UC_C', 'Delta Drives', minutes=5)
+    assert graph.since() <= late[4]
+    assert graph.add_videos([late, _video('v1', 'UC_A', 'Bravo Swings', minutes=10)]) == 1
+    assert graph.neighbors('UC_A') == [('UC_B', 'Bravo Swings', 1.0)]
+    assert graph.neighbors('UC_C') == [('UC_D', 'Delta Drives', 1.0)]
+
+
+def test_ids_outside_the_overlap_are_forgotten(graph):
+    graph.add_videos([_video('old', 'UC_A', 'x'), _video('new', 'UC_A', 'x', minutes=WATERMARK_OVERLAP.seconds // 60 + 5)])
+    assert set(graph.recent_videos) == {'new'}
+
+
+def test_save_and_load_round_trip(graph, tmp_path):
+    graph.add_videos([_video('v1', 'UC_A', 'Bravo Swings with @someone', minutes=3)])
+    path = str(tmp_path / 'graph.bin')
+    graph.save(path)
+
+    loaded = CollaborationGraph.load(path)
+    assert loaded.keys == graph.keys and loaded.names == graph.names
+    assert loaded.watermark == graph.watermark and loaded.recent_videos == graph.recent_videos
+    assert loaded.neighbors('UC_A') == graph.neighbors('UC_A')
+    assert loaded.pagerank() == pytest.approx(graph.pagerank())
+    assert not (tmp_path / 'graph.bin.tmp').exists()
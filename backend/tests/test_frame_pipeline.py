@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+
+from youtube_analyzer.app import frame_pipeline
+from youtube_analyzer.app.ai_processing import FRAME_MODEL_NAME, read_frame
+from youtube_analyzer.app.frame_cache import frame_key
+from youtube_analyzer.app.frame_sampler import OUTPUT_HEIGHT, OUTPUT_WIDTH
+
+PROMPT = "Find the scoreboard"
+
+
+def _frames(count):
+    rng = np.random.default_rng(47)
+    for index in range(count):
+        # Distinct scenes, so every frame is its own dedup cluster
+        yield index, rng.integers(0, 256, (OUTPUT_HEIGHT, OUTPUT_WIDTH, 3), dtype=np.uint8)
+
+
+def test_persisted_frames_hash_to_the_keys_of_the_first_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(frame_pipeline, "_segment_frames", lambda *args: _frames(3))
+    frames, frame_map = frame_pipeline.prepare_video_frames(
+        "video.mp4", persist_dir=str(tmp_path), graphic_filter=False
+    )
+    assert frame_map == [0, 1, 2]
+
+    persisted = sorted(os.path.join(tmp_path, name) for name in os.listdir(tmp_path))
+    sent_keys = [frame_key(read_frame(frame), PROMPT, FRAME_MODEL_NAME) for frame in frames]
+    reread_keys = [frame_key(read_frame(path), PROMPT, FRAME_MODEL_NAME) for path in persisted]
+    assert reread_keys == sent_keys
+
+
+def test_frames_are_encoded_in_memory_without_persist_dir(monkeypatch):
+    monkeypatch.setattr(frame_pipeline, "_segment_frames", lambda *args: _frames(2))
+    frames, _ = frame_pipeline.prepare_video_frames("video.mp4", graphic_filter=False)
+    assert len(frames) == 2 and all(frame.startswith("data:image/jpeg;base64,") for frame in frames)
+
+
+def test_call_savings_are_credited_to_dedup_and_filter_separately():
+    assert frame_pipeline.frame_call_savings(120, 40, 30, graphic_filter=True) == (
+        "120 sampled, 40 unique (80 calls saved by dedup), 30 to analyze (10 skipped by the graphic filter)"
+    )
+    assert frame_pipeline.frame_call_savings(120, 40, 40, graphic_filter=False).endswith(
+        "40 to analyze (graphic filter off)"
+    )
@@ -0,0 +1,97 @@
+import pytest
+
+from youtube_analyzer.app.frame_results import FrameResultStore
+
+
+class FakeRedis:
+    """The few Redis commands the store uses, on a dict; TTLs are ignored."""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update({str(field): value for field, value in mapping.items()})
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def expire(self, key, ttl):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+@pytest.fixture
+def store():
+    return FrameResultStore(FakeRedis())
+
+
+def test_results_follow_the_frame_map(store):
+    # Frames 0 and 2 share candidate 0, frame 1 was skipped, frame 3 is candidate 1
+    store.start(1, [0, -1, 0, 1, 2])
+    assert store.put(1, 0, ["LEADERBOARD", None]) == 1
+    assert store.put(1, 2, ["HOLE 7"]) == 1
+    assert store.ocr_results(1) == ["LEADERBOARD", None, "LEADERBOARD", None, "HOLE 7"]
+
+
+def test_missing_frame_map_falls_back_to_index_order(store):
+    store.put(2, 8, ["late"])
+    store.put(2, 0, ["early", None])
+    assert store.ocr_results(2) == ["early", "late"]
+
+
+def test_start_clears_an_earlier_run(store):
+    store.start(3, [0])
+    store.put(3, 0, ["stale"])
+    store.start(3, [0, 1])
+    assert store.ocr_results(3) == [None, None]
+
+
+def test_frames_and_inputs_round_trip_and_clear(store):
+    store.start(4, [0, 1])
+    keys = store.put_frames(4, ["data:image/jpeg;base64,AA", "data:image/jpeg;base64,BB"])
+    store.put_synthesis_inputs(4, "transcript", [["text", 0.0, 5.0]], {"found": True})
+    assert store.load_frames(keys) == ["data:image/jpeg;base64,AA", "data:image/jpeg;base64,BB"]
+    assert store.synthesis_inputs(4)["transcript_chunks"] == [["text", 0.0, 5.0]]
+
+    store.drop_frames(keys[:1])
+    assert store.load_frames(keys) == [None, "data:image/jpeg;base64,BB"]
+    store.clear(4)
+    assert store.frame_map(4) is None and store.synthesis_inputs(4) is None
+
+
+def test_frames_must_be_data_uris(store):
+    with pytest.raises(ValueError):
+        store.put_frames(5, ["video_data/5/frames/frame_0001.jpg"])
@@ -0,0 +1,74 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from analysis import gemini_client
+from analysis.gemini_client import FILE_POLL_INITIAL_SECONDS, GeminiClient
+
+
+class FakeGenai:
+    """Files that stay PROCESSING for `polls` get_file calls, then reach `final`."""
+
+    def __init__(self, polls: int, final: str = "ACTIVE"):
+        self.polls, self.final = polls, final
+        self.deleted = []
+
+    def configure(self, api_key):
+        pass
+
+    def _file(self, state):
+        return SimpleNamespace(name="files/clip", state=SimpleNamespace(name=state))
+
+    def upload_file(self, path):
+        return self._file("PROCESSING")
+
+    def get_file(self, name):
+        self.polls -= 1
+        return self._file("PROCESSING" if self.polls > 0 else self.final)
+
+    def delete_file(self, name):
+        self.deleted.append(name)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    waits = {"sync": [], "async": []}
+
+    async def fake_async_sleep(delay):
+        waits["async"].append(delay)
+
+    monkeypatch.setattr(gemini_client.time, "sleep", waits["sync"].append)
+    monkeypatch.setattr(gemini_client.asyncio, "sleep", fake_async_sleep)
+    return waits
+
+
+def _client(monkeypatch, genai):
+    monkeypatch.setattr(gemini_client, "genai", genai)
+    return GeminiClient(api_key="test")
+
+
+def test_async_upload_polls_with_the_sync_backoff(monkeypatch, sleeps):
+    uploaded = asyncio.run(_client(monkeypatch, FakeGenai(polls=3)).upload_file_async("clip.mp4"))
+    assert uploaded.state.name == "ACTIVE"
+    assert sleeps["sync"] == []
+
+    _client(monkeypatch, FakeGenai(polls=3)).upload_file("clip.mp4")
+    assert sleeps["async"] == sleeps["sync"]
+    assert sleeps["async"][0] == FILE_POLL_INITIAL_SECONDS
+    assert sleeps["async"][1] > sleeps["async"][0]
+
+
+def test_async_upload_times_out_and_deletes_the_file(monkeypatch, sleeps):
+    genai = FakeGenai(polls=1000)
+    with pytest.raises(TimeoutError):
+        asyncio.run(_client(monkeypatch, genai).upload_file_async("clip.mp4", timeout=10))
+    assert sum(sleeps["async"]) >= 10
+    assert genai.deleted == ["files/clip"]
+
+
+def test_async_upload_raises_on_failed_processing(monkeypatch, sleeps):
+    genai = FakeGenai(polls=1, final="FAILED")
+    with pytest.raises(ValueError):
+        asyncio.run(_client(monkeypatch, genai).upload_file_async("clip.mp4"))
+    assert genai.deleted == ["files/clip"]
@@ -0,0 +1,35 @@
+import json
+import os
+
+import pytest
+
+from evaluate_graphic_filter import evaluate, load_scores
+from youtube_analyzer.app.graphic_filter import GRAPHIC_THRESHOLD, filter_frames
+
+FRAMES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "graphic_frames")
+
+
+@pytest.fixture(scope="module")
+def scored():
+    return load_scores(FRAMES_DIR)
+
+
+def test_keeps_every_overlay_at_default_threshold(scored):
+    assert evaluate(scored, GRAPHIC_THRESHOLD)["recall"] == 1.0
+
+
+def test_recorded_results_match_the_fixture(scored):
+    with open(os.path.join(FRAMES_DIR, "graphic_filter_eval.json")) as f:
+        recorded = json.load(f)
+    assert recorded["frames"] == len(scored)
+    for result in recorded["results"]:
+        assert evaluate(scored, result["threshold"]) == pytest.approx(result)
+
+
+def test_disabled_filter_keeps_every_frame():
+    paths = ["a.jpg", "b.jpg", "c.jpg"]
+    assert filter_frames(paths, enabled=False) == (paths, [0, 1, 2])
+
+
+def test_unreadable_frames_are_kept():
+    assert filter_frames(["missing.jpg"], enabled=True) == (["missing.jpg"], [0])
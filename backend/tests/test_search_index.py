@@ -0,0 +1,168 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from youtube_analyzer.app import search_index
+from youtube_analyzer.app.golf_directory import PENDING_INDEX_UPDATES, GolfDirectory
+from youtube_analyzer.app.search_index import PostingList, VideoSearchIndex, _encode_varint
+
+
+def _video(video_id, title, description='', channel='Some Channel', views=100, category='general'):
+    return {'id': video_id, 'title': title, 'description': description, 'channel_title': channel,
+            'view_count': views, 'category': category, 'published_at': '2026-05-01T12:00:00Z'}
+
+
+def _ids(results):
+    return [result['url'].rsplit('=', 1)[1] for result in results]
+
+
+@pytest.fixture
+def index():
+    index = VideoSearchIndex()
+    index.add_video(_video('putt', 'Putting drills for beginners', 'simple green reading'))
+    index.add_video(_video('drive', 'Driver swing speed', 'hit it further off the tee', views=900))
+    index.add_video(_video('chip', 'Chipping around the green', 'short game, then putting', views=500))
+    index.add_video(_video('vlog', 'Course vlog', 'a round with friends', category='vlog'))
+    return index
+
+
+def test_varint_postings_round_trip_large_gaps():
+    docs = [(0, 1), (1, 3), (130, 2), (70_000, 65_535), (2 ** 31, 7)]
+    raw, previous = bytearray(), 0
+    for doc, freq in docs:
+        _encode_varint(doc - previous, raw)
+        _encode_varint(freq, raw)
+        previous = doc
+    assert len(raw) > 2 * len(docs)  # Multi-byte varints were exercised
+
+    posting = PostingList(memoryview(bytes(raw)), len(docs))
+    assert len(posting) == len(docs)
+    assert list(posting) == docs
+    posting.append(2 ** 31 + 5, 1)
+    assert list(posting)[-1] == (2 ** 31 + 5, 1)
+
+
+def test_bm25_ranks_title_hits_above_description_hits(index):
+    assert _ids(index.search('putting', prefix=False)) == ['putt', 'chip']
+    assert _ids(index.search('green', prefix=False)) == ['chip', 'putt']
+
+
+def test_ties_break_on_views_and_category_filters(index):
+    index.add_video(_video('putt2', 'Putting drills for beginners', 'simple green reading', views=5000))
+    assert _ids(index.search('drills', prefix=False)) == ['putt2', 'putt']
+    assert _ids(index.search('course', category='vlog')) == ['vlog']
+    assert index.search('course', category='tour') == []
+
+
+def test_prefix_expands_only_the_last_word(index):
+    assert _ids(index.search('put')) == ['putt', 'chip']
+    assert index.search('put', prefix=False) == []
+    assert index.search('driv zzz') == []  # Earlier words must match whole terms
+    assert _ids(index.search('driver sw')) == ['drive']
+
+
+def test_suggest_orders_by_document_frequency(index):
+    index.add_video(_video('putt3', 'Putter fitting'))
+    assert index.suggest('PUT') == ['putting', 'putter']
+    assert index.suggest('put', limit=1) == ['putting']
+    assert index.suggest('  ') == []
+
+
+def test_updates_replace_text_and_removals_hide_videos(index):
+    index.add_video(_video('drive', 'Fairway woods explained', views=900))
+    assert index.search('driver', prefix=False) == []
+    assert _ids(index.search('fairway')) == ['drive']
+
+    index.remove_video('putt')
+    assert _ids(index.search('putting', prefix=False)) == ['chip']
+    assert index.live_count == 3
+
+
+def test_save_compacts_and_load_decodes_lazily(index, tmp_path):
+    index.remove_video('drive')
+    path = str(tmp_path / 'index.bin')
+    index.save(path)
+    assert not index.dirty and not os.path.exists(path + '.tmp')
+
+    loaded = VideoSearchIndex.load(path)
+    assert loaded.live_count == 3 and 'drive' not in loaded._video_ids
+    assert all(posting._raw is not None for posting in loaded._postings.values())
+
+    assert loaded.search('putting') == index.search('putting')
+    assert loaded._postings['putting']._raw is None
+    assert loaded._postings['vlog']._raw is not None
+
+    # A mapped posting list is decoded before it grows
+    loaded.add_video(_video('putt4', 'Putting under pressure'))
+    assert set(_ids(loaded.search('putting'))) == {'putt', 'chip', 'putt4'}
+
+
+def test_failed_save_leaves_the_previous_file(index, tmp_path, monkeypatch):
+    path = str(tmp_path / 'index.bin')
+    index.save(path)
+    index.add_video(_video('new', 'Bunker escapes'))
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(search_index.os, 'replace', fail)
+    with pytest.raises(OSError):
+        index.save(path)
+    assert index.dirty
+    assert VideoSearchIndex.load(path).live_count == 4
+
+
+def test_open_starts_empty_and_rejects_foreign_files(tmp_path):
+    assert VideoSearchIndex.open(str(tmp_path / 'missing.bin')).live_count == 0
+    foreign = tmp_path / 'foreign.bin'
+    foreign.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        VideoSearchIndex.load(str(foreign))
+
+
+@pytest.fixture
+def directory(tmp_path, monkeypatch):
+    monkeypatch.setenv('GOLF_SEARCH_INDEX', str(tmp_path / 'index.bin'))
+    monkeypatch.delenv('YOUTUBE_API_KEY', raising=False)
+    monkeypatch.delenv('GOOGLE_API_KEY', raising=False)
+    return GolfDirectory(offline=True)
+
+
+@pytest.fixture
+def session():
+    # The upserts are PostgreSQL statements; record them and let SQLite supply the transaction
+    session = Session(create_engine('sqlite://'))
+    session.connection()
+    session.executed = []
+    session.execute = session.executed.append
+    yield session
+    session.close()
+
+
+def _api_video(video_id, title):
+    return {'id': video_id, 'title': title, 'description': 'golf', 'channel_id': 'UC1', 'channel_title': 'Chan',
+            'published_at': '2026-05-01T12:00:00Z', 'duration': 'PT5M', 'view_count': 10, 'like_count': 1,
+            'comment_count': 0, 'engagement_rate': 10.0, 'thumbnail': ''}
+
+
+def test_ingested_videos_reach_the_index_only_after_commit(directory, session):
+    assert directory.ingest_videos(session, [_api_video('v1', 'Bunker escapes')]) == 1
+    assert len(session.executed) == 2
+    assert directory.search_index.search('bunker') == []
+
+    session.commit()
+    assert _ids(directory.search_index.search('bunker')) == ['v1']
+    assert PENDING_INDEX_UPDATES not in session.info
+    assert directory.search_index.dirty
+
+
+def test_rolled_back_videos_never_reach_the_index(directory, session):
+    directory.ingest_videos(session, [_api_video('v1', 'Bunker escapes')])
+    session.rollback()
+    assert PENDING_INDEX_UPDATES not in session.info
+
+    session.connection()
+    session.commit()
+    assert directory.search_index.search('bunker') == []
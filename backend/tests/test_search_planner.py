@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from youtube_analyzer.app.models import SearchQuery, SearchResultCache
+from youtube_analyzer.app.search_planner import DETAILS_QUOTA_COST, SEARCH_QUOTA_COST, SearchPlanner
+
+
+class FakeYouTube:
+    def __init__(self, results):
+        self.results = results
+        self.searches = []
+        self.detail_requests = []
+
+    def search_video_ids(self, query, max_results, order, published_after):
+        self.searches.append(query)
+        return self.results[query]
+
+    def get_video_details(self, video_ids):
+        self.detail_requests.append(list(video_ids))
+        return [{'id': video_id} for video_id in video_ids]
+
+
+@pytest.fixture
+def session_factory():
+    # The planner reads only youtube_videos.id, so a one-column table stands in for the catalog
+    engine = create_engine('sqlite://')
+    SearchQuery.__table__.create(engine)
+    SearchResultCache.__table__.create(engine)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE youtube_videos (id VARCHAR PRIMARY KEY)"))
+        connection.execute(text("INSERT INTO youtube_videos VALUES ('stored')"))
+    return sessionmaker(engine)
+
+
+def _planner(session_factory, **results):
+    youtube = FakeYouTube({'golf': ['stored', 'fresh'], **results})
+    return SearchPlanner(youtube, session_factory, daily_budget=10_000), youtube
+
+
+def _history(session_factory):
+    with session_factory() as session:
+        return [(row.query, row.category, row.result_count, row.new_video_count, row.quota_cost)
+                for row in session.query(SearchQuery).order_by(SearchQuery.id)]
+
+
+def test_ingestion_gets_only_new_videos_and_cache_hits_are_free(session_factory):
+    planner, youtube = _planner(session_factory)
+    assert planner.search('golf') == [{'id': 'fresh'}]
+    assert planner.search('golf') == [{'id': 'fresh'}]
+    assert youtube.searches == ['golf']
+    assert [cost for *_, cost in _history(session_factory)] == [
+        SEARCH_QUOTA_COST + DETAILS_QUOTA_COST, DETAILS_QUOTA_COST
+    ]
+    assert planner.quota_spent == SEARCH_QUOTA_COST + 2 * DETAILS_QUOTA_COST
+
+
+def test_discovery_gets_the_full_cached_result_set(session_factory):
+    planner, youtube = _planner(session_factory)
+    planner.search_new_ids('golf')
+    assert planner.search('golf', new_only=False) == [{'id': 'stored'}, {'id': 'fresh'}]
+    assert youtube.searches == ['golf']
+
+
+def test_nothing_new_skips_the_details_call(session_factory):
+    planner, youtube = _planner(session_factory, known=['stored'])
+    assert planner.search('known') == []
+    assert youtube.detail_requests == []
+    assert _history(session_factory) == [('known', 'planner', 1, 0, SEARCH_QUOTA_COST)]
+
+
+def test_run_records_each_term_under_its_category(session_factory):
+    planner, _ = _planner(session_factory, putting=['p1'])
+    results = dict(planner.run(['golf', 'putting'], categories={'putting': 'instruction'}, category='tour'))
+    assert results == {'golf': [{'id': 'fresh'}], 'putting': [{'id': 'p1'}]}
+    assert [(query, category) for query, category, *_ in _history(session_factory)] == [
+        ('golf', 'tour'), ('putting', 'instruction')
+    ]
+
+
+def test_plan_runs_cached_terms_then_best_yields_within_budget(session_factory):
+    planner, _ = _planner(session_factory, dud=['stored'], tips=['t1'], drills=['d1'])
+    planner.search_new_ids('dud')
+    planner.search_new_ids('golf')
+    with session_factory() as session:  # Only the dud's yield history remains
+        session.query(SearchResultCache).filter(SearchResultCache.query == 'dud').delete()
+        session.commit()
+
+    # 'golf' is cached and free; one paid search fits, and an untried term beats the proven dud
+    assert planner.plan(['dud', 'tips', 'golf'], budget=SEARCH_QUOTA_COST + DETAILS_QUOTA_COST) == ['golf', 'tips']
+    yields = planner.term_yields(['dud', 'tips'])
+    assert yields['tips'] > yields['dud']
+
+
+def test_remaining_budget_counts_todays_spend(session_factory):
+    planner, _ = _planner(session_factory)
+    planner.search_new_ids('golf')
+    assert planner.remaining_budget() == planner.daily_budget - SEARCH_QUOTA_COST - DETAILS_QUOTA_COST
@@ -0,0 +1,83 @@
+from analysis.summarizer import (
+    CHARS_PER_TOKEN, ChunkSummaryCache, TranscriptChunk, TranscriptSummarizer, chunk_transcript, regroup_chunks,
+)
+from analysis.vtt_parser import parse_vtt
+
+
+def _captions(count: int):
+    blocks = [f"00:{i // 60:02d}:{i % 60:02d}.000 --> 00:{i // 60:02d}:{i % 60:02d}.900\nline {i} about hole {i}"
+              for i in range(count)]
+    return parse_vtt("WEBVTT\n\n" + "\n\n".join(blocks) + "\n")
+
+
+def test_caption_chunks_split_on_cues_and_keep_spans():
+    chunks = chunk_transcript(_captions(100), max_tokens=20)
+    assert all(len(chunk.text) <= 20 * CHARS_PER_TOKEN for chunk in chunks)
+    assert ' '.join(chunk.text for chunk in chunks) == _captions(100).text
+    assert chunks[0].start == 0.0 and chunks[-1].end == 99.9
+    assert all(a.end <= b.start for a, b in zip(chunks, chunks[1:]))
+
+
+def test_plain_text_chunks_split_on_words():
+    text = ' '.join(f"word{i}" for i in range(200))
+    chunks = chunk_transcript(text, max_tokens=10)
+    assert ' '.join(chunk.text for chunk in chunks) == text
+    assert all(chunk.start is None for chunk in chunks)
+    assert chunks[0].span == 'an excerpt'
+
+
+def test_regroup_joins_neighbours_and_spans_them():
+    chunks = [TranscriptChunk("a" * 10, 0.0, 10.0), TranscriptChunk("b" * 10, 10.0, 20.0),
+              TranscriptChunk("c" * 30, 20.0, 30.0)]
+    grouped = regroup_chunks(chunks, max_tokens=6)
+    assert [(chunk.start, chunk.end) for chunk in grouped] == [(0.0, 20.0), (20.0, 30.0)]
+    assert grouped[0].text == "a" * 10 + "\n\n" + "b" * 10
+
+
+def _summarizer(generate, **kwargs):
+    return TranscriptSummarizer(generate, 'test-model', ChunkSummaryCache(), max_workers=2, **kwargs)
+
+
+def test_condense_returns_short_transcripts_unchanged():
+    summarizer = _summarizer(lambda prompt: 1 / 0, single_pass_tokens=1000)
+    assert summarizer.condense("a short round") == "a short round"
+
+
+def test_condense_labels_notes_with_spans_and_reuses_cached_notes():
+    calls = []
+
+    def generate(prompt):
+        calls.append(prompt)
+        return "note"
+
+    summarizer = _summarizer(generate, chunk_tokens=20, single_pass_tokens=50)
+    condensed = summarizer.condense(_captions(100))
+    assert condensed.startswith("[0:00-")
+    assert "line 0 about hole 0" not in condensed
+
+    first_calls = len(calls)
+    assert summarizer.condense(_captions(100)) == condensed
+    assert len(calls) == first_calls
+
+
+def test_failed_chunk_keeps_its_text():
+    summarizer = _summarizer(lambda prompt: 1 / 0, chunk_tokens=20, single_pass_tokens=50)
+    condensed = summarizer.condense(_captions(100))
+    assert "line 0 about hole 0" in condensed
+
+
+def test_condensing_again_keeps_time_spans():
+    prompts = []
+
+    def generate(prompt):
+        prompts.append(prompt)
+        return "birdie"
+
+    captions = _captions(300)
+    summarizer = _summarizer(generate, chunk_tokens=20, single_pass_tokens=60)
+    condensed = summarizer.condense(captions)
+    # Notes of the first pass were condensed again, and the second pass saw their spans
+    assert len(prompts) > len(chunk_transcript(captions, 20))
+    assert any("[0:00-" in prompt and "--- COMMENTARY ---" in prompt for prompt in prompts)
+    assert condensed.startswith("[0:00-")
+    assert "an excerpt" not in condensed
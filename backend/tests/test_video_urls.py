@@ -0,0 +1,34 @@
+import pytest
+
+from youtube_analyzer.app.video_urls import normalize_video_url
+
+CANONICAL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+@pytest.mark.parametrize("url", [
+    "dQw4w9WgXcQ",
+    "  https://www.youtube.com/watch?v=dQw4w9WgXcQ  ",
+    "https://youtube.com/watch?v=dQw4w9WgXcQ&t=42s&list=PL123",
+    "http://m.youtube.com/watch?feature=share&v=dQw4w9WgXcQ",
+    "www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtu.be/dQw4w9WgXcQ?si=abc",
+    "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+    "https://www.youtube.com/embed/dQw4w9WgXcQ",
+    "https://www.youtube.com/live/dQw4w9WgXcQ?feature=share",
+    "https://WWW.YOUTUBE.COM/watch?v=dQw4w9WgXcQ",
+])
+def test_video_urls_normalize_to_one_watch_url(url):
+    assert normalize_video_url(url) == ("dQw4w9WgXcQ", CANONICAL)
+
+
+@pytest.mark.parametrize("url", [
+    "",
+    "https://www.youtube.com/watch",
+    "https://www.youtube.com/watch?v=short",
+    "https://www.youtube.com/channel/UC1234567890",
+    "https://notyoutube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtube.com.evil.example/watch?v=dQw4w9WgXcQ",
+    "https://youtu.be/",
+])
+def test_invalid_urls(url):
+    assert normalize_video_url(url) == (None, None)
@@ -0,0 +1,52 @@
+from analysis.vtt_parser import parse_vtt, parse_vtt_file
+
+ROLLING_VTT = """WEBVTT
+Kind: captions
+Language: en
+
+00:00:01.000 --> 00:00:03.000 align:start position:0%
+welcome<00:00:01.500><c> to</c><00:00:02.000><c> the</c>
+
+00:00:03.000 --> 00:00:05.000 align:start position:0%
+welcome to the
+first tee at Augusta
+
+00:00:05.000 --> 00:00:05.010 align:start position:0%
+first tee at Augusta
+
+00:00:05.010 --> 00:00:08.000 align:start position:0%
+first tee at Augusta
+he's putting for birdie &amp; the lead
+"""
+
+
+def test_rolling_repeats_are_dropped():
+    transcript = parse_vtt(ROLLING_VTT)
+    assert transcript.text == "welcome to the first tee at Augusta he's putting for birdie & the lead"
+
+
+def test_cues_that_only_repeat_are_not_stored():
+    transcript = parse_vtt(ROLLING_VTT)
+    assert list(transcript.cues()) == [
+        (1.0, 3.0, "welcome to the"),
+        (3.0, 5.0, "first tee at Augusta"),
+        (5.01, 8.0, "he's putting for birdie & the lead"),
+    ]
+
+
+def test_repeated_words_inside_new_speech_are_kept():
+    vtt = "WEBVTT\n\n00:00:01.000 --> 00:00:02.000\ngo go go\n\n00:00:02.000 --> 00:00:03.000\ngo go go go\n"
+    assert parse_vtt_file(vtt) == "go go go go"
+
+
+def test_text_between_and_cue_at():
+    transcript = parse_vtt(ROLLING_VTT)
+    assert transcript.text_between(3.0, 6.0) == "first tee at Augusta he's putting for birdie & the lead"
+    assert transcript.cue_at(0.5) == -1
+    assert transcript.cue_at(4.0) == 1
+
+
+def test_hour_timestamps_and_file_lines():
+    lines = ["WEBVTT\n", "\n", "01:02:03.500 --> 01:02:04.000\n", "final putt\n", "\n"]
+    transcript = parse_vtt(iter(lines))
+    assert list(transcript.cues()) == [(3723.5, 3724.0, "final putt")]